@@ -1,8 +1,10 @@
+import logging
 from flask import Flask, json
 from flask_cors import CORS
 from dotenv import load_dotenv
 from app.models.db import db
-import os
+from app.utils import metrics
+from app.utils.json_provider import OrjsonProvider
 
 load_dotenv()
 
@@ -10,29 +12,48 @@ def create_app():
     app = Flask(__name__)
     CORS(app)
     
-    # JSON 인코딩 설정
+    # JSON 인코딩 설정 (orjson 사용)
+    app.json = OrjsonProvider(app)
     app.json.ensure_ascii = False
     app.json.mimetype = 'application/json; charset=utf-8'
     
     # Configuration
     app.config.from_object('app.config.Config')
     
-    # 데이터베이스 설정
-    app.config['SQLALCHEMY_DATABASE_URI'] = os.getenv('DATABASE_URL')
-    app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+    # 로깅 (핸들러가 이미 설정된 경우(gunicorn 등)는 그대로 둡니다)
+    logging.basicConfig(level=app.config['LOG_LEVEL'])
+    # OpenAI SDK의 요청마다 남는 httpx INFO 로그는 제외합니다
+    logging.getLogger('httpx').setLevel(logging.WARNING)
     
-    # 데이터베이스 초기화
+    # 데이터베이스 초기화 (연결/풀 설정은 app.config.Config 참고)
     db.init_app(app)
     
+    # 요청/SQL 계측 (/metrics)
+    if app.config['METRICS_ENABLED']:
+        metrics.init_app(app)
+    
     # Register blueprints
-    from app.routes import main, message, session, user
+    from app.routes import main, message, session, user, export, usage
     app.register_blueprint(main.bp)
     app.register_blueprint(message.message_bp, url_prefix='/api/messages')
     app.register_blueprint(session.session_bp, url_prefix='/api/sessions')
     app.register_blueprint(user.user_bp, url_prefix='/api/users')
+    app.register_blueprint(export.export_bp, url_prefix='/api/export')
+    app.register_blueprint(usage.usage_bp, url_prefix='/api/usage')
     
-    # 데이터베이스 테이블 생성
-    with app.app_context():
-        db.create_all()
+    # 스키마는 Alembic 마이그레이션(alembic upgrade head)으로 관리하므로
+    # 워커 시작 시에는 데이터베이스 스키마를 건드리지 않습니다
+
+    # 백그라운드 작업
+    from app.workers.embedding_worker import EmbeddingWorker, embed_messages_command
+    from app.workers.title_worker import TitleWorker, generate_titles_command
+    from app.workers.archive_worker import archive_sessions_command, create_message_partitions_command
+    app.extensions['title_worker'] = TitleWorker(app)
+    app.cli.add_command(embed_messages_command)
+    app.cli.add_command(generate_titles_command)
+    app.cli.add_command(create_message_partitions_command)
+    app.cli.add_command(archive_sessions_command)
+    if app.config['EMBEDDING_WORKER_ENABLED']:
+        EmbeddingWorker(app).start()
     
     return app 
\ No newline at end of file
@@ -0,0 +1,272 @@
+import asyncio
+import logging
+import math
+import uuid
+from urllib.parse import parse_qs
+from a2wsgi import WSGIMiddleware
+from flask_cors.core import get_cors_headers, get_cors_options
+from werkzeug.datastructures import Headers, MIMEAccept
+from werkzeug.http import parse_accept_header
+from app.routes.message import parse_stream_flag
+from app.routes.session import load_title_status, parse_title_wait
+from app.utils.chat import prepare_turn, save_assistant_message, save_turn
+from app.utils.metrics import RequestTimer
+from app.utils.openai_client import (
+    UsageRecord, get_async_openai_client, get_completion_async, get_completion_stream_async
+)
+from app.utils.scheduler import SchedulerRejected
+
+logger = logging.getLogger(__name__)
+
+COMPLETION_PREFIX = '/api/messages/session/'
+COMPLETION_ENDPOINT = 'message.create_completion'
+SESSION_PREFIX = '/api/sessions/'
+TITLE_SUFFIX = '/title'
+TITLE_ENDPOINT = 'session.get_session_title'
+# 제목 생성 상태를 다시 확인하는 간격 (초)
+TITLE_POLL_INTERVAL = 0.5
+
+
+def completion_session_id(scope):
+    """채팅 완성 요청(`POST /api/messages/session/<uuid>`)이면 세션 ID를 반환합니다."""
+    if scope['type'] != 'http' or scope['method'] != 'POST':
+        return None
+    path = scope['path']
+    if not path.startswith(COMPLETION_PREFIX):
+        return None
+    try:
+        return uuid.UUID(path[len(COMPLETION_PREFIX):].rstrip('/'))
+    except ValueError:
+        return None
+
+
+def title_session_id(scope):
+    """`wait`를 준 제목 상태 조회(`GET /api/sessions/<uuid>/title?wait=...`)이면 세션 ID를 반환합니다."""
+    if scope['type'] != 'http' or scope['method'] != 'GET':
+        return None
+    path = scope['path'].rstrip('/')
+    if not (path.startswith(SESSION_PREFIX) and path.endswith(TITLE_SUFFIX)):
+        return None
+    if 'wait' not in parse_qs(scope.get('query_string', b'').decode('latin-1')):
+        return None
+    try:
+        return uuid.UUID(path[len(SESSION_PREFIX):-len(TITLE_SUFFIX)])
+    except ValueError:
+        return None
+
+
+class AsyncCompletionApp:
+    """채팅 완성 API를 비동기로 처리하고 나머지 요청은 Flask 앱에 넘기는 ASGI 앱입니다.
+
+    LLM 응답을 기다리는 동안 스레드를 점유하지 않으므로 워커 하나가 수백 개의 완성 요청을
+    동시에 처리할 수 있습니다. 세션 제목 long polling(`?wait=`)도 같은 이유로 여기서 처리합니다. DB 작업은 Flask 라우트와 같은 helper(app.utils.chat)를 쓰되,
+    호출마다 스레드 풀에서 별도의 앱 컨텍스트(= 별도의 scoped session)로 실행합니다.
+    Flask를 거치지 않으므로 Flask 앱의 CORS 헤더와 요청 지표는 여기서 같은 설정으로 붙입니다.
+    응답 형식과 SSE 이벤트 순서는 Flask 라우트(app.routes.message.create_completion)와 같습니다.
+    """
+
+    def __init__(self, flask_app, wsgi_threads=None):
+        self.flask_app = flask_app
+        self.wsgi = WSGIMiddleware(flask_app, workers=wsgi_threads or flask_app.config['ASGI_WSGI_THREADS'])
+        # create_app의 CORS(app)와 같은 옵션 (CORS_* 설정 포함)
+        self.cors_options = get_cors_options(flask_app)
+
+    async def __call__(self, scope, receive, send):
+        session_id = completion_session_id(scope)
+        if session_id is not None:
+            handler, blueprint, endpoint = self.create_completion, 'message', COMPLETION_ENDPOINT
+        else:
+            session_id = title_session_id(scope)
+            if session_id is None:
+                return await self.wsgi(scope, receive, send)
+            handler, blueprint, endpoint = self.get_session_title, 'session', TITLE_ENDPOINT
+
+        timer = (RequestTimer(blueprint, endpoint, scope['method'])
+                 if self.flask_app.config['METRICS_ENABLED'] else None)
+        status = 500
+        try:
+            status = await handler(scope, receive, self._with_cors(scope, send), session_id)
+        finally:
+            if timer is not None:
+                timer.observe(status)
+
+    def _with_cors(self, scope, send):
+        """응답 시작 메시지에 Flask-CORS가 붙였을 것과 같은 CORS 헤더를 추가합니다."""
+        request_headers = Headers([(k.decode('latin-1'), v.decode('latin-1')) for k, v in scope['headers']])
+        cors_headers = [(name.lower().encode('latin-1'), str(value).encode('latin-1'))
+                        for name, value in get_cors_headers(self.cors_options, request_headers,
+                                                            scope['method']).items(multi=True)]
+
+        async def send_with_cors(message):
+            if message['type'] == 'http.response.start' and cors_headers:
+                message = {**message, 'headers': [*message.get('headers', []), *cors_headers]}
+            await send(message)
+        return send_with_cors
+
+    async def _run(self, fn, *args):
+        """DB 작업을 스레드 풀에서 별도의 앱 컨텍스트로 실행합니다."""
+        def run():
+            with self.flask_app.app_context():
+                return fn(*args)
+        return await asyncio.to_thread(run)
+
+    async def create_completion(self, scope, receive, send, session_id):
+        data = await self._read_json(receive)
+        if not isinstance(data, dict) or 'content' not in data:
+            return await self._send_json(send, 400, {'status': 'error', 'error': '메시지가 필요합니다'})
+
+        query = parse_qs(scope.get('query_string', b'').decode('latin-1'))
+        headers = dict(scope['headers'])
+        accept = parse_accept_header(headers.get(b'accept', b'').decode('latin-1'), MIMEAccept)
+        stream = parse_stream_flag(query.get('stream', [data.get('stream', False)])[-1], accept.best)
+
+        try:
+            prepared = await self._run(prepare_turn, session_id, data, stream)
+            if prepared is None:
+                return await self._send_json(send, 404, {'status': 'error', 'error': '세션을 찾을 수 없습니다'})
+            messages, user_message = prepared
+            if stream:
+                return await self._stream(receive, send, session_id, data.get('user_id'), user_message, messages)
+
+            usage = UsageRecord()
+            response = await get_completion_async(
+                get_async_openai_client(), messages,
+                use_cache=self.flask_app.config['COMPLETION_CACHE_CHAT_ENABLED'], usage=usage)
+            payload = await self._run(save_turn, session_id, data.get('user_id'), user_message, response, usage)
+        except SchedulerRejected as e:
+            return await self._send_json(send, 503, {'status': 'error', 'error': str(e)},
+                                         [(b'retry-after', str(math.ceil(e.retry_after or 1)).encode('latin-1'))])
+        except Exception as e:
+            return await self._send_json(send, 500, {'status': 'error', 'error': str(e)})
+        return await self._send_json(send, 200, {'status': 'success', 'messages': payload})
+
+    async def get_session_title(self, scope, receive, send, session_id):
+        """제목 생성이 끝나거나 `wait`초가 지날 때까지 기다렸다가 상태를 반환합니다.
+
+        기다리는 동안에는 스레드와 DB 커넥션을 잡지 않고, 확인할 때만 스레드 풀에서 짧게 조회합니다.
+        """
+        query = parse_qs(scope.get('query_string', b'').decode('latin-1'))
+        try:
+            wait = parse_title_wait(query['wait'][-1], self.flask_app.config['TITLE_WAIT_MAX'])
+        except ValueError:
+            return await self._send_json(send, 400, {'status': 'error', 'error': 'wait는 숫자여야 합니다'})
+
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + wait
+        disconnect_task = asyncio.ensure_future(self._wait_disconnect(receive))
+        try:
+            while True:
+                try:
+                    session = await self._run(load_title_status, session_id)
+                except Exception as e:
+                    return await self._send_json(send, 500, {'status': 'error', 'error': str(e)})
+                if session is None:
+                    return await self._send_json(send, 404, {'status': 'error', 'error': '세션을 찾을 수 없습니다'})
+                remaining = deadline - loop.time()
+                if session['title_status'] != 'pending' or remaining <= 0:
+                    return await self._send_json(send, 200, {'status': 'success', 'session': session})
+                await asyncio.wait({disconnect_task}, timeout=min(TITLE_POLL_INTERVAL, remaining))
+                if disconnect_task.done():
+                    # 클라이언트가 떠났으면 더 조회하지 않습니다
+                    return 200
+        finally:
+            disconnect_task.cancel()
+
+    async def _stream(self, receive, send, session_id, user_id, user_payload, messages):
+        """SSE 응답을 보냅니다. 클라이언트가 끊으면 업스트림 스트림을 닫고 받은 내용까지 저장합니다."""
+        await send({
+            'type': 'http.response.start',
+            'status': 200,
+            'headers': [
+                (b'content-type', b'text/event-stream; charset=utf-8'),
+                (b'cache-control', b'no-cache'),
+                (b'x-accel-buffering', b'no')
+            ]
+        })
+
+        async def event(name, payload):
+            body = f"event: {name}\ndata: {self.flask_app.json.dumps(payload)}\n\n".encode('utf-8')
+            await send({'type': 'http.response.body', 'body': body, 'more_body': True})
+
+        async def generate():
+            chunks = []
+            finished = False
+            usage = UsageRecord()
+            deltas = get_completion_stream_async(
+                get_async_openai_client(), messages,
+                use_cache=self.flask_app.config['COMPLETION_CACHE_CHAT_ENABLED'], usage=usage)
+            try:
+                await event('start', {'user_message': user_payload})
+                async for delta in deltas:
+                    chunks.append(delta)
+                    await event('delta', {'content': delta})
+
+                finished = True
+                assistant_payload = await self._run(
+                    save_assistant_message, session_id, user_id, ''.join(chunks), usage)
+                await event('done', {'assistant_message': assistant_payload})
+            except asyncio.CancelledError:
+                # 클라이언트 연결 종료: 더 이상 보내지 않고 정리만 합니다
+                raise
+            except Exception as e:
+                finished = True
+                await event('error', {'status': 'error', 'error': str(e)})
+            finally:
+                await deltas.aclose()
+                if not finished and chunks:
+                    # 중간에 끊긴 응답도 대화 기록이 이어지도록 저장합니다
+                    try:
+                        await asyncio.shield(self._run(
+                            save_assistant_message, session_id, user_id, ''.join(chunks), usage))
+                    except Exception:
+                        logger.exception("Error saving partial stream")
+
+        stream_task = asyncio.ensure_future(generate())
+        disconnect_task = asyncio.ensure_future(self._wait_disconnect(receive))
+        try:
+            await asyncio.wait({stream_task, disconnect_task}, return_when=asyncio.FIRST_COMPLETED)
+            if not stream_task.done():
+                stream_task.cancel()
+            try:
+                await stream_task
+            except asyncio.CancelledError:
+                return 200
+            await send({'type': 'http.response.body', 'body': b'', 'more_body': False})
+        finally:
+            disconnect_task.cancel()
+        return 200
+
+    @staticmethod
+    async def _wait_disconnect(receive):
+        while True:
+            message = await receive()
+            if message['type'] == 'http.disconnect':
+                return
+
+    async def _read_json(self, receive):
+        chunks = []
+        while True:
+            message = await receive()
+            if message['type'] == 'http.disconnect':
+                return None
+            chunks.append(message.get('body', b''))
+            if not message.get('more_body'):
+                break
+        try:
+            return self.flask_app.json.loads(b''.join(chunks))
+        except ValueError:
+            return None
+
+    async def _send_json(self, send, status, payload, headers=()):
+        body = self.flask_app.json.dumps(payload).encode('utf-8')
+        await send({
+            'type': 'http.response.start',
+            'status': status,
+            'headers': [
+                (b'content-type', self.flask_app.json.mimetype.encode('latin-1')),
+                (b'content-length', str(len(body)).encode('latin-1')),
+                *headers
+            ]
+        })
+        await send({'type': 'http.response.body', 'body': body})
+        return status
@@ -2,4 +2,120 @@ import os
 
 class Config:
     SECRET_KEY = os.getenv('SECRET_KEY', 'dev')
-    DEBUG = os.getenv('FLASK_DEBUG', 'False').lower() in ('true', '1', 't') 
\ No newline at end of file
+    DEBUG = os.getenv('FLASK_DEBUG', 'False').lower() in ('true', '1', 't')
+
+    # 데이터베이스 연결 및 커넥션 풀 설정
+    SQLALCHEMY_DATABASE_URI = os.getenv('DATABASE_URL')
+    SQLALCHEMY_TRACK_MODIFICATIONS = False
+    DATABASE_REPLICA_URL = os.getenv('DATABASE_REPLICA_URL')
+    DB_POOL_SIZE = int(os.getenv('DB_POOL_SIZE', '5'))
+    DB_MAX_OVERFLOW = int(os.getenv('DB_MAX_OVERFLOW', '10'))
+    DB_POOL_TIMEOUT = float(os.getenv('DB_POOL_TIMEOUT', '30'))
+    DB_POOL_RECYCLE = int(os.getenv('DB_POOL_RECYCLE', '1800'))
+    DB_POOL_PRE_PING = os.getenv('DB_POOL_PRE_PING', 'True').lower() in ('true', '1', 't')
+    DB_STATEMENT_TIMEOUT_MS = int(os.getenv('DB_STATEMENT_TIMEOUT_MS', '30000'))  # 0이면 제한 없음
+    SQLALCHEMY_ENGINE_OPTIONS = {
+        'pool_size': DB_POOL_SIZE,
+        'max_overflow': DB_MAX_OVERFLOW,
+        'pool_timeout': DB_POOL_TIMEOUT,
+        'pool_recycle': DB_POOL_RECYCLE,
+        'pool_pre_ping': DB_POOL_PRE_PING,
+        # 오래 걸리는 쿼리가 커넥션과 워커를 붙잡지 않도록 서버 측 statement_timeout을 겁니다
+        'connect_args': ({'options': f'-c statement_timeout={DB_STATEMENT_TIMEOUT_MS}'}
+                         if DB_STATEMENT_TIMEOUT_MS else {}),
+    }
+    # 읽기 복제본은 primary와 같은 엔진 옵션을 사용합니다
+    SQLALCHEMY_BINDS = {'replica': DATABASE_REPLICA_URL} if DATABASE_REPLICA_URL else {}
+
+    # Azure OpenAI 클라이언트 설정
+    OPENAI_TIMEOUT = float(os.getenv('OPENAI_TIMEOUT', '60'))
+    OPENAI_CONNECT_TIMEOUT = float(os.getenv('OPENAI_CONNECT_TIMEOUT', '5'))
+    OPENAI_MAX_CONNECTIONS = int(os.getenv('OPENAI_MAX_CONNECTIONS', '100'))
+    OPENAI_MAX_KEEPALIVE_CONNECTIONS = int(os.getenv('OPENAI_MAX_KEEPALIVE_CONNECTIONS', '20'))
+    OPENAI_MAX_RETRIES = int(os.getenv('OPENAI_MAX_RETRIES', '3'))
+    OPENAI_BACKOFF_BASE = float(os.getenv('OPENAI_BACKOFF_BASE', '0.5'))
+    OPENAI_BACKOFF_MAX = float(os.getenv('OPENAI_BACKOFF_MAX', '8'))
+    OPENAI_CIRCUIT_FAILURE_THRESHOLD = int(os.getenv('OPENAI_CIRCUIT_FAILURE_THRESHOLD', '5'))
+    OPENAI_CIRCUIT_RESET_TIMEOUT = float(os.getenv('OPENAI_CIRCUIT_RESET_TIMEOUT', '30'))
+
+    # 목록 API 페이지네이션 설정
+    PAGE_DEFAULT_LIMIT = int(os.getenv('PAGE_DEFAULT_LIMIT', '50'))
+    PAGE_MAX_LIMIT = int(os.getenv('PAGE_MAX_LIMIT', '500'))
+
+    # 대화 컨텍스트 토큰 예산 및 누적 요약 설정
+    CONTEXT_TOKEN_BUDGET = int(os.getenv('CONTEXT_TOKEN_BUDGET', '6000'))
+    CONTEXT_KEEP_RATIO = float(os.getenv('CONTEXT_KEEP_RATIO', '0.5'))
+    CONTEXT_SUMMARY_MAX_TOKENS = int(os.getenv('CONTEXT_SUMMARY_MAX_TOKENS', '500'))
+    CONTEXT_TOKENIZER = os.getenv('CONTEXT_TOKENIZER', 'o200k_base')
+
+    # 메시지 임베딩 백그라운드 작업 및 의미 검색 설정
+    EMBEDDING_WORKER_ENABLED = os.getenv('EMBEDDING_WORKER_ENABLED', 'False').lower() in ('true', '1', 't')
+    EMBEDDING_BATCH_SIZE = int(os.getenv('EMBEDDING_BATCH_SIZE', '64'))
+    EMBEDDING_CONCURRENCY = int(os.getenv('EMBEDDING_CONCURRENCY', '2'))
+    EMBEDDING_POLL_INTERVAL = float(os.getenv('EMBEDDING_POLL_INTERVAL', '5'))
+    EMBEDDING_MAX_CHARS = int(os.getenv('EMBEDDING_MAX_CHARS', '8000'))
+    SEARCH_DEFAULT_K = int(os.getenv('SEARCH_DEFAULT_K', '10'))
+    SEARCH_MAX_K = int(os.getenv('SEARCH_MAX_K', '100'))
+    SEARCH_EF_SEARCH = int(os.getenv('SEARCH_EF_SEARCH', '100'))
+    # 키워드 검색(mode=lexical): 점수를 매길 최신 일치 메시지 수, 결과 snippet 길이(글자)
+    SEARCH_LEXICAL_MAX_CANDIDATES = int(os.getenv('SEARCH_LEXICAL_MAX_CANDIDATES', '1000'))
+    SEARCH_SNIPPET_CHARS = int(os.getenv('SEARCH_SNIPPET_CHARS', '120'))
+
+    # LLM 응답 캐시 설정 (semantic 캐시는 AZURE_OPENAI_EMBEDDING_DEPLOYMENT 필요)
+    # 기본은 제목/요약 생성에만 적용하고, 채팅 응답은 다른 사용자와 공유되므로 CHAT을 켠 경우에만 캐시합니다
+    COMPLETION_CACHE_ENABLED = os.getenv('COMPLETION_CACHE_ENABLED', 'True').lower() in ('true', '1', 't')
+    COMPLETION_CACHE_CHAT_ENABLED = os.getenv('COMPLETION_CACHE_CHAT_ENABLED', 'False').lower() in ('true', '1', 't')
+    COMPLETION_CACHE_MAX_ENTRIES = int(os.getenv('COMPLETION_CACHE_MAX_ENTRIES', '1000'))
+    COMPLETION_CACHE_TTL = float(os.getenv('COMPLETION_CACHE_TTL', '3600'))
+    COMPLETION_CACHE_SEMANTIC_ENABLED = os.getenv('COMPLETION_CACHE_SEMANTIC_ENABLED', 'False').lower() in ('true', '1', 't')
+    COMPLETION_CACHE_SEMANTIC_THRESHOLD = float(os.getenv('COMPLETION_CACHE_SEMANTIC_THRESHOLD', '0.95'))
+
+    # 세션 제목/설명 비동기 생성 설정
+    TITLE_WORKER_THREADS = int(os.getenv('TITLE_WORKER_THREADS', '4'))
+    TITLE_MAX_ATTEMPTS = int(os.getenv('TITLE_MAX_ATTEMPTS', '3'))
+    TITLE_RETRY_BACKOFF = float(os.getenv('TITLE_RETRY_BACKOFF', '2'))
+    TITLE_WAIT_MAX = float(os.getenv('TITLE_WAIT_MAX', '30'))
+
+    # 메시지 대량 저장 설정
+    BULK_INGEST_METHOD = os.getenv('BULK_INGEST_METHOD', 'insert')  # insert | copy
+    BULK_INGEST_CHUNK_SIZE = int(os.getenv('BULK_INGEST_CHUNK_SIZE', '1000'))
+    BULK_INGEST_MAX_ROWS = int(os.getenv('BULK_INGEST_MAX_ROWS', '1000000'))
+    BULK_INGEST_MAX_ERRORS = int(os.getenv('BULK_INGEST_MAX_ERRORS', '1000'))
+
+    # 메시지 파티션/아카이브 설정 (flask create-message-partitions, flask archive-sessions)
+    MESSAGE_PARTITION_MONTHS_AHEAD = int(os.getenv('MESSAGE_PARTITION_MONTHS_AHEAD', '3'))
+    MESSAGE_ARCHIVE_AFTER_DAYS = int(os.getenv('MESSAGE_ARCHIVE_AFTER_DAYS', '90'))  # 세션 종료 후 경과 일수
+    MESSAGE_ARCHIVE_BATCH_SIZE = int(os.getenv('MESSAGE_ARCHIVE_BATCH_SIZE', '100'))  # 트랜잭션당 세션 수
+
+    # NDJSON 내보내기 설정 (서버 사이드 커서에서 한 번에 가져올 행 수)
+    EXPORT_BATCH_SIZE = int(os.getenv('EXPORT_BATCH_SIZE', '1000'))
+
+    # ASGI 진입점(asgi.py)에서 Flask(WSGI) 요청을 처리할 스레드 수 (워커 프로세스당)
+    ASGI_WSGI_THREADS = int(os.getenv('ASGI_WSGI_THREADS', '16'))
+
+    # 로깅 및 계측 설정
+    LOG_LEVEL = os.getenv('LOG_LEVEL', 'INFO')
+    METRICS_ENABLED = os.getenv('METRICS_ENABLED', 'True').lower() in ('true', '1', 't')
+    LLM_DEBUG_SAMPLE_RATE = float(os.getenv('LLM_DEBUG_SAMPLE_RATE', '0'))  # 0~1, 프롬프트/응답 디버그 로그 샘플링 비율
+    OPENAI_STREAM_USAGE = os.getenv('OPENAI_STREAM_USAGE', 'False').lower() in ('true', '1', 't')  # api-version 2024-09-01 이상 필요
+
+    # LLM 요청 스케줄러 설정 (RPM/TPM은 배포별 한도, 0이면 제한 없음)
+    LLM_RPM_LIMIT = int(os.getenv('LLM_RPM_LIMIT', '0'))
+    LLM_TPM_LIMIT = int(os.getenv('LLM_TPM_LIMIT', '0'))
+    LLM_BURST_SECONDS = float(os.getenv('LLM_BURST_SECONDS', '10'))
+    LLM_QUEUE_MAX_DEPTH = int(os.getenv('LLM_QUEUE_MAX_DEPTH', '100'))
+    LLM_QUEUE_MAX_WAIT = float(os.getenv('LLM_QUEUE_MAX_WAIT', '30'))
+    LLM_QUEUE_BACKGROUND_MAX_WAIT = float(os.getenv('LLM_QUEUE_BACKGROUND_MAX_WAIT', '120'))
+
+    # 사용자 엔티티 캐시 설정 (ENTITY_CACHE_REDIS_URL을 주면 워커 간 공유, redis 패키지 필요)
+    ENTITY_CACHE_ENABLED = os.getenv('ENTITY_CACHE_ENABLED', 'True').lower() in ('true', '1', 't')
+    ENTITY_CACHE_TTL = float(os.getenv('ENTITY_CACHE_TTL', '60'))
+    ENTITY_CACHE_MAX_ENTRIES = int(os.getenv('ENTITY_CACHE_MAX_ENTRIES', '10000'))
+    ENTITY_CACHE_REDIS_URL = os.getenv('ENTITY_CACHE_REDIS_URL')
+
+    # 세션별 대화 기록 캐시 설정 (HISTORY_CACHE_REDIS_URL을 주면 워커 간 공유)
+    HISTORY_CACHE_ENABLED = os.getenv('HISTORY_CACHE_ENABLED', 'True').lower() in ('true', '1', 't')
+    HISTORY_CACHE_MAX_MESSAGES = int(os.getenv('HISTORY_CACHE_MAX_MESSAGES', '100'))  # 세션당 최근 메시지 수
+    HISTORY_CACHE_MAX_SESSIONS = int(os.getenv('HISTORY_CACHE_MAX_SESSIONS', '1000'))  # 로컬 캐시
+    HISTORY_CACHE_TTL = float(os.getenv('HISTORY_CACHE_TTL', '1800'))
+    HISTORY_CACHE_REDIS_URL = os.getenv('HISTORY_CACHE_REDIS_URL', ENTITY_CACHE_REDIS_URL)
@@ -1,4 +1,5 @@
 from .message import Message
 from .session import Session
 from .user import User
+from .usage import UsageDaily, UsageSession
 from .db import db
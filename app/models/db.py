@@ -1,3 +1,62 @@
+import logging
+from functools import wraps
+from flask import g, has_request_context
+from sqlalchemy import event
 from flask_sqlalchemy import SQLAlchemy
+from flask_sqlalchemy.session import Session
 
-db = SQLAlchemy()
\ No newline at end of file
+logger = logging.getLogger(__name__)
+
+# SQLALCHEMY_BINDS에 읽기 복제본을 등록할 때 사용하는 bind key
+REPLICA_BIND_KEY = 'replica'
+_ON_COMMIT_KEY = 'on_commit_callbacks'
+
+
+class RoutingSession(Session):
+    """`read_only`로 표시된 요청의 조회 쿼리를 읽기 복제본으로 보내는 세션입니다.
+
+    복제본이 설정되지 않았거나 flush(쓰기) 중이면 기본(primary) 엔진을 사용합니다.
+    """
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if (bind is None and not self._flushing
+                and has_request_context() and g.get('db_read_only')):
+            engines = self._db.engines
+            if REPLICA_BIND_KEY in engines:
+                return engines[REPLICA_BIND_KEY]
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+
+db = SQLAlchemy(session_options={'class_': RoutingSession})
+
+
+def on_commit(callback, *args, session=None):
+    """현재 트랜잭션이 커밋된 뒤 `callback(*args)`를 실행합니다. 롤백되면 실행하지 않습니다.
+
+    캐시 무효화처럼 커밋된 데이터를 기준으로 해야 하는 후처리에 사용합니다.
+    """
+    session = session or db.session()
+    session.info.setdefault(_ON_COMMIT_KEY, []).append((callback, args))
+
+
+@event.listens_for(RoutingSession, 'after_commit')
+def _run_on_commit(session):
+    for callback, args in session.info.pop(_ON_COMMIT_KEY, ()):
+        try:
+            callback(*args)
+        except Exception:
+            logger.exception("Error in on_commit callback")
+
+
+@event.listens_for(RoutingSession, 'after_rollback')
+def _discard_on_commit(session):
+    session.info.pop(_ON_COMMIT_KEY, None)
+
+
+def read_only(view):
+    """조회 전용 엔드포인트에 붙여 DATABASE_REPLICA_URL(설정된 경우)에서 읽도록 합니다."""
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        g.db_read_only = True
+        return view(*args, **kwargs)
+    return wrapper
@@ -6,15 +6,49 @@ from datetime import datetime, timezone
 
 
 class Message(db.Model):
+    """대화 메시지
+
+    테이블은 `archived` 기준 LIST 파티션입니다. 진행 중인 메시지는 `message_hot`(월별 timestamp RANGE
+    하위 파티션)에, 오래전에 종료된 세션의 메시지는 `message_archive`(lz4 압축)에 저장됩니다.
+    파티션 키가 기본 키에 포함되어야 하므로 DB 기본 키는 (id, timestamp, archived)이고, ORM은 id로 식별합니다.
+    """
     __tablename__ = 'message'
+    __table_args__ = (
+        # 목록 API의 keyset 페이지네이션 (timestamp, id) 및 필터별 정렬용 인덱스
+        db.Index('ix_message_timestamp_id', 'timestamp', 'id'),
+        db.Index('ix_message_session_id_timestamp_id', 'session_id', 'timestamp', 'id'),
+        db.Index('ix_message_user_id_timestamp_id', 'user_id', 'timestamp', 'id'),
+        # 의미 검색(코사인 거리) top-k용 HNSW 인덱스 (pgvector >= 0.5.0)
+        db.Index('ix_message_vector_hnsw', 'vector',
+                 postgresql_using='hnsw',
+                 postgresql_with={'m': 16, 'ef_construction': 64},
+                 postgresql_ops={'vector': 'vector_cosine_ops'}),
+        # 키워드 검색(부분 일치 ILIKE)용 트라이그램 GIN 인덱스 (pg_trgm)
+        db.Index('ix_message_content_trgm', 'content',
+                 postgresql_using='gin',
+                 postgresql_ops={'content': 'gin_trgm_ops'}),
+        # 하위 파티션(월별 hot, archive)은 마이그레이션과 `flask create-message-partitions`로 만듭니다
+        {'postgresql_partition_by': 'LIST (archived)'},
+    )
     id = db.Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    # 세션/사용자 삭제 시 DB에서 메시지를 함께 지웁니다 (ORM은 메시지를 읽어 오지 않음)
     session_id = db.Column(UUID(as_uuid=True), db.ForeignKey(
-        'session.id'), nullable=False)
+        'session.id', ondelete='CASCADE'), nullable=False)
     user_id = db.Column(UUID(as_uuid=True), db.ForeignKey(
-        'user.id'), nullable=False)
+        'user.id', ondelete='CASCADE'), nullable=False)
     content = db.Column(db.Text, nullable=True)
     role = db.Column(ENUM('user', 'assistant', name='role_enum'),
                      nullable=False, default='user')
     timestamp = db.Column(db.DateTime(
-        timezone=True), default=lambda: datetime.now(timezone.utc), nullable=False)
+        timezone=True), default=lambda: datetime.now(timezone.utc), nullable=False, primary_key=True)
     vector = db.Column(Vector(1536), nullable=True)
+    # AI 응답(assistant)의 토큰 사용량, 응답한 모델과 배포, LLM 호출 지연 시간 (사용자 메시지는 NULL)
+    prompt_tokens = db.Column(db.Integer, nullable=True)
+    completion_tokens = db.Column(db.Integer, nullable=True)
+    model = db.Column(db.String(100), nullable=True)
+    deployment = db.Column(db.String(100), nullable=True)
+    latency_ms = db.Column(db.Integer, nullable=True)
+    # 종료 후 MESSAGE_ARCHIVE_AFTER_DAYS가 지난 세션의 메시지 (flask archive-sessions가 옮김)
+    archived = db.Column(db.Boolean, nullable=False, default=False, server_default=db.false(), primary_key=True)
+
+    __mapper_args__ = {'primary_key': [id]}
@@ -6,15 +6,38 @@ from datetime import datetime, timezone
 
 class Session(db.Model):
     __tablename__ = 'session'
+    __table_args__ = (
+        # 목록 API의 keyset 페이지네이션 (start_at, id) 및 필터별 정렬용 인덱스
+        db.Index('ix_session_start_at_id', 'start_at', 'id'),
+        db.Index('ix_session_user_id_start_at_id', 'user_id', 'start_at', 'id'),
+        db.Index('ix_session_open_start_at_id', 'start_at', 'id',
+                 postgresql_where=db.text('finish_at IS NULL')),
+        # 아카이브 대상(종료되었지만 아직 옮기지 않은 세션) 조회용
+        db.Index('ix_session_archive_pending_finish_at', 'finish_at',
+                 postgresql_where=db.text('finish_at IS NOT NULL AND archived_at IS NULL')),
+    )
     id = db.Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     user_id = db.Column(UUID(as_uuid=True), db.ForeignKey(
-        'user.id'), nullable=False)
+        'user.id', ondelete='CASCADE'), nullable=False)
     start_at = db.Column(db.DateTime(timezone=True), default=lambda: datetime.now(
         timezone.utc), nullable=False)
     finish_at = db.Column(db.DateTime(timezone=True), nullable=True)
     title = db.Column(db.Text, nullable=True)
     description = db.Column(db.Text, nullable=True)
+    # 제목/설명 생성 상태: pending(임시 제목) → done | failed
+    # 이 컬럼 이전에 만들어진 행은 이미 제목이 있으므로 서버 기본값은 done입니다
+    title_status = db.Column(db.String(16), nullable=False, default='pending', server_default='done')
+    # 토큰 예산을 넘어 밀려난 이전 대화의 누적 요약과, 요약에 포함된 마지막 메시지의 (timestamp, id)
+    # summary_until_id가 NULL이면(이전에 저장된 요약) 그 시각의 메시지를 모두 포함한 것으로 봅니다
+    summary = db.Column(db.Text, nullable=True)
+    summary_until = db.Column(db.DateTime(timezone=True), nullable=True)
+    summary_until_id = db.Column(UUID(as_uuid=True), nullable=True)
+    # 메시지를 archive 파티션으로 옮긴 시각 (다시 열면 NULL로 되돌림)
+    archived_at = db.Column(db.DateTime(timezone=True), nullable=True)
     
     # 관계 추가
-    messages = db.relationship('Message', backref='session', lazy=True, order_by='Message.timestamp')
-    user = db.relationship('User', backref='sessions', lazy=True)
+    # 삭제는 DB의 ON DELETE CASCADE에 맡기고, 메시지/세션을 하나씩 읽어 지우지 않습니다 (passive_deletes)
+    messages = db.relationship('Message', backref='session', lazy=True, order_by='Message.timestamp',
+                               cascade='all, delete-orphan', passive_deletes=True)
+    user = db.relationship('User', lazy=True,
+                           backref=db.backref('sessions', cascade='all, delete-orphan', passive_deletes=True))
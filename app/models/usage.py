@@ -0,0 +1,34 @@
+from app.models.db import db
+from sqlalchemy.dialects.postgresql import UUID
+
+
+class UsageDaily(db.Model):
+    """사용자별 일별(UTC) 토큰 사용량 집계. AI 응답을 저장할 때 같은 트랜잭션에서 갱신합니다."""
+    __tablename__ = 'usage_daily'
+    __table_args__ = (
+        # 날짜별 사용량 상위 사용자 조회용
+        db.Index('ix_usage_daily_day_total_tokens_user_id', 'day', 'total_tokens', 'user_id'),
+    )
+    user_id = db.Column(UUID(as_uuid=True), db.ForeignKey('user.id', ondelete='CASCADE'), primary_key=True)
+    day = db.Column(db.Date, primary_key=True)
+    requests = db.Column(db.Integer, nullable=False, default=0)
+    prompt_tokens = db.Column(db.BigInteger, nullable=False, default=0)
+    completion_tokens = db.Column(db.BigInteger, nullable=False, default=0)
+    total_tokens = db.Column(db.BigInteger, nullable=False, default=0)
+
+
+class UsageSession(db.Model):
+    """세션별 누적 토큰 사용량 집계"""
+    __tablename__ = 'usage_session'
+    __table_args__ = (
+        # 사용량이 많은 세션 조회용 (전체 / 사용자별)
+        db.Index('ix_usage_session_total_tokens_session_id', 'total_tokens', 'session_id'),
+        db.Index('ix_usage_session_user_id_total_tokens_session_id', 'user_id', 'total_tokens', 'session_id'),
+    )
+    session_id = db.Column(UUID(as_uuid=True), db.ForeignKey('session.id', ondelete='CASCADE'), primary_key=True)
+    user_id = db.Column(UUID(as_uuid=True), db.ForeignKey('user.id', ondelete='CASCADE'), nullable=False)
+    requests = db.Column(db.Integer, nullable=False, default=0)
+    prompt_tokens = db.Column(db.BigInteger, nullable=False, default=0)
+    completion_tokens = db.Column(db.BigInteger, nullable=False, default=0)
+    total_tokens = db.Column(db.BigInteger, nullable=False, default=0)
+    last_used_at = db.Column(db.DateTime(timezone=True), nullable=False)
@@ -0,0 +1,114 @@
+from flask import Blueprint, request, jsonify, Response, current_app, stream_with_context
+from sqlalchemy import select
+from app.models import Message, Session, db
+from app.models.db import read_only
+from app.utils.pagination import parse_datetime, parse_uuid
+from app.utils.serializers import DEFAULT_MESSAGE_FIELDS, serialize_message
+import zlib
+
+export_bp = Blueprint('export', __name__)
+
+# 이 크기만큼 모아서 압축/전송해 청크 수를 줄입니다
+FLUSH_BYTES = 64 * 1024
+
+
+def _flag(value):
+    return value is not None and value.lower() in ('true', '1', 't')
+
+
+@export_bp.route('', methods=['GET'])
+@read_only
+def export_messages():
+    """대화 기록을 NDJSON으로 스트리밍합니다.
+
+    필터: user_id, session_id, since, until (메시지 timestamp 기준, ISO 8601)
+    옵션: include_vector=true (벡터 포함), vector_format=list|base64, gzip=true|false (기본값은 Accept-Encoding을 따름)
+    세션이 바뀔 때마다 {"type": "session"} 줄을, 이어서 {"type": "message"} 줄을 출력합니다.
+    서버 사이드 커서(yield_per)로 읽으므로 결과 크기와 관계없이 메모리 사용량이 일정합니다.
+    """
+    try:
+        user_id = parse_uuid(request.args.get('user_id'), 'user_id')
+        session_id = parse_uuid(request.args.get('session_id'), 'session_id')
+        since = parse_datetime(request.args.get('since'), 'since')
+        until = parse_datetime(request.args.get('until'), 'until')
+    except ValueError as e:
+        return jsonify({'status': 'error', 'error': str(e)}), 400
+
+    include_vector = _flag(request.args.get('include_vector'))
+    vector_format = request.args.get('vector_format', 'list')
+    if vector_format not in ('list', 'base64'):
+        return jsonify({'status': 'error', 'error': 'vector_format은 list 또는 base64여야 합니다'}), 400
+    fields = DEFAULT_MESSAGE_FIELDS + ('vector',) if include_vector else DEFAULT_MESSAGE_FIELDS
+    if 'gzip' in request.args:
+        use_gzip = _flag(request.args.get('gzip'))
+    else:
+        use_gzip = 'gzip' in request.accept_encodings
+
+    columns = [
+        Message.id, Message.session_id, Message.user_id, Message.content,
+        Message.role, Message.timestamp,
+        Session.user_id.label('session_user_id'), Session.title, Session.description,
+        Session.start_at, Session.finish_at
+    ]
+    if include_vector:
+        columns.append(Message.vector)
+    query = select(*columns).join(Session, Session.id == Message.session_id)
+    if user_id:
+        query = query.where(Message.user_id == user_id)
+    if session_id:
+        query = query.where(Message.session_id == session_id)
+    if since:
+        query = query.where(Message.timestamp >= since)
+    if until:
+        query = query.where(Message.timestamp < until)
+    query = (query.order_by(Message.session_id, Message.timestamp, Message.id)
+             .execution_options(yield_per=current_app.config['EXPORT_BATCH_SIZE']))
+
+    def lines():
+        result = db.session.execute(query)
+        current_session = None
+        try:
+            for row in result:
+                if row.session_id != current_session:
+                    current_session = row.session_id
+                    yield {
+                        'type': 'session',
+                        'id': str(row.session_id),
+                        'user_id': str(row.session_user_id),
+                        'title': row.title,
+                        'description': row.description,
+                        'start_at': row.start_at.isoformat(),
+                        'finish_at': row.finish_at.isoformat() if row.finish_at is not None else None
+                    }
+                yield {'type': 'message', **serialize_message(row, fields, vector_format)}
+        finally:
+            result.close()
+            db.session.rollback()
+
+    dumps = current_app.json.dumps
+
+    def generate():
+        compressor = zlib.compressobj(6, zlib.DEFLATED, 31) if use_gzip else None
+        buffer = []
+        size = 0
+        for record in lines():
+            line = (dumps(record) + '\n').encode('utf-8')
+            buffer.append(line)
+            size += len(line)
+            if size >= FLUSH_BYTES:
+                data = b''.join(buffer)
+                buffer, size = [], 0
+                data = compressor.compress(data) if compressor else data
+                if data:
+                    yield data
+        data = b''.join(buffer)
+        if compressor:
+            data = compressor.compress(data) + compressor.flush()
+        if data:
+            yield data
+
+    headers = {'Content-Disposition': 'attachment; filename="export.ndjson"'}
+    if use_gzip:
+        headers['Content-Encoding'] = 'gzip'
+        headers['Vary'] = 'Accept-Encoding'
+    return Response(stream_with_context(generate()), mimetype='application/x-ndjson', headers=headers)
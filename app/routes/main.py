@@ -1,4 +1,7 @@
-from flask import Blueprint, jsonify
+from flask import Blueprint, Response, current_app, jsonify
+from app.utils.entity_cache import user_cache
+from app.utils.metrics import REGISTRY
+from app.utils.openai_client import completion_cache
 
 bp = Blueprint('main', __name__)
 
@@ -7,4 +10,19 @@ def index():
     return jsonify({
         'status': 'success',
         'message': 'Welcome to Seobi API'
-    }) 
\ No newline at end of file
+    })
+
+@bp.route('/stats/cache')
+def cache_stats():
+    return jsonify({
+        'status': 'success',
+        'completion_cache': completion_cache.stats(),
+        'entity_cache': {'user': user_cache.stats()}
+    })
+
+@bp.route('/metrics')
+def metrics():
+    """Prometheus 수집용 지표 (워커 프로세스별로 집계됩니다)"""
+    if not current_app.config['METRICS_ENABLED']:
+        return jsonify({'status': 'error', 'error': 'Metrics are disabled'}), 404
+    return Response(REGISTRY.render(), content_type='text/plain; version=0.0.4; charset=utf-8')
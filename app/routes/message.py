@@ -1,8 +1,41 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, request, jsonify, Response, current_app, stream_with_context
+from sqlalchemy import Float, Numeric, cast, func, text
+from sqlalchemy.orm import defer
 from app.models import Message, Session, db
-from app.utils.openai_client import get_openai_client, get_completion
+from app.models.db import read_only
+from app.utils.openai_client import (
+    UsageRecord, get_openai_client, get_completion, get_completion_stream, get_embeddings
+)
+from app.utils.chat import prepare_turn, save_assistant_message, save_turn
+from app.utils.ingest import BulkIngest, iter_ndjson
+from app.utils.pagination import keyset_paginate, parse_limit, parse_datetime, parse_uuid
+from app.utils.scheduler import SchedulerRejected
+from app.utils.serializers import message_options, serialize_message
+from app.utils.text_search import TRIGRAM_MIN_CHARS, like_pattern, make_snippet, parse_terms
+from itertools import islice
+import logging
+import math
 
 message_bp = Blueprint('message', __name__)
+logger = logging.getLogger(__name__)
+
+def parse_stream_flag(flag, accept_best=None):
+    """`stream` 값(쿼리 문자열 또는 JSON)과 Accept 헤더로 스트리밍(SSE) 여부를 판단합니다."""
+    if isinstance(flag, str):
+        flag = flag.lower() in ('true', '1', 't')
+    return bool(flag) or accept_best == 'text/event-stream'
+
+
+def wants_stream(data):
+    """요청이 스트리밍(SSE) 응답을 원하는지 확인합니다."""
+    return parse_stream_flag(request.args.get('stream', data.get('stream', False)),
+                             request.accept_mimetypes.best)
+
+
+def sse_event(event, payload):
+    """Server-Sent Events 형식의 이벤트 문자열을 만듭니다."""
+    return f"event: {event}\ndata: {current_app.json.dumps(payload)}\n\n"
+
 
 @message_bp.route('', methods=['POST'])
 def create_message():
@@ -16,8 +49,8 @@ def create_message():
     role = data.get('role', 'user')
 
     # 세션 종료 여부 체크
-    session = Session.query.get(session_id)
-    if session and session.finish_at:
+    finish_at = db.session.query(Session.finish_at).filter(Session.id == session_id).scalar()
+    if finish_at:
         return jsonify({'status': 'error', 'error': '종료된 세션에는 메시지를 추가할 수 없습니다.'}), 400
 
     message = Message(session_id=session_id, user_id=user_id, content=content, role=role)
@@ -25,47 +58,225 @@ def create_message():
     db.session.commit()
     return jsonify({
         'status': 'success',
-        'message': {
-            'id': str(message.id),
-            'session_id': str(message.session_id),
-            'user_id': str(message.user_id),
-            'content': message.content,
-            'role': message.role,
-            'timestamp': message.timestamp.isoformat(),
-            'vector': list(message.vector) if message.vector else None
-        }
+        'message': serialize_message(message)
     }), 201
 
+@message_bp.route('/bulk', methods=['POST'])
+def bulk_create_messages():
+    """여러 세션의 메시지를 한 번에 저장합니다.
+
+    본문: JSON 배열(또는 {"messages": [...]}) 또는 NDJSON(Content-Type: application/x-ndjson)
+    `?method=copy`를 주면 다중 행 INSERT 대신 PostgreSQL COPY를 사용합니다.
+    행별 오류는 입력 순서 기준 index와 함께 errors로 반환합니다.
+    """
+    max_rows = current_app.config['BULK_INGEST_MAX_ROWS']
+    truncated = False
+    try:
+        ingest = BulkIngest(
+            method=request.args.get('method', current_app.config['BULK_INGEST_METHOD']),
+            chunk_size=current_app.config['BULK_INGEST_CHUNK_SIZE'],
+            max_errors=current_app.config['BULK_INGEST_MAX_ERRORS']
+        )
+        if request.mimetype in ('application/x-ndjson', 'application/jsonl'):
+            # 전체 본문을 메모리에 올리지 않고 줄 단위로 읽으며 청크마다 저장합니다
+            records = iter_ndjson(request.stream)
+        else:
+            data = request.get_json(silent=True)
+            if isinstance(data, dict):
+                data = data.get('messages')
+            if not isinstance(data, list):
+                raise ValueError('메시지 배열이 필요합니다')
+            if len(data) > max_rows:
+                return jsonify({'status': 'error', 'error': f'한 번에 최대 {max_rows}개까지 저장할 수 있습니다'}), 413
+            records = enumerate(data)
+    except ValueError as e:
+        return jsonify({'status': 'error', 'error': str(e)}), 400
+
+    records = iter(records)
+    ingest.run(islice(records, max_rows))
+    if next(records, None) is not None:
+        truncated = True
+
+    return jsonify({
+        'status': 'success' if ingest.inserted else 'error',
+        'inserted': ingest.inserted,
+        'failed': ingest.failed,
+        'truncated': truncated,
+        'errors': ingest.errors
+    }), 201 if ingest.inserted else 400
+
 @message_bp.route('', methods=['GET'])
+@read_only
 def get_messages():
-    messages = Message.query.order_by(Message.timestamp.desc()).all()
+    """메시지 목록을 최신순으로 조회합니다.
+
+    필터: session_id, user_id, role, since, until (ISO 8601)
+    페이지네이션: limit, cursor (응답의 next_cursor를 그대로 전달)
+    """
+    try:
+        options = message_options()
+        limit = parse_limit()
+        query = Message.query
+        if 'vector' not in options['fields']:
+            query = query.options(defer(Message.vector))
+        session_id = parse_uuid(request.args.get('session_id'), 'session_id')
+        if session_id:
+            query = query.filter(Message.session_id == session_id)
+        user_id = parse_uuid(request.args.get('user_id'), 'user_id')
+        if user_id:
+            query = query.filter(Message.user_id == user_id)
+        role = request.args.get('role')
+        if role:
+            if role not in ('user', 'assistant'):
+                raise ValueError('role은 user 또는 assistant여야 합니다')
+            query = query.filter(Message.role == role)
+        since = parse_datetime(request.args.get('since'), 'since')
+        if since:
+            query = query.filter(Message.timestamp >= since)
+        until = parse_datetime(request.args.get('until'), 'until')
+        if until:
+            query = query.filter(Message.timestamp < until)
+
+        messages, next_cursor = keyset_paginate(
+            query, [Message.timestamp, Message.id], limit, request.args.get('cursor'))
+    except ValueError as e:
+        return jsonify({'status': 'error', 'error': str(e)}), 400
+
+    return jsonify({
+        'status': 'success',
+        'next_cursor': next_cursor,
+        'messages': [serialize_message(m, **options) for m in messages]
+    })
+
+@message_bp.route('/search', methods=['GET'])
+@read_only
+def search_messages():
+    """메시지를 검색합니다.
+
+    - mode=semantic (기본): 질의와 의미가 가까운 메시지를 top-k로 검색합니다. 파라미터: q (필수), k, user_id, session_id
+    - mode=lexical: 검색어가 포함된 메시지를 찾습니다 (lexical_search 참고)
+    """
+    q = request.args.get('q', '').strip()
+    if not q:
+        return jsonify({'status': 'error', 'error': '검색어(q)가 필요합니다'}), 400
+    mode = request.args.get('mode', 'semantic')
+    if mode == 'lexical':
+        return lexical_search(q)
+    if mode != 'semantic':
+        return jsonify({'status': 'error', 'error': 'mode는 semantic 또는 lexical이어야 합니다'}), 400
+    try:
+        k = int(request.args.get('k', current_app.config['SEARCH_DEFAULT_K']))
+        if k < 1:
+            raise ValueError('k는 1 이상이어야 합니다')
+        k = min(k, current_app.config['SEARCH_MAX_K'])
+        user_id = parse_uuid(request.args.get('user_id'), 'user_id')
+        session_id = parse_uuid(request.args.get('session_id'), 'session_id')
+        options = message_options()
+    except ValueError as e:
+        return jsonify({'status': 'error', 'error': str(e)}), 400
+
+    try:
+        query_vector = get_embeddings(get_openai_client(), [q])[0]
+
+        distance = Message.vector.cosine_distance(query_vector)
+        query = db.session.query(Message, distance.label('distance')).filter(Message.vector.isnot(None))
+        if user_id:
+            query = query.filter(Message.user_id == user_id)
+        if session_id:
+            query = query.filter(Message.session_id == session_id)
+
+        # 범위 필터가 있으면 HNSW 후보가 걸러지므로 탐색 폭을 넓혀 k개를 채웁니다
+        ef_search = max(current_app.config['SEARCH_EF_SEARCH'], k)
+        db.session.execute(text(f'SET LOCAL hnsw.ef_search = {int(ef_search)}'))
+        results = query.order_by(distance).limit(k).all()
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'status': 'error', 'error': str(e)}), 500
+
     return jsonify({
         'status': 'success',
-        'messages': [{
-            'id': str(m.id),
-            'session_id': str(m.session_id),
-            'user_id': str(m.user_id),
-            'content': m.content,
-            'role': m.role,
-            'timestamp': m.timestamp.isoformat(),
-            'vector': list(m.vector) if m.vector else None
-        } for m in messages]
+        'messages': [
+            {**serialize_message(m, **options), 'score': 1 - distance}
+            for m, distance in results
+        ]
     })
 
+def lexical_search(q):
+    """검색어가 모두 포함된 메시지를 관련도순으로 검색합니다 (pg_trgm GIN 인덱스).
+
+    검색어는 공백으로 나눈 단어마다 대소문자 구분 없이 부분 일치로 찾으므로 조사가 붙은 한국어도 찾습니다.
+    일치한 메시지 중 최신 SEARCH_LEXICAL_MAX_CANDIDATES개 안에서 단어 유사도(word_similarity)로 정렬합니다.
+    파라미터: q (필수), user_id, session_id, since, until, limit, cursor (응답의 next_cursor를 그대로 전달)
+    각 결과에는 score, snippet(일치 위치 주변 내용), highlights(snippet 안의 일치 구간 [start, end))가 붙습니다.
+    """
+    try:
+        terms = parse_terms(q)
+        limit = parse_limit()
+        options = message_options()
+        user_id = parse_uuid(request.args.get('user_id'), 'user_id')
+        session_id = parse_uuid(request.args.get('session_id'), 'session_id')
+        since = parse_datetime(request.args.get('since'), 'since')
+        until = parse_datetime(request.args.get('until'), 'until')
+        if not (user_id or session_id) and all(len(t) < TRIGRAM_MIN_CHARS for t in terms):
+            # 2글자 이하 단어만으로는 트라이그램 인덱스를 쓸 수 없어 전체 메시지를 훑게 됩니다
+            raise ValueError(f'user_id나 session_id 없이 검색하려면 {TRIGRAM_MIN_CHARS}글자 이상인 단어가 필요합니다')
+    except ValueError as e:
+        return jsonify({'status': 'error', 'error': str(e)}), 400
+
+    try:
+        filters = [Message.content.ilike(like_pattern(t), escape='\\') for t in terms]
+        if user_id:
+            filters.append(Message.user_id == user_id)
+        if session_id:
+            filters.append(Message.session_id == session_id)
+        if since:
+            filters.append(Message.timestamp >= since)
+        if until:
+            filters.append(Message.timestamp < until)
+
+        # 흔한 단어도 일정한 비용으로 처리하도록 최신 후보만 점수를 매깁니다
+        # (점수는 커서에 그대로 담을 수 있도록 소수 4자리로 반올림한 float8입니다)
+        score = cast(func.round(cast(func.word_similarity(' '.join(terms), Message.content), Numeric), 4), Float)
+        candidates = (db.session.query(Message.id.label('id'), Message.timestamp.label('timestamp'),
+                                       score.label('score'))
+                      .filter(*filters)
+                      .order_by(Message.timestamp.desc(), Message.id.desc())
+                      .limit(current_app.config['SEARCH_LEXICAL_MAX_CANDIDATES'])
+                      .subquery())
+        query = db.session.query(Message, candidates.c.score).join(candidates, Message.id == candidates.c.id)
+        if 'vector' not in options['fields']:
+            query = query.options(defer(Message.vector))
+        results, next_cursor = keyset_paginate(
+            query, [candidates.c.score, candidates.c.timestamp, candidates.c.id], limit,
+            request.args.get('cursor'), key=lambda row: [row.score, row.Message.timestamp, row.Message.id])
+    except ValueError as e:
+        return jsonify({'status': 'error', 'error': str(e)}), 400
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'status': 'error', 'error': str(e)}), 500
+
+    width = current_app.config['SEARCH_SNIPPET_CHARS']
+    messages = []
+    for message, message_score in results:
+        snippet, highlights = make_snippet(message.content, terms, width)
+        messages.append({**serialize_message(message, **options), 'score': message_score,
+                         'snippet': snippet, 'highlights': highlights})
+    return jsonify({'status': 'success', 'next_cursor': next_cursor, 'messages': messages})
+
 @message_bp.route('/<uuid:message_id>', methods=['GET'])
+@read_only
 def get_message(message_id):
-    message = Message.query.get_or_404(message_id)
+    try:
+        options = message_options()
+    except ValueError as e:
+        return jsonify({'status': 'error', 'error': str(e)}), 400
+    query = Message.query
+    if 'vector' not in options['fields']:
+        query = query.options(defer(Message.vector))
+    message = query.get_or_404(message_id)
     return jsonify({
         'status': 'success',
-        'message': {
-            'id': str(message.id),
-            'session_id': str(message.session_id),
-            'user_id': str(message.user_id),
-            'content': message.content,
-            'role': message.role,
-            'timestamp': message.timestamp.isoformat(),
-            'vector': list(message.vector) if message.vector else None
-        }
+        'message': serialize_message(message, **options)
     })
 
 @message_bp.route('/<uuid:message_id>', methods=['PUT'])
@@ -77,15 +288,7 @@ def update_message(message_id):
     db.session.commit()
     return jsonify({
         'status': 'success',
-        'message': {
-            'id': str(message.id),
-            'session_id': str(message.session_id),
-            'user_id': str(message.user_id),
-            'content': message.content,
-            'role': message.role,
-            'timestamp': message.timestamp.isoformat(),
-            'vector': list(message.vector) if message.vector else None
-        }
+        'message': serialize_message(message)
     })
 
 @message_bp.route('/<uuid:message_id>', methods=['DELETE'])
@@ -97,70 +300,87 @@ def delete_message(message_id):
 
 @message_bp.route('/session/<uuid:session_id>', methods=['POST'])
 def create_completion(session_id):
-    """채팅 완성 API 엔드포인트"""
-    try:
-        session = Session.query.get_or_404(session_id)
-        data = request.json
-        if not data or 'content' not in data:
-            return jsonify({'status': 'error', 'error': '메시지가 필요합니다'}), 400
-
-        # 사용자 메시지 저장
-        user_message = Message(
-            session_id=session_id,
-            user_id=data.get('user_id'),
-            role='user',
-            content=data['content']
-        )
-        db.session.add(user_message)
-
-        # 이전 대화 기록 가져오기
-        history = [
-            {"role": msg.role, "content": msg.content}
-            for msg in session.messages
-        ]
-
-        # 시스템 메시지와 사용자 메시지 구성
-        messages = [
-            {"role": "system", "content": "당신은 도움이 되는 AI 어시스턴트입니다. 응답은 간결하고 명확하게 해주세요."},
-            *history,
-            {"role": "user", "content": data['content']}
-        ]
+    """채팅 완성 API 엔드포인트
 
-        # OpenAI 클라이언트 초기화 및 응답 생성
-        client = get_openai_client()
-        response = get_completion(client, messages)
+    `?stream=true` 또는 `Accept: text/event-stream` 요청 시 SSE로 응답 토큰을 스트리밍합니다.
+    운영 서버(asgi.py)에서는 같은 helper(app.utils.chat)를 쓰는 app.asgi가 이 요청을 처리합니다.
+    """
+    data = request.get_json(silent=True)
+    if not isinstance(data, dict) or 'content' not in data:
+        return jsonify({'status': 'error', 'error': '메시지가 필요합니다'}), 400
+    stream = wants_stream(data)
+    try:
+        prepared = prepare_turn(session_id, data, stream)
+        if prepared is None:
+            return jsonify({'status': 'error', 'error': '세션을 찾을 수 없습니다'}), 404
+        messages, user_message = prepared
+        if stream:
+            return stream_completion(session_id, data.get('user_id'), user_message, messages)
 
-        # AI 응답 저장
-        assistant_message = Message(
-            session_id=session_id,
-            user_id=data.get('user_id'),
-            role='assistant',
-            content=response
-        )
-        db.session.add(assistant_message)
-        db.session.commit()
+        usage = UsageRecord()
+        response = get_completion(get_openai_client(), messages,
+                                  use_cache=current_app.config['COMPLETION_CACHE_CHAT_ENABLED'], usage=usage)
+        payload = save_turn(session_id, data.get('user_id'), user_message, response, usage)
+        return jsonify({'status': 'success', 'messages': payload})
 
+    except SchedulerRejected as e:
+        # 호출 한도 초과로 큐에서 거부된 요청은 잠시 후 재시도하도록 503 + Retry-After로 응답합니다
         return jsonify({
-            'status': 'success',
-            'messages': {
-                'user_message': {
-                    'id': str(user_message.id),
-                    'content': user_message.content,
-                    'role': user_message.role,
-                    'timestamp': user_message.timestamp.isoformat()
-                },
-                'assistant_message': {
-                    'id': str(assistant_message.id),
-                    'content': assistant_message.content,
-                    'role': assistant_message.role,
-                    'timestamp': assistant_message.timestamp.isoformat()
-                }
-            }
-        })
-
+            'status': 'error',
+            'error': str(e)
+        }), 503, {'Retry-After': str(math.ceil(e.retry_after or 1))}
     except Exception as e:
-        db.session.rollback()
         return jsonify({
             'status': 'error',
             'error': str(e)
-        }), 500 
\ No newline at end of file
+        }), 500
+
+
+def stream_completion(session_id, user_id, user_payload, messages):
+    """OpenAI 스트리밍 응답을 SSE로 전달하고, 완료 후 AI 응답을 저장합니다.
+
+    이벤트 순서: `start`(사용자 메시지) → `delta`* → `done`(AI 응답) 또는 `error`.
+    클라이언트가 연결을 끊으면 업스트림 스트림을 닫고 그때까지 받은 내용을 저장합니다.
+    """
+    # 스트림이 닫힐 때(끝까지 받았거나 중간에 끊긴 경우 모두) 채워집니다
+    usage = UsageRecord()
+
+    def generate():
+        chunks = []
+        finished = False
+        deltas = None
+        try:
+            yield sse_event('start', {'user_message': user_payload})
+            deltas = get_completion_stream(get_openai_client(), messages,
+                                           use_cache=current_app.config['COMPLETION_CACHE_CHAT_ENABLED'], usage=usage)
+            for delta in deltas:
+                chunks.append(delta)
+                yield sse_event('delta', {'content': delta})
+
+            finished = True
+            assistant_payload = save_assistant_message(session_id, user_id, ''.join(chunks), usage)
+            yield sse_event('done', {'assistant_message': assistant_payload})
+        except GeneratorExit:
+            # 클라이언트 연결 종료: 더 이상 yield 하지 않고 정리만 합니다
+            raise
+        except Exception as e:
+            finished = True
+            yield sse_event('error', {'status': 'error', 'error': str(e)})
+        finally:
+            if deltas is not None:
+                deltas.close()
+            if not finished and chunks:
+                # 중간에 끊긴 응답도 대화 기록이 이어지도록 저장합니다
+                try:
+                    save_assistant_message(session_id, user_id, ''.join(chunks), usage)
+                except Exception:
+                    logger.exception("Error saving partial stream")
+
+    return Response(
+        stream_with_context(generate()),
+        mimetype='text/event-stream',
+        headers={
+            'Cache-Control': 'no-cache',
+            'X-Accel-Buffering': 'no'
+        }
+    )
\ No newline at end of file
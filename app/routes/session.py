@@ -1,11 +1,93 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, request, jsonify, current_app
 from app.models import Session, Message, db
-from app.utils.openai_client import get_openai_client, get_completion
+from app.models.db import read_only
+from app.utils.entity_cache import user_cache
+from app.utils.history_cache import history_cache
+from app.utils.pagination import keyset_paginate, parse_limit, parse_datetime, parse_uuid
+from app.utils.serializers import serialize_message, serialize_session, session_options
+from sqlalchemy import func, select, true
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import defer, selectinload
+from types import SimpleNamespace
+from app.workers.title_worker import provisional_title
+from app.workers.archive_worker import restore_session_messages
+import logging
+import math
 import re
-from app.models.user import User
 from datetime import datetime
 
 session_bp = Blueprint('session', __name__)
+logger = logging.getLogger(__name__)
+
+SESSION_INCLUDES = ('message_count', 'last_message', 'messages')
+TITLE_FIELDS = ('id', 'title', 'description', 'title_status')
+
+
+def parse_includes():
+    """`include` 쿼리 파라미터(쉼표 구분)를 읽습니다."""
+    value = request.args.get('include')
+    if not value:
+        return set()
+    includes = {i.strip() for i in value.split(',') if i.strip()}
+    unknown = includes - set(SESSION_INCLUDES)
+    if unknown:
+        raise ValueError(f"알 수 없는 include 옵션입니다: {', '.join(sorted(unknown))}")
+    return includes
+
+
+def session_query(includes):
+    """include 옵션에 맞춰 집계 컬럼을 붙인 세션 조회 쿼리를 만듭니다.
+
+    메시지 수는 상관 서브쿼리, 마지막 메시지는 LATERAL JOIN(세션별 LIMIT 1)으로 계산해
+    세션 목록 한 번의 쿼리로 가져오고, 전체 메시지는 selectinload로 한 번에 불러옵니다.
+    반환값: (query, 추가 컬럼 여부)
+    """
+    query = db.session.query(Session).options(defer(Session.summary))
+    extra = False
+    if 'message_count' in includes:
+        message_count = (select(func.count(Message.id))
+                         .where(Message.session_id == Session.id)
+                         .correlate(Session)
+                         .scalar_subquery())
+        query = query.add_columns(message_count.label('message_count'))
+        extra = True
+    if 'last_message' in includes:
+        last = (select(Message.id, Message.session_id, Message.user_id,
+                       Message.content, Message.role, Message.timestamp)
+                .where(Message.session_id == Session.id)
+                .order_by(Message.timestamp.desc(), Message.id.desc())
+                .limit(1)
+                .correlate(Session)
+                .lateral('last_message'))
+        query = (query.outerjoin(last, true())
+                 .add_columns(*[c.label(f'last_message_{c.key}') for c in last.c]))
+        extra = True
+    if 'messages' in includes:
+        query = query.options(selectinload(Session.messages).defer(Message.vector))
+    return query, extra
+
+
+def serialize_session_row(row, includes, fields):
+    """session_query 결과 행을 include 옵션에 맞춰 직렬화합니다."""
+    session = row.Session if hasattr(row, '_mapping') else row
+    result = serialize_session(session, fields)
+    if 'message_count' in includes:
+        result['message_count'] = row.message_count
+    if 'last_message' in includes:
+        if row.last_message_id is None:
+            result['last_message'] = None
+        else:
+            result['last_message'] = serialize_message(SimpleNamespace(
+                id=row.last_message_id,
+                session_id=row.last_message_session_id,
+                user_id=row.last_message_user_id,
+                content=row.last_message_content,
+                role=row.last_message_role,
+                timestamp=row.last_message_timestamp
+            ))
+    if 'messages' in includes:
+        result['messages'] = [serialize_message(m) for m in session.messages]
+    return result
 
 def parse_title_and_description(response):
     """OpenAI 응답에서 타이틀과 설명을 추출합니다."""
@@ -34,40 +116,23 @@ def create_session():
         user_id = data['user_id']
         content = data['content']  # message를 content로 변경
         
-        # 사용자 확인
-        user = User.query.get(user_id)
+        # 사용자 확인 (캐시된 값이므로 다른 워커에서 방금 삭제된 사용자는 커밋할 때 외래 키 위반으로 확인됩니다)
+        user = user_cache.get(user_id)
         if not user:
             return jsonify({
                 'status': 'error',
                 'error': '사용자를 찾을 수 없습니다'
             }), 404
 
-        # 첫 메시지를 기반으로 세션 제목과 설명 생성
-        messages = [
-            {"role": "system", "content": "당신은 대화의 맥락을 이해하고 적절한 제목과 설명을 생성하는 AI 어시스턴트입니다."},
-            {"role": "user", "content": f"다음 대화의 제목과 설명을 생성해주세요. 제목은 20자 이내로, 설명은 100자 이내로 작성해주세요. 대화 내용: {content}"}
-        ]
-        
-        try:
-            client = get_openai_client()
-            response = get_completion(client, messages)
-            
-            # 응답에서 제목과 설명 추출
-            lines = response.strip().split('\n')
-            title = lines[0].replace('제목:', '').strip()
-            description = lines[1].replace('설명:', '').strip() if len(lines) > 1 else content[:100]
-            
-        except Exception as e:
-            print(f"OpenAI API 호출 중 오류 발생: {str(e)}")
-            # API 호출 실패 시 기본값 사용
-            title = content[:20]
-            description = content[:100]
+        # 제목/설명은 백그라운드에서 생성하고, 우선 첫 메시지로 임시 제목을 씁니다
+        title, description = provisional_title(content)
 
         # 세션 생성
         session = Session(
             user_id=user_id,
             title=title,
-            description=description
+            description=description,
+            title_status='pending'
         )
         db.session.add(session)
         db.session.flush()  # ID 생성을 위해 flush
@@ -82,79 +147,157 @@ def create_session():
         db.session.add(message)
         db.session.commit()
 
+        # 커밋 이후에 제출해야 워커가 세션 행을 볼 수 있습니다
+        current_app.extensions['title_worker'].submit(session.id, content)
+
         return jsonify({
             'status': 'success',
-            'data': {
-                'id': str(session.id),
-                'title': session.title,
-                'description': session.description,
-                'user_id': str(session.user_id),
-                'start_at': session.start_at.isoformat()
-            }
+            'data': serialize_session(session, ('id', 'title', 'description', 'title_status', 'user_id', 'start_at'))
         }), 201
 
+    except IntegrityError as e:
+        db.session.rollback()
+        # 캐시를 지우고 DB에서 다시 확인합니다
+        user_cache.invalidate(user_id)
+        if user_cache.get(user_id) is None:
+            return jsonify({
+                'status': 'error',
+                'error': '사용자를 찾을 수 없습니다'
+            }), 404
+        logger.exception("Error in create_session")
+        return jsonify({
+            'status': 'error',
+            'error': str(e)
+        }), 500
     except Exception as e:
         db.session.rollback()
-        print(f"Error in create_session: {str(e)}")
+        logger.exception("Error in create_session")
         return jsonify({
             'status': 'error',
             'error': str(e)
         }), 500
 
 @session_bp.route('', methods=['GET'])
+@read_only
 def get_sessions():
-    sessions = Session.query.order_by(Session.start_at.desc()).all()
+    """세션 목록을 최신순으로 조회합니다.
+
+    필터: user_id, status (open | finished), since, until (start_at 기준, ISO 8601)
+    페이지네이션: limit, cursor (응답의 next_cursor를 그대로 전달)
+    """
+    try:
+        options = session_options()
+        includes = parse_includes()
+        limit = parse_limit()
+        query, extra = session_query(includes)
+        user_id = parse_uuid(request.args.get('user_id'), 'user_id')
+        if user_id:
+            query = query.filter(Session.user_id == user_id)
+        status = request.args.get('status')
+        if status == 'open':
+            query = query.filter(Session.finish_at.is_(None))
+        elif status == 'finished':
+            query = query.filter(Session.finish_at.isnot(None))
+        elif status:
+            raise ValueError('status는 open 또는 finished여야 합니다')
+        since = parse_datetime(request.args.get('since'), 'since')
+        if since:
+            query = query.filter(Session.start_at >= since)
+        until = parse_datetime(request.args.get('until'), 'until')
+        if until:
+            query = query.filter(Session.start_at < until)
+
+        key = (lambda row: [row.Session.start_at, row.Session.id]) if extra else None
+        sessions, next_cursor = keyset_paginate(
+            query, [Session.start_at, Session.id], limit, request.args.get('cursor'), key=key)
+    except ValueError as e:
+        return jsonify({'status': 'error', 'error': str(e)}), 400
+
     return jsonify({
         'status': 'success',
-        'sessions': [{
-            'id': str(s.id),
-            'user_id': str(s.user_id),
-            'title': s.title,
-            'description': s.description,
-            'start_at': s.start_at.isoformat(),
-            'finish_at': s.finish_at.isoformat() if s.finish_at else None
-        } for s in sessions]
+        'next_cursor': next_cursor,
+        'sessions': [serialize_session_row(s, includes, **options) for s in sessions]
     })
 
 @session_bp.route('/<uuid:session_id>', methods=['GET'])
+@read_only
 def get_session(session_id):
-    session = Session.query.get_or_404(session_id)
+    try:
+        options = session_options()
+        includes = parse_includes()
+    except ValueError as e:
+        return jsonify({'status': 'error', 'error': str(e)}), 400
+    query, _ = session_query(includes)
+    row = query.filter(Session.id == session_id).first_or_404()
     return jsonify({
         'status': 'success',
-        'session': {
-            'id': str(session.id),
-            'user_id': str(session.user_id),
-            'title': session.title,
-            'description': session.description,
-            'start_at': session.start_at.isoformat(),
-            'finish_at': session.finish_at.isoformat() if session.finish_at else None
-        }
+        'session': serialize_session_row(row, includes, **options)
     })
 
+
+def parse_title_wait(value, max_wait):
+    """`wait` 쿼리 파라미터(초)를 읽어 [0, max_wait]로 맞춥니다. 유한한 숫자가 아니면 ValueError."""
+    wait = float(value)
+    if not math.isfinite(wait):
+        raise ValueError('wait는 숫자여야 합니다')
+    return min(max(wait, 0.0), max_wait)
+
+
+def load_title_status(session_id):
+    """세션 제목 생성 상태를 직렬화해 반환합니다. 세션이 없으면 None."""
+    row = (db.session.query(*[getattr(Session, f) for f in TITLE_FIELDS])
+           .filter(Session.id == session_id)
+           .one_or_none())
+    # long polling으로 반복 호출되므로 커넥션을 트랜잭션에 묶어두지 않습니다
+    db.session.rollback()
+    return serialize_session(row, TITLE_FIELDS) if row is not None else None
+
+
+@session_bp.route('/<uuid:session_id>/title', methods=['GET'])
+def get_session_title(session_id):
+    """세션 제목 생성 상태를 조회합니다.
+
+    `wait`(초)를 준 long polling은 운영 진입점(app.asgi)이 스레드를 점유하지 않고 비동기로 처리합니다.
+    Flask로 직접 실행하면(run.py) 기다리지 않고 현재 상태를 바로 반환합니다.
+    """
+    try:
+        parse_title_wait(request.args.get('wait', 0), current_app.config['TITLE_WAIT_MAX'])
+    except ValueError:
+        return jsonify({'status': 'error', 'error': 'wait는 숫자여야 합니다'}), 400
+
+    session = load_title_status(session_id)
+    if session is None:
+        return jsonify({'status': 'error', 'error': '세션을 찾을 수 없습니다'}), 404
+    return jsonify({'status': 'success', 'session': session})
+
 @session_bp.route('/<uuid:session_id>', methods=['PUT'])
 def update_session(session_id):
-    session = Session.query.get_or_404(session_id)
+    # 아카이브 작업과 겹치지 않도록 세션 행을 잠그고 최신 값을 읽습니다
+    session = Session.query.with_for_update().filter(Session.id == session_id).first_or_404()
     data = request.json
     session.title = data.get('title', session.title)
     session.description = data.get('description', session.description)
+    if 'title' in data or 'description' in data:
+        # 직접 지정한 제목을 백그라운드 생성 결과가 덮어쓰지 않도록 합니다
+        session.title_status = 'done'
     session.finish_at = data.get('finish_at', session.finish_at)
+    if session.finish_at is None and session.archived_at is not None:
+        # 다시 열린 세션은 대화가 이어지므로 메시지를 hot 파티션으로 되돌립니다
+        restore_session_messages(session)
+    if session.finish_at:
+        history_cache.evict_on_commit(session_id)
     db.session.commit()
     return jsonify({
         'status': 'success',
-        'session': {
-            'id': str(session.id),
-            'user_id': str(session.user_id),
-            'title': session.title,
-            'description': session.description,
-            'start_at': session.start_at.isoformat(),
-            'finish_at': session.finish_at.isoformat() if session.finish_at else None
-        }
+        'session': serialize_session(session)
     })
 
 @session_bp.route('/<uuid:session_id>', methods=['DELETE'])
 def delete_session(session_id):
-    session = Session.query.get_or_404(session_id)
-    db.session.delete(session)
+    # 메시지와 사용량 집계는 ON DELETE CASCADE로 DB에서 한 번에 지웁니다
+    if not Session.query.filter(Session.id == session_id).delete(synchronize_session=False):
+        return jsonify({'status': 'error', 'error': '세션을 찾을 수 없습니다'}), 404
+    history_cache.evict_on_commit(session_id)
     db.session.commit()
     return jsonify({'status': 'success'}), 204
 
@@ -164,5 +307,7 @@ def finish_session(session_id):
     if session.finish_at:
         return jsonify({'status': 'error', 'error': '이미 종료된 세션입니다.'}), 400
     session.finish_at = datetime.utcnow()
+    # 종료된 세션에는 더 이상 대화가 이어지지 않으므로 기록 캐시를 비웁니다
+    history_cache.evict_on_commit(session_id)
     db.session.commit()
     return jsonify({'status': 'success', 'finish_at': session.finish_at.isoformat()}) 
\ No newline at end of file
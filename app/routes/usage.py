@@ -0,0 +1,127 @@
+from datetime import datetime, timedelta, timezone
+from flask import Blueprint, request, jsonify
+from sqlalchemy import func
+from app.models import UsageDaily, UsageSession, db
+from app.models.db import read_only
+from app.utils.pagination import keyset_paginate, parse_date, parse_limit, parse_uuid
+
+usage_bp = Blueprint('usage', __name__)
+
+# 기간을 지정하지 않으면 최근 30일(UTC, 오늘 포함)을 조회합니다
+DEFAULT_DAYS = 30
+MAX_DAYS = 366
+
+
+def _totals(row):
+    return {
+        'requests': row.requests,
+        'prompt_tokens': row.prompt_tokens,
+        'completion_tokens': row.completion_tokens,
+        'total_tokens': row.total_tokens
+    }
+
+
+def _serialize_session_usage(row):
+    return {
+        'session_id': str(row.session_id),
+        'user_id': str(row.user_id),
+        **_totals(row),
+        'last_used_at': row.last_used_at.isoformat()
+    }
+
+
+@usage_bp.route('/users/<uuid:user_id>', methods=['GET'])
+@read_only
+def get_user_usage(user_id):
+    """사용자의 일별 토큰 사용량과 기간 합계를 조회합니다.
+
+    파라미터: since, until (YYYY-MM-DD, UTC 날짜, 둘 다 포함). 기본값은 최근 30일, 최대 366일입니다.
+    """
+    try:
+        until = parse_date(request.args.get('until'), 'until') or datetime.now(timezone.utc).date()
+        since = parse_date(request.args.get('since'), 'since') or until - timedelta(days=DEFAULT_DAYS - 1)
+        if since > until:
+            raise ValueError('since는 until보다 늦을 수 없습니다')
+        if (until - since).days >= MAX_DAYS:
+            raise ValueError(f'한 번에 최대 {MAX_DAYS}일까지 조회할 수 있습니다')
+    except ValueError as e:
+        return jsonify({'status': 'error', 'error': str(e)}), 400
+
+    rows = (UsageDaily.query
+            .filter(UsageDaily.user_id == user_id, UsageDaily.day >= since, UsageDaily.day <= until)
+            .order_by(UsageDaily.day)
+            .all())
+    return jsonify({
+        'status': 'success',
+        'user_id': str(user_id),
+        'since': since.isoformat(),
+        'until': until.isoformat(),
+        'totals': {
+            name: sum(getattr(row, name) for row in rows)
+            for name in ('requests', 'prompt_tokens', 'completion_tokens', 'total_tokens')
+        },
+        'daily': [{'day': row.day.isoformat(), **_totals(row)} for row in rows]
+    })
+
+
+@usage_bp.route('/daily', methods=['GET'])
+@read_only
+def get_daily_usage():
+    """하루(UTC) 동안 토큰을 많이 쓴 사용자 순으로 조회합니다.
+
+    파라미터: day (YYYY-MM-DD, 기본값 오늘), limit, cursor (응답의 next_cursor를 그대로 전달)
+    """
+    try:
+        day = parse_date(request.args.get('day'), 'day') or datetime.now(timezone.utc).date()
+        limit = parse_limit()
+        rows, next_cursor = keyset_paginate(
+            UsageDaily.query.filter(UsageDaily.day == day),
+            [UsageDaily.total_tokens, UsageDaily.user_id], limit, request.args.get('cursor'))
+    except ValueError as e:
+        return jsonify({'status': 'error', 'error': str(e)}), 400
+
+    total = (db.session.query(func.coalesce(func.sum(UsageDaily.total_tokens), 0))
+             .filter(UsageDaily.day == day)
+             .scalar())
+    return jsonify({
+        'status': 'success',
+        'day': day.isoformat(),
+        'total_tokens': int(total),
+        'next_cursor': next_cursor,
+        'users': [{'user_id': str(row.user_id), **_totals(row)} for row in rows]
+    })
+
+
+@usage_bp.route('/sessions', methods=['GET'])
+@read_only
+def get_sessions_usage():
+    """토큰을 많이 쓴 세션 순으로 누적 사용량을 조회합니다.
+
+    파라미터: user_id, limit, cursor (응답의 next_cursor를 그대로 전달)
+    """
+    try:
+        limit = parse_limit()
+        query = UsageSession.query
+        user_id = parse_uuid(request.args.get('user_id'), 'user_id')
+        if user_id:
+            query = query.filter(UsageSession.user_id == user_id)
+        rows, next_cursor = keyset_paginate(
+            query, [UsageSession.total_tokens, UsageSession.session_id], limit, request.args.get('cursor'))
+    except ValueError as e:
+        return jsonify({'status': 'error', 'error': str(e)}), 400
+
+    return jsonify({
+        'status': 'success',
+        'next_cursor': next_cursor,
+        'sessions': [_serialize_session_usage(row) for row in rows]
+    })
+
+
+@usage_bp.route('/sessions/<uuid:session_id>', methods=['GET'])
+@read_only
+def get_session_usage(session_id):
+    """세션의 누적 토큰 사용량을 조회합니다."""
+    row = db.session.get(UsageSession, session_id)
+    if row is None:
+        return jsonify({'status': 'error', 'error': '세션의 사용량 기록이 없습니다'}), 404
+    return jsonify({'status': 'success', 'usage': _serialize_session_usage(row)})
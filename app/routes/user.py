@@ -1,5 +1,10 @@
 from flask import Blueprint, request, jsonify
-from app.models import User, db
+from app.models import Session, User, db
+from app.models.db import read_only
+from app.utils.entity_cache import user_cache
+from app.utils.history_cache import history_cache
+from app.utils.pagination import keyset_paginate, parse_limit
+from app.utils.serializers import serialize_user, user_options
 
 user_bp = Blueprint('user', __name__)
 
@@ -15,20 +20,30 @@ def create_user():
     user = User(username=username, email=email)
     db.session.add(user)
     db.session.commit()
-    return jsonify({'id': str(user.id), 'username': user.username, 'email': user.email}), 201
+    return jsonify(serialize_user(user)), 201
 
 @user_bp.route('', methods=['GET'])
+@read_only
 def get_users():
-    users = User.query.all()
-    return jsonify([
-        {'id': str(u.id), 'username': u.username, 'email': u.email}
-        for u in users
-    ])
+    # 응답 형식(배열)을 유지하기 위해 다음 페이지 커서는 X-Next-Cursor 헤더로 전달합니다
+    try:
+        options = user_options()
+        limit = parse_limit()
+        users, next_cursor = keyset_paginate(
+            User.query, [User.username], limit, request.args.get('cursor'), descending=False)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    response = jsonify([serialize_user(u, **options) for u in users])
+    if next_cursor:
+        response.headers['X-Next-Cursor'] = next_cursor
+    return response
 
 @user_bp.route('/<uuid:user_id>', methods=['GET'])
+@read_only
 def get_user(user_id):
     user = User.query.get_or_404(user_id)
-    return jsonify({'id': str(user.id), 'username': user.username, 'email': user.email})
+    return jsonify(serialize_user(user))
 
 @user_bp.route('/<uuid:user_id>', methods=['PUT'])
 def update_user(user_id):
@@ -40,12 +55,18 @@ def update_user(user_id):
         user.username = username
     if email:
         user.email = email
+    user_cache.invalidate_on_commit(user_id)
     db.session.commit()
-    return jsonify({'id': str(user.id), 'username': user.username, 'email': user.email})
+    return jsonify(serialize_user(user))
 
 @user_bp.route('/<uuid:user_id>', methods=['DELETE'])
 def delete_user(user_id):
-    user = User.query.get_or_404(user_id)
-    db.session.delete(user)
+    # 세션/메시지/사용량 집계는 ON DELETE CASCADE로 DB에서 한 번에 지우고, 캐시 무효화용 세션 ID만 읽습니다
+    session_ids = [row.id for row in db.session.query(Session.id).filter(Session.user_id == user_id)]
+    if not User.query.filter(User.id == user_id).delete(synchronize_session=False):
+        return jsonify({'error': 'user not found'}), 404
+    user_cache.invalidate_on_commit(user_id)
+    for session_id in session_ids:
+        history_cache.evict_on_commit(session_id)
     db.session.commit()
     return '', 204 
\ No newline at end of file
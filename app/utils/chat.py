@@ -0,0 +1,77 @@
+import uuid
+from datetime import datetime, timezone
+from app.models import Message, db
+from app.utils.context import build_context, load_session_state
+from app.utils.serializers import CHAT_MESSAGE_FIELDS, serialize_message
+from app.utils.usage import record_usage
+
+SYSTEM_PROMPT = "당신은 도움이 되는 AI 어시스턴트입니다. 응답은 간결하고 명확하게 해주세요."
+
+# 채팅 완성 API의 Flask 라우트(app.routes.message)와 ASGI 경로(app.asgi)가 함께 쓰는 DB 작업입니다.
+# 모두 앱 컨텍스트 안에서 호출하며, 실패하면 롤백한 뒤 예외를 그대로 올립니다.
+
+
+def prepare_turn(session_id, data, stream):
+    """채팅 한 턴의 프롬프트를 구성합니다. 세션이 없으면 None을 반환합니다.
+
+    반환값: (messages, user_message). 스트리밍이면 응답이 끊겨도 사용자 메시지가 남도록 먼저 저장하고
+    직렬화한 값을, 아니면 AI 응답과 함께 저장할 컬럼 값(dict)을 돌려줍니다.
+    LLM 응답을 기다리는 동안 트랜잭션을 열어 두지 않도록 요약 갱신은 여기서 커밋합니다.
+    """
+    try:
+        session = load_session_state(session_id)
+        if session is None:
+            return None
+        # 토큰 예산 안에서 요약 + 최근 대화로 프롬프트 구성 (새 메시지 추가 전에 읽어 중복을 막습니다)
+        messages = build_context(session, data['content'], SYSTEM_PROMPT)
+        user_message = {
+            'id': uuid.uuid4(),
+            'session_id': session_id,
+            'user_id': data.get('user_id'),
+            'role': 'user',
+            'content': data['content'],
+            'timestamp': datetime.now(timezone.utc)
+        }
+        if stream:
+            message = Message(**user_message)
+            db.session.add(message)
+            db.session.commit()
+            user_message = serialize_message(message, CHAT_MESSAGE_FIELDS)
+        else:
+            db.session.commit()
+        return messages, user_message
+    except Exception:
+        db.session.rollback()
+        raise
+
+
+def save_turn(session_id, user_id, user_message, content, usage):
+    """사용자 메시지, AI 응답, 토큰 사용량 집계를 한 트랜잭션으로 저장하고 직렬화해 반환합니다."""
+    try:
+        user = Message(**user_message)
+        assistant = Message(session_id=session_id, user_id=user_id, role='assistant', content=content,
+                            **usage.columns())
+        db.session.add_all([user, assistant])
+        record_usage(session_id, user_id, usage)
+        db.session.commit()
+        return {
+            'user_message': serialize_message(user, CHAT_MESSAGE_FIELDS),
+            'assistant_message': serialize_message(assistant, CHAT_MESSAGE_FIELDS)
+        }
+    except Exception:
+        db.session.rollback()
+        raise
+
+
+def save_assistant_message(session_id, user_id, content, usage):
+    """스트리밍이 끝났거나 중간에 끊긴 AI 응답과 토큰 사용량을 저장하고 직렬화해 반환합니다."""
+    try:
+        message = Message(session_id=session_id, user_id=user_id, role='assistant', content=content,
+                          **usage.columns())
+        db.session.add(message)
+        record_usage(session_id, user_id, usage)
+        db.session.commit()
+        return serialize_message(message, CHAT_MESSAGE_FIELDS)
+    except Exception:
+        db.session.rollback()
+        raise
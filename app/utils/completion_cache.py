@@ -0,0 +1,185 @@
+import hashlib
+import json
+import logging
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+def _normalize(text):
+    """유니코드 정규화 후 공백을 하나로 합칩니다."""
+    if text is None:
+        return ''
+    return ' '.join(unicodedata.normalize('NFC', text).split())
+
+
+def _hash(payload):
+    raw = json.dumps(payload, ensure_ascii=False, sort_keys=True, separators=(',', ':'))
+    return hashlib.sha256(raw.encode('utf-8')).hexdigest()
+
+
+class _Entry:
+    __slots__ = ('value', 'expires_at', 'prefix_key', 'text', 'embedding')
+
+    def __init__(self, value, expires_at, prefix_key, text):
+        self.value = value
+        self.expires_at = expires_at
+        self.prefix_key = prefix_key
+        self.text = text
+        self.embedding = None
+
+
+class CacheLookup:
+    """조회 결과와, 미스일 때 `store`에서 재사용할 키/임베딩을 담습니다."""
+    __slots__ = ('key', 'prefix_key', 'text', 'embedding', 'value', 'kind')
+
+    def __init__(self, key, prefix_key, text):
+        self.key = key
+        self.prefix_key = prefix_key
+        self.text = text
+        self.embedding = None
+        self.value = None
+        self.kind = None
+
+    @property
+    def hit(self):
+        return self.value is not None
+
+
+class CompletionCache:
+    """LLM 채팅 완성 응답 캐시 (TTL + LRU, 스레드 안전)
+
+    - exact: 정규화한 전체 프롬프트와 모델 파라미터의 해시가 같으면 재사용합니다.
+    - semantic (선택): 마지막 메시지를 제외한 프롬프트(시스템 지시, 이전 대화)가 같고
+      마지막 메시지 임베딩의 코사인 유사도가 `semantic_threshold` 이상이면 재사용합니다.
+      비교 대상이 있을 때만 임베딩을 요청하며, 새 프롬프트와 아직 임베딩이 없는
+      후보를 한 번의 요청으로 함께 임베딩합니다.
+    """
+
+    def __init__(self, max_entries=1000, ttl=3600, semantic_threshold=None, embed_fn=None):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.semantic_threshold = semantic_threshold
+        self.embed_fn = embed_fn
+        self._entries = OrderedDict()
+        self._prefixes = {}
+        self._lock = threading.Lock()
+        self._stats = {'exact_hits': 0, 'semantic_hits': 0, 'misses': 0,
+                       'evictions': 0, 'expirations': 0, 'semantic_errors': 0}
+
+    @property
+    def semantic_enabled(self):
+        return self.semantic_threshold is not None and self.embed_fn is not None
+
+    def _remove(self, key):
+        entry = self._entries.pop(key)
+        keys = self._prefixes.get(entry.prefix_key)
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self._prefixes[entry.prefix_key]
+        return entry
+
+    def _get_live(self, key, now):
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if entry.expires_at <= now:
+            self._remove(key)
+            self._stats['expirations'] += 1
+            return None
+        self._entries.move_to_end(key)
+        return entry
+
+    def lookup(self, messages, params):
+        """캐시를 조회합니다. 반환한 CacheLookup은 미스일 때 `store`에 그대로 넘깁니다."""
+        normalized = [{'role': m['role'], 'content': _normalize(m['content'])} for m in messages]
+        lookup = CacheLookup(
+            key=_hash({'params': params, 'messages': normalized}),
+            prefix_key=_hash({'params': params, 'messages': normalized[:-1]}),
+            text=normalized[-1]['content'] if normalized else ''
+        )
+
+        now = time.monotonic()
+        with self._lock:
+            entry = self._get_live(lookup.key, now)
+            if entry is not None:
+                self._stats['exact_hits'] += 1
+                lookup.value, lookup.kind = entry.value, 'exact'
+                return lookup
+            candidates = []
+            if self.semantic_enabled:
+                for key in list(self._prefixes.get(lookup.prefix_key, ())):
+                    candidate = self._get_live(key, now)
+                    if candidate is not None:
+                        candidates.append(candidate)
+
+        if candidates:
+            self._semantic_match(lookup, candidates)
+
+        with self._lock:
+            if lookup.hit:
+                self._stats['semantic_hits'] += 1
+            else:
+                self._stats['misses'] += 1
+        return lookup
+
+    def _semantic_match(self, lookup, candidates):
+        missing = [c for c in candidates if c.embedding is None]
+        try:
+            vectors = self.embed_fn([lookup.text] + [c.text for c in missing])
+        except Exception as e:
+            logger.warning("Error embedding prompt for semantic cache: %s", e)
+            with self._lock:
+                self._stats['semantic_errors'] += 1
+            return
+        vectors = [self._unit(v) for v in vectors]
+        lookup.embedding = vectors[0]
+        for candidate, vector in zip(missing, vectors[1:]):
+            candidate.embedding = vector
+
+        best, best_score = None, self.semantic_threshold
+        for candidate in candidates:
+            score = float(np.dot(lookup.embedding, candidate.embedding))
+            if score >= best_score:
+                best, best_score = candidate, score
+        if best is not None:
+            lookup.value, lookup.kind = best.value, 'semantic'
+
+    @staticmethod
+    def _unit(vector):
+        vector = np.asarray(vector, dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    def store(self, lookup, value):
+        """미스였던 조회 결과에 응답을 저장합니다."""
+        if not value:
+            return
+        entry = _Entry(value, time.monotonic() + self.ttl, lookup.prefix_key, lookup.text)
+        entry.embedding = lookup.embedding
+        with self._lock:
+            if lookup.key in self._entries:
+                self._remove(lookup.key)
+            self._entries[lookup.key] = entry
+            self._prefixes.setdefault(lookup.prefix_key, set()).add(lookup.key)
+            while len(self._entries) > self.max_entries:
+                self._remove(next(iter(self._entries)))
+                self._stats['evictions'] += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._prefixes.clear()
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+            stats['size'] = len(self._entries)
+        lookups = stats['exact_hits'] + stats['semantic_hits'] + stats['misses']
+        stats['hit_ratio'] = (stats['exact_hits'] + stats['semantic_hits']) / lookups if lookups else 0.0
+        return stats
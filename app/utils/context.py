@@ -0,0 +1,146 @@
+import logging
+from types import SimpleNamespace
+from app.config import Config
+from app.models import Session, db
+from app.utils.history_cache import history_cache
+from app.utils.openai_client import get_openai_client, get_completion
+
+try:
+    import tiktoken
+except ImportError:  # tiktoken이 없으면 바이트 길이 기반 추정치를 사용합니다
+    tiktoken = None
+
+logger = logging.getLogger(__name__)
+
+# 메시지 한 건마다 role/구분자로 추가되는 토큰 수 (OpenAI chat 포맷 기준 근사치)
+MESSAGE_OVERHEAD_TOKENS = 4
+
+SUMMARY_SYSTEM_PROMPT = "당신은 대화 내용을 빠짐없이 간결하게 요약하는 AI 어시스턴트입니다."
+
+_encoding = None
+_encoding_loaded = False
+
+
+def _get_encoding():
+    global _encoding, _encoding_loaded
+    if not _encoding_loaded:
+        _encoding_loaded = True
+        if tiktoken is not None:
+            try:
+                _encoding = tiktoken.get_encoding(Config.CONTEXT_TOKENIZER)
+            except Exception as e:
+                logger.warning("tiktoken 인코딩 로드 실패, 추정치를 사용합니다: %s", e)
+    return _encoding
+
+
+def count_tokens(text):
+    """텍스트의 토큰 수를 로컬에서 계산합니다."""
+    if not text:
+        return 0
+    encoding = _get_encoding()
+    if encoding is None:
+        # 한글은 글자당 약 1토큰(UTF-8 3바이트), 영어는 4글자당 약 1토큰이므로 보수적으로 추정합니다
+        return len(text.encode('utf-8')) // 3 + 1
+    return len(encoding.encode(text, disallowed_special=()))
+
+
+def count_message_tokens(message):
+    return count_tokens(message['content']) + MESSAGE_OVERHEAD_TOKENS
+
+
+def _summary_message(summary):
+    return {"role": "system", "content": f"지금까지의 대화 요약:\n{summary}"}
+
+
+def _split_recent(history, budget):
+    """최근 메시지부터 budget 안에 들어가는 만큼 남기고 (older, recent)로 나눕니다."""
+    used = 0
+    index = len(history)
+    while index > 0:
+        tokens = count_message_tokens(history[index - 1])
+        if used + tokens > budget:
+            break
+        used += tokens
+        index -= 1
+    return history[:index], history[index:]
+
+
+def summarize(previous_summary, messages):
+    """기존 요약에 새로 밀려난 대화만 합쳐 갱신된 요약을 생성합니다."""
+    transcript = "\n".join(f"{m['role']}: {m['content']}" for m in messages)
+    prompt = (
+        f"기존 요약과 이어지는 대화를 합쳐 하나의 요약으로 갱신해주세요. "
+        f"중요한 사실, 사용자의 요청과 결정 사항을 유지하고 "
+        f"{Config.CONTEXT_SUMMARY_MAX_TOKENS}토큰 이내로 작성해주세요.\n\n"
+        f"기존 요약:\n{previous_summary or '(없음)'}\n\n"
+        f"이어지는 대화:\n{transcript}"
+    )
+    return get_completion(get_openai_client(), [
+        {"role": "system", "content": SUMMARY_SYSTEM_PROMPT},
+        {"role": "user", "content": prompt}
+    ], max_completion_tokens=Config.CONTEXT_SUMMARY_MAX_TOKENS, use_cache=True)
+
+
+def load_session_state(session_id):
+    """채팅 턴에 필요한 세션 상태(종료 여부, 누적 요약)를 DB에서 읽습니다. 세션이 없으면 None.
+
+    다른 워커가 방금 요약을 갱신했거나 세션을 종료했을 수 있으므로 프로세스 로컬 캐시를 쓰지 않습니다.
+    """
+    row = (db.session.query(Session.id, Session.user_id, Session.finish_at,
+                            Session.summary, Session.summary_until, Session.summary_until_id)
+           .filter(Session.id == session_id)
+           .one_or_none())
+    return SimpleNamespace(**row._mapping) if row is not None else None
+
+
+def build_context(session, content, system_prompt):
+    """토큰 예산(CONTEXT_TOKEN_BUDGET) 안에서 모델에 보낼 메시지 목록을 구성합니다.
+
+    최근 대화는 원문 그대로 유지하고, 예산을 넘는 오래된 대화는 세션의 누적 요약
+    (`Session.summary`)에 합칩니다. 요약은 새로 밀려난 메시지만 더해 점진적으로 갱신하며,
+    한 번 요약할 때 예산의 CONTEXT_KEEP_RATIO까지 줄여 매 턴마다 요약하지 않도록 합니다.
+    `session`은 `load_session_state`로 읽은 세션 상태입니다. 요약해야 하면 LLM을 기다리는 동안 커넥션을
+    트랜잭션에 묶어두지 않도록 읽기 트랜잭션을 롤백하므로, 호출하기 전에 저장하지 않은 변경이 없어야 합니다.
+    요약 갱신은 새 트랜잭션의 UPDATE 문으로 기록되어 호출한 쪽의 커밋과 함께 저장되며,
+    그 사이 다른 요청이 요약을 먼저 갱신했으면 덮어쓰지 않습니다.
+    """
+    system_message = {"role": "system", "content": system_prompt}
+    user_message = {"role": "user", "content": content}
+    # 요약에 아직 포함되지 않은 메시지 (세션별 대화 기록 캐시에서 이어 읽습니다)
+    history = history_cache.load(session)
+
+    fixed_tokens = count_message_tokens(system_message) + count_message_tokens(user_message)
+    if session.summary:
+        fixed_tokens += count_message_tokens(_summary_message(session.summary))
+    available = max(0, Config.CONTEXT_TOKEN_BUDGET - fixed_tokens)
+
+    older, recent = _split_recent(history, available)
+    if older:
+        folded, kept = _split_recent(history, int(available * Config.CONTEXT_KEEP_RATIO))
+        db.session.rollback()
+        try:
+            summary = summarize(session.summary, folded)
+            # 같은 시각의 메시지 중 일부만 요약될 수 있으므로 경계는 (timestamp, id)로 기록합니다
+            summary_until, summary_until_id = folded[-1]['timestamp'], folded[-1]['id']
+            # 읽은 뒤 다른 요청이 요약을 바꿨으면 (경계가 다르면) 더 최신인 쪽을 남깁니다
+            updated = (Session.query
+                       .filter(Session.id == session.id,
+                               Session.summary_until.is_not_distinct_from(session.summary_until),
+                               Session.summary_until_id.is_not_distinct_from(session.summary_until_id))
+                       .update({'summary': summary, 'summary_until': summary_until,
+                                'summary_until_id': summary_until_id},
+                               synchronize_session=False))
+            if not updated:
+                logger.info("Session %s summary was updated concurrently, keeping the newer one", session.id)
+            session.summary, session.summary_until, session.summary_until_id = summary, summary_until, summary_until_id
+            recent = kept
+        except Exception as e:
+            # 요약에 실패해도 이번 턴은 예산 안의 최근 대화만으로 진행합니다
+            logger.warning("Error updating session summary: %s", e)
+
+    messages = [system_message]
+    if session.summary:
+        messages.append(_summary_message(session.summary))
+    messages.extend({"role": m['role'], "content": m['content']} for m in recent)
+    messages.append(user_message)
+    return messages
@@ -0,0 +1,205 @@
+import json
+import logging
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from datetime import datetime
+from types import SimpleNamespace
+from app.config import Config
+from app.models import User, db
+from app.models.db import on_commit
+from app.utils.metrics import Counter, GaugeCallback
+
+logger = logging.getLogger(__name__)
+
+ENTITY_CACHE_REQUESTS = Counter(
+    'entity_cache_requests_total', '엔티티 캐시 조회 수 (result: hit | miss)', ('entity', 'result'))
+
+
+class LocalBackend:
+    """프로세스 내 TTL + LRU 저장소 (스레드 안전)"""
+
+    def __init__(self, max_entries=10000):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            item = self._entries.get(key)
+            if item is None:
+                return None
+            value, expires_at = item
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value, ttl):
+        with self._lock:
+            self._entries[key] = (value, time.monotonic() + ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def size(self):
+        with self._lock:
+            return len(self._entries)
+
+
+def _encode(value):
+    if isinstance(value, uuid.UUID):
+        return {'__uuid__': str(value)}
+    if isinstance(value, datetime):
+        return {'__datetime__': value.isoformat()}
+    raise TypeError(f'{type(value).__name__} 값은 캐시에 저장할 수 없습니다')
+
+
+def _decode(obj):
+    if '__uuid__' in obj:
+        return uuid.UUID(obj['__uuid__'])
+    if '__datetime__' in obj:
+        return datetime.fromisoformat(obj['__datetime__'])
+    return obj
+
+
+def _dumps(value):
+    """캐시 값을 JSON으로 직렬화합니다 (UUID와 datetime은 태그를 붙인 문자열로 저장)."""
+    return json.dumps(value, default=_encode, ensure_ascii=False, separators=(',', ':'))
+
+
+def _loads(raw):
+    return json.loads(raw, object_hook=_decode)
+
+
+class RedisBackend:
+    """여러 워커 프로세스가 함께 쓰는 Redis 저장소. 무효화가 모든 워커에 바로 반영됩니다.
+
+    값은 JSON으로 저장하므로 Redis에 쓸 수 있는 쪽이 임의의 객체를 만들어 낼 수 없습니다.
+    Redis 오류나 읽을 수 없는 값은 캐시 미스로 처리해 요청이 DB 조회로 계속 진행되도록 합니다.
+    """
+
+    def __init__(self, url, prefix='seobi:entity:'):
+        import redis  # 공유 캐시를 쓸 때만 필요한 선택 의존성입니다
+        self._redis = redis.Redis.from_url(url, socket_timeout=0.5, socket_connect_timeout=0.5)
+        self.prefix = prefix
+
+    def get(self, key):
+        try:
+            raw = self._redis.get(self.prefix + key)
+        except Exception as e:
+            logger.warning("Entity cache get failed: %s", e)
+            return None
+        if raw is None:
+            return None
+        try:
+            return _loads(raw)
+        except ValueError as e:
+            logger.warning("Entity cache value for %s could not be decoded: %s", key, e)
+            return None
+
+    def set(self, key, value, ttl):
+        try:
+            self._redis.set(self.prefix + key, _dumps(value), px=int(ttl * 1000))
+        except Exception as e:
+            logger.warning("Entity cache set failed: %s", e)
+
+    def delete(self, key):
+        try:
+            self._redis.delete(self.prefix + key)
+        except Exception as e:
+            logger.warning("Entity cache delete failed: %s", e)
+
+    def size(self):
+        return None
+
+
+class EntityCache:
+    """기본 키로 조회하는 엔티티의 읽기 전용 스냅샷 캐시 (read-through)
+
+    ORM 객체 대신 컬럼 값만 담은 SimpleNamespace를 반환하므로 요청/스레드 간에 공유해도 안전합니다.
+    값을 바꾼 쪽은 `invalidate_on_commit`으로 커밋 후 항목을 지우고, 다른 워커의 로컬 캐시는
+    TTL이 지나면 다시 읽습니다 (즉시 일관성이 필요하면 Redis 백엔드를 사용).
+    없는 엔티티는 캐시하지 않습니다.
+    """
+
+    def __init__(self, name, model, columns, backend, ttl=60, enabled=True):
+        self.name = name
+        self.model = model
+        self.columns = columns
+        self.backend = backend
+        self.ttl = ttl
+        self.enabled = enabled
+        self._hits = 0
+        self._misses = 0
+
+    def _key(self, entity_id):
+        return f'{self.name}:{entity_id}'
+
+    @staticmethod
+    def _normalize(entity_id):
+        # 대소문자 등 표기가 달라도 같은 키를 쓰도록 UUID로 정규화합니다 (잘못된 값이면 ValueError)
+        return entity_id if isinstance(entity_id, uuid.UUID) else uuid.UUID(str(entity_id))
+
+    def get(self, entity_id):
+        """엔티티 스냅샷을 반환합니다. 없으면 None."""
+        if entity_id is None:
+            return None
+        entity_id = self._normalize(entity_id)
+        if self.enabled:
+            value = self.backend.get(self._key(entity_id))
+            if value is not None:
+                self._hits += 1
+                ENTITY_CACHE_REQUESTS.inc(entity=self.name, result='hit')
+                return SimpleNamespace(**value)
+            self._misses += 1
+            ENTITY_CACHE_REQUESTS.inc(entity=self.name, result='miss')
+
+        row = (db.session.query(*[getattr(self.model, c) for c in self.columns])
+               .filter(self.model.id == entity_id)
+               .one_or_none())
+        if row is None:
+            return None
+        value = dict(row._mapping)
+        if self.enabled:
+            self.backend.set(self._key(entity_id), value, self.ttl)
+        return SimpleNamespace(**value)
+
+    def invalidate(self, entity_id):
+        if self.enabled:
+            self.backend.delete(self._key(self._normalize(entity_id)))
+
+    def invalidate_on_commit(self, entity_id):
+        """현재 트랜잭션이 커밋된 뒤 항목을 지웁니다 (롤백되면 취소)."""
+        on_commit(self.invalidate, entity_id)
+
+    def stats(self):
+        total = self._hits + self._misses
+        return {
+            'enabled': self.enabled,
+            'backend': type(self.backend).__name__,
+            'size': self.backend.size(),
+            'hits': self._hits,
+            'misses': self._misses,
+            'hit_ratio': self._hits / total if total else None
+        }
+
+
+# 세션은 캐시하지 않습니다: 종료 여부와 누적 요약은 다른 워커가 방금 바꿨을 수 있어
+# 채팅 턴마다 DB에서 읽습니다 (app.utils.context.load_session_state)
+user_cache = EntityCache(
+    'user', User, ('id', 'username', 'email'),
+    RedisBackend(Config.ENTITY_CACHE_REDIS_URL) if Config.ENTITY_CACHE_REDIS_URL
+    else LocalBackend(Config.ENTITY_CACHE_MAX_ENTRIES),
+    ttl=Config.ENTITY_CACHE_TTL, enabled=Config.ENTITY_CACHE_ENABLED)
+
+GaugeCallback(
+    'entity_cache_hit_ratio', '프로세스 시작 이후 엔티티 캐시 적중률',
+    lambda: [({'entity': c.name}, c.stats()['hit_ratio'] or 0.0) for c in (user_cache,)]
+)
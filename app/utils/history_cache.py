@@ -0,0 +1,212 @@
+import uuid
+from sqlalchemy import event, inspect, tuple_
+from app.config import Config
+from app.models import Message, Session, db
+from app.models.db import RoutingSession, on_commit
+from app.utils.entity_cache import LocalBackend, RedisBackend
+from app.utils.metrics import Counter
+
+HISTORY_CACHE_REQUESTS = Counter(
+    'history_cache_requests_total', '세션 대화 기록 캐시 조회 수 (result: hit | partial | miss)', ('result',))
+
+HISTORY_COLUMNS = ('id', 'role', 'content', 'timestamp')
+# 이 컬럼이 바뀌면 캐시된 대화 기록이 달라집니다 (임베딩 벡터 갱신은 무관)
+_HISTORY_ATTRS = ('session_id', 'role', 'content', 'timestamp')
+
+
+# summary_until_id가 없는(이전에 저장된) 요약은 그 시각의 메시지를 모두 포함하므로 가장 큰 id로 비교합니다
+_MAX_ID = uuid.UUID(int=(1 << 128) - 1)
+
+
+def _sort_key(message):
+    return message['timestamp'], message['id']
+
+
+def summary_boundary(session):
+    """요약에 포함된 마지막 메시지의 (timestamp, id)를 반환합니다. 요약이 없으면 None."""
+    if session.summary_until is None:
+        return None
+    return session.summary_until, session.summary_until_id or _MAX_ID
+
+
+def _after(message, boundary):
+    return boundary is None or _sort_key(message) > boundary
+
+
+def _floor(entry):
+    # JSON으로 저장하면 튜플이 리스트로 돌아옵니다
+    return tuple(entry['floor']) if entry['floor'] is not None else None
+
+
+class HistoryCache:
+    """세션별 최근 대화 기록 캐시
+
+    항목은 `floor` 이후의 메시지를 빠짐없이 시간순으로 담습니다 (`floor`가 None이면 세션 전체).
+    최대 `max_messages`개를 넘으면 오래된 메시지부터 버리고 `floor`를 올립니다 (최근 대화만 담는 ring).
+    `floor`와 요약 시점은 (timestamp, id) 경계이며, 요약 시점이 `floor`보다 앞서면 그 사이의 메시지만
+    DB에서 읽어 앞에 붙입니다 (partial). 항목은 그대로 두므로 `load`는 항상 요약 시점 이후의 기록 전체를 돌려주고,
+    요약이 따라잡으면 다시 캐시만으로 채웁니다.
+
+    - ORM으로 저장한 메시지는 커밋 후 자동으로 덧붙이고, 수정/삭제되면 항목을 지웁니다.
+    - 조회할 때마다 마지막 메시지 이후 것만 가져오는 짧은 쿼리로 다른 워커가 저장한 메시지를 보충합니다.
+    - 다른 워커의 수정/삭제는 로컬 캐시에서 TTL까지 남을 수 있습니다 (공유 저장소를 쓰면 바로 반영).
+    - 항목에는 세션의 세대(generation) 값을 함께 저장하고, 지울 때 세대를 없애 새로 만들게 합니다.
+      지우기 전에 읽기 시작한 `load`/`append`가 뒤늦게 저장한 항목은 세대가 달라 다음 조회에서 버려집니다.
+    """
+
+    def __init__(self, backend, max_messages=100, ttl=1800, enabled=True):
+        self.backend = backend
+        self.max_messages = max_messages
+        self.ttl = ttl
+        self.enabled = enabled
+
+    @staticmethod
+    def _key(session_id):
+        # 문자열로 받은 세션 ID도 같은 키를 쓰도록 정규화합니다
+        return f'history:{uuid.UUID(str(session_id))}'
+
+    @staticmethod
+    def _generation_key(session_id):
+        return f'history-gen:{uuid.UUID(str(session_id))}'
+
+    @staticmethod
+    def _query(session_id, since=None, tail=None, until=None, hot_only=False):
+        """`since`((timestamp, id) 경계) 이후의 메시지를 읽습니다.
+
+        `tail`을 주면 그 시각(포함) 이후만, `until`((timestamp, id) 경계)을 주면 그 메시지(포함)까지만 읽습니다.
+        """
+        query = (db.session.query(*[getattr(Message, c) for c in HISTORY_COLUMNS])
+                 .filter(Message.session_id == session_id))
+        if hot_only:
+            # archive 파티션을 건너뛰도록 파티션 키 조건을 붙입니다
+            query = query.filter(Message.archived.is_(False))
+        if since is not None:
+            query = query.filter(tuple_(Message.timestamp, Message.id) > tuple_(*since))
+        if tail is not None:
+            query = query.filter(Message.timestamp >= tail)
+        if until is not None:
+            query = query.filter(tuple_(Message.timestamp, Message.id) <= tuple_(*until))
+        return [dict(row._mapping) for row in query.order_by(Message.timestamp, Message.id)]
+
+    def _generation(self, session_id, create=False):
+        """세션의 현재 세대 값을 반환합니다. 없으면 `create`일 때만 새로 만듭니다."""
+        generation = self.backend.get(self._generation_key(session_id))
+        if generation is None and create:
+            generation = uuid.uuid4().hex
+            self.backend.set(self._generation_key(session_id), generation, self.ttl)
+        return generation
+
+    def _get(self, session_id, generation):
+        entry = self.backend.get(self._key(session_id))
+        if entry is None or generation is None or entry.get('generation') != generation:
+            return None
+        return entry
+
+    def _store(self, session_id, generation, floor, messages):
+        if len(messages) > self.max_messages:
+            floor = _sort_key(messages[-self.max_messages - 1])
+            messages = messages[-self.max_messages:]
+        self.backend.set(self._key(session_id), {'generation': generation, 'floor': floor, 'messages': messages},
+                         self.ttl)
+
+    def load(self, session):
+        """요약에 아직 포함되지 않은 메시지(`summary_boundary` 이후)를 시간순으로 반환합니다."""
+        since = summary_boundary(session)
+        # 진행 중인 세션의 메시지는 아카이브되지 않습니다 (다시 열 때 hot 파티션으로 되돌림)
+        hot_only = session.finish_at is None
+        if not self.enabled:
+            return self._query(session.id, since, hot_only=hot_only)
+
+        # DB를 읽기 전에 세대를 확인해야 그 사이에 지워진 경우 저장한 항목이 무효가 됩니다
+        generation = self._generation(session.id, create=True)
+        entry = self._get(session.id, generation)
+        if entry is None:
+            HISTORY_CACHE_REQUESTS.inc(result='miss')
+            messages = self._query(session.id, since, hot_only=hot_only)
+            self._store(session.id, generation, since, messages)
+            return messages
+
+        # 로컬 저장소는 저장된 객체를 그대로 돌려주므로 항목을 고치지 않고 새로 만들어 저장합니다
+        floor, messages = _floor(entry), entry['messages']
+        last = messages[-1]['timestamp'] if messages else None
+        # 같은 시각의 메시지가 있을 수 있으므로 마지막 시각을 포함해 읽고 id로 중복을 거릅니다
+        known = {m['id'] for m in messages}
+        newer = [m for m in self._query(session.id, floor, tail=last, hot_only=hot_only)
+                 if m['id'] not in known]
+        changed = bool(newer)
+        if newer:
+            messages = sorted(messages + newer, key=_sort_key)
+        if since is not None and (floor is None or since > floor):
+            # 요약에 합쳐진 메시지는 다시 필요하지 않으므로 버립니다
+            messages = [m for m in messages if _after(m, since)]
+            floor = since
+            changed = True
+        if changed:
+            self._store(session.id, generation, floor, messages)
+
+        if floor is not None and (since is None or since < floor):
+            # ring에서 밀려났지만 아직 요약되지 않은 메시지는 DB에서 읽어 앞에 붙입니다
+            HISTORY_CACHE_REQUESTS.inc(result='partial')
+            return self._query(session.id, since, until=floor, hot_only=hot_only) + messages
+        HISTORY_CACHE_REQUESTS.inc(result='hit')
+        return messages
+
+    def append(self, session_id, messages):
+        """커밋된 메시지를 캐시된 기록에 덧붙입니다 (캐시에 없는 세션은 무시)."""
+        entry = self._get(session_id, self._generation(session_id))
+        if entry is None:
+            return
+        known = {m['id'] for m in entry['messages']}
+        added = [m for m in messages if m['id'] not in known and _after(m, _floor(entry))]
+        if added:
+            self._store(session_id, entry['generation'], _floor(entry), sorted(entry['messages'] + added, key=_sort_key))
+
+    def evict(self, session_id):
+        if self.enabled:
+            # 세대를 먼저 없애 진행 중인 load/append가 이후에 저장하는 항목도 무효로 만듭니다
+            self.backend.delete(self._generation_key(session_id))
+            self.backend.delete(self._key(session_id))
+
+    def evict_on_commit(self, session_id, session=None):
+        """현재 트랜잭션이 커밋된 뒤 세션의 기록을 지웁니다 (세션 종료/삭제, 대량 저장 등)."""
+        if self.enabled:
+            on_commit(self.evict, session_id, session=session)
+
+
+def _history_changed(message):
+    state = inspect(message)
+    return any(state.attrs[attr].history.has_changes() for attr in _HISTORY_ATTRS)
+
+
+_redis_url = Config.HISTORY_CACHE_REDIS_URL
+history_cache = HistoryCache(
+    # 로컬 캐시는 세션마다 항목과 세대 값 두 개를 저장합니다
+    RedisBackend(_redis_url, prefix='seobi:') if _redis_url else LocalBackend(Config.HISTORY_CACHE_MAX_SESSIONS * 2),
+    max_messages=Config.HISTORY_CACHE_MAX_MESSAGES,
+    ttl=Config.HISTORY_CACHE_TTL,
+    enabled=Config.HISTORY_CACHE_ENABLED
+)
+
+
+@event.listens_for(RoutingSession, 'after_flush')
+def _track_message_changes(session, flush_context):
+    """ORM으로 바뀐 메시지를 모아 커밋 후 대화 기록 캐시에 반영합니다."""
+    if not history_cache.enabled:
+        return
+    added = {}
+    for obj in session.new:
+        if isinstance(obj, Message):
+            added.setdefault(obj.session_id, []).append({c: getattr(obj, c) for c in HISTORY_COLUMNS})
+    for session_id, messages in added.items():
+        on_commit(history_cache.append, session_id, messages, session=session)
+    for obj in session.dirty:
+        if isinstance(obj, Message) and _history_changed(obj):
+            history_cache.evict_on_commit(obj.session_id, session)
+            # 다른 세션으로 옮긴 경우 이전 세션의 기록도 지웁니다
+            for old_session_id in inspect(obj).attrs.session_id.history.deleted:
+                history_cache.evict_on_commit(old_session_id, session)
+    for obj in session.deleted:
+        if isinstance(obj, Message):
+            history_cache.evict_on_commit(obj.session_id, session)
+        elif isinstance(obj, Session):
+            history_cache.evict_on_commit(obj.id, session)
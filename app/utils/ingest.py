@@ -0,0 +1,171 @@
+import csv
+import io
+import json
+import uuid
+from datetime import datetime, timezone
+from itertools import islice
+from sqlalchemy import insert
+from app.models import Message, Session, User, db
+from app.utils.history_cache import history_cache
+from app.utils.pagination import parse_datetime, parse_uuid
+
+COPY_COLUMNS = ('id', 'session_id', 'user_id', 'content', 'role', 'timestamp')
+
+
+def iter_ndjson(stream):
+    """NDJSON 스트림을 한 줄씩 읽어 (index, 객체 또는 예외)를 반환합니다."""
+    index = 0
+    for line in stream:
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            yield index, json.loads(line)
+        except ValueError as e:
+            yield index, ValueError(f'JSON 파싱 실패: {str(e)}')
+        index += 1
+
+
+def _validate(record):
+    """입력 레코드 하나를 검증해 INSERT할 행(dict)으로 변환합니다."""
+    if isinstance(record, Exception):
+        raise record
+    if not isinstance(record, dict):
+        raise ValueError('각 항목은 JSON 객체여야 합니다')
+    content = record.get('content')
+    if not isinstance(content, str):
+        raise ValueError('content가 필요합니다')
+    session_id = parse_uuid(record.get('session_id'), 'session_id')
+    user_id = parse_uuid(record.get('user_id'), 'user_id')
+    if session_id is None or user_id is None:
+        raise ValueError('session_id와 user_id가 필요합니다')
+    role = record.get('role', 'user')
+    if role not in ('user', 'assistant'):
+        raise ValueError('role은 user 또는 assistant여야 합니다')
+    timestamp = parse_datetime(record.get('timestamp'), 'timestamp') or datetime.now(timezone.utc)
+    return {
+        'id': uuid.uuid4(),
+        'session_id': session_id,
+        'user_id': user_id,
+        'content': content,
+        'role': role,
+        'timestamp': timestamp
+    }
+
+
+class BulkIngest:
+    """메시지를 청크 단위 트랜잭션으로 대량 저장합니다.
+
+    세션의 존재/종료 여부와 사용자 존재 여부는 요청 전체에서 ID별로 한 번만 조회하고,
+    각 청크는 다중 행 INSERT 또는 PostgreSQL COPY 한 번으로 기록합니다.
+    청크 저장이 실패하면 해당 청크만 롤백하고 나머지는 계속 진행합니다.
+    """
+
+    def __init__(self, method='insert', chunk_size=1000, max_errors=1000):
+        if method not in ('insert', 'copy'):
+            raise ValueError('method는 insert 또는 copy여야 합니다')
+        self.method = method
+        self.chunk_size = chunk_size
+        self.max_errors = max_errors
+        self.inserted = 0
+        self.failed = 0
+        self.errors = []
+        self._session_errors = {}
+        self._known_users = set()
+
+    def _error(self, index, message):
+        self.failed += 1
+        if len(self.errors) < self.max_errors:
+            self.errors.append({'index': index, 'error': message})
+
+    def _load_sessions(self, session_ids):
+        missing = [sid for sid in session_ids if sid not in self._session_errors]
+        if not missing:
+            return
+        rows = (db.session.query(Session.id, Session.finish_at)
+                .filter(Session.id.in_(missing))
+                .all())
+        found = {row.id: row.finish_at for row in rows}
+        for sid in missing:
+            if sid not in found:
+                self._session_errors[sid] = '세션을 찾을 수 없습니다'
+            elif found[sid]:
+                self._session_errors[sid] = '종료된 세션에는 메시지를 추가할 수 없습니다.'
+            else:
+                self._session_errors[sid] = None
+
+    def _load_users(self, user_ids):
+        missing = [uid for uid in user_ids if uid not in self._known_users]
+        if missing:
+            rows = db.session.query(User.id).filter(User.id.in_(missing)).all()
+            self._known_users.update(row.id for row in rows)
+
+    def _write_insert(self, rows):
+        db.session.execute(insert(Message), rows)
+
+    def _write_copy(self, rows):
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        for row in rows:
+            writer.writerow([
+                row['id'], row['session_id'], row['user_id'],
+                row['content'], row['role'], row['timestamp'].isoformat()
+            ])
+        buffer.seek(0)
+        cursor = db.session.connection().connection.cursor()
+        try:
+            cursor.copy_expert(
+                f"COPY message ({', '.join(COPY_COLUMNS)}) FROM STDIN WITH (FORMAT csv)", buffer)
+        finally:
+            cursor.close()
+
+    def _process_chunk(self, chunk):
+        candidates = []
+        for index, record in chunk:
+            try:
+                candidates.append((index, _validate(record)))
+            except ValueError as e:
+                self._error(index, str(e))
+        if not candidates:
+            return
+
+        self._load_sessions({row['session_id'] for _, row in candidates})
+        self._load_users({row['user_id'] for _, row in candidates})
+
+        rows = []
+        for index, row in candidates:
+            session_error = self._session_errors[row['session_id']]
+            if session_error:
+                self._error(index, session_error)
+            elif row['user_id'] not in self._known_users:
+                self._error(index, '사용자를 찾을 수 없습니다')
+            else:
+                rows.append((index, row))
+        if not rows:
+            db.session.rollback()
+            return
+
+        try:
+            if self.method == 'copy':
+                self._write_copy([row for _, row in rows])
+            else:
+                self._write_insert([row for _, row in rows])
+            # 과거 시각의 메시지가 중간에 끼어들 수 있으므로 대화 기록 캐시를 다시 읽게 합니다
+            for session_id in {row['session_id'] for _, row in rows}:
+                history_cache.evict_on_commit(session_id)
+            db.session.commit()
+            self.inserted += len(rows)
+        except Exception as e:
+            db.session.rollback()
+            for index, _ in rows:
+                self._error(index, f'저장 실패: {str(e)}')
+
+    def run(self, records):
+        """(index, 레코드) 이터러블을 chunk_size 단위로 검증/저장합니다."""
+        records = iter(records)
+        while True:
+            chunk = list(islice(records, self.chunk_size))
+            if not chunk:
+                break
+            self._process_chunk(chunk)
+        return self
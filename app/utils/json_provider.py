@@ -0,0 +1,38 @@
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:  # orjson이 없으면 표준 json으로 동작합니다
+    orjson = None
+
+
+class OrjsonProvider(DefaultJSONProvider):
+    """orjson 기반 JSON 프로바이더
+
+    UUID/numpy 배열은 orjson이 직접 처리하고, datetime 등 나머지 타입은 Flask 기본
+    규칙(`default`)을 그대로 따르므로 출력 형식은 기본 프로바이더와 같습니다.
+    들여쓰기 등 추가 옵션이 필요한 경우(디버그 모드 pretty print)는 기본 구현을 사용합니다.
+    """
+
+    def _option(self):
+        option = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS
+        if self.sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        return option
+
+    def dumps(self, obj, **kwargs):
+        if orjson is None or kwargs:
+            return super().dumps(obj, **kwargs)
+        return orjson.dumps(obj, default=self.default, option=self._option()).decode('utf-8')
+
+    def loads(self, s, **kwargs):
+        if orjson is None or kwargs:
+            return super().loads(s, **kwargs)
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        if orjson is None or self.compact is False or (self.compact is None and self._app.debug):
+            return super().response(*args, **kwargs)
+        obj = self._prepare_response_obj(args, kwargs)
+        body = orjson.dumps(obj, default=self.default, option=self._option() | orjson.OPT_APPEND_NEWLINE)
+        return self._app.response_class(body, mimetype=self.mimetype)
@@ -0,0 +1,230 @@
+import contextvars
+import threading
+import time
+from flask import g, has_request_context, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 200)
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _format_labels(labelnames, labelvalues, extra=None):
+    pairs = list(zip(labelnames, labelvalues))
+    if extra:
+        pairs.append(extra)
+    if not pairs:
+        return ''
+    return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in pairs) + '}'
+
+
+class _Metric:
+    type_name = None
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+        REGISTRY.register(self)
+
+    def _key(self, labels):
+        return tuple(str(labels.get(name, '')) for name in self.labelnames)
+
+    def render(self):
+        lines = [f'# HELP {self.name} {self.documentation}', f'# TYPE {self.name} {self.type_name}']
+        with self._lock:
+            items = list(self._values.items())
+        for labelvalues, value in items:
+            lines.extend(self._render_sample(labelvalues, value))
+        return lines
+
+
+class Counter(_Metric):
+    type_name = 'counter'
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def _render_sample(self, labelvalues, value):
+        return [f'{self.name}{_format_labels(self.labelnames, labelvalues)} {value}']
+
+
+class Histogram(_Metric):
+    type_name = 'histogram'
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        super().__init__(name, documentation, labelnames)
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = [[0] * len(self.buckets), 0.0, 0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    state[0][i] += 1
+            state[1] += value
+            state[2] += 1
+
+    def _render_sample(self, labelvalues, state):
+        counts, total, count = state
+        lines = [
+            f'{self.name}_bucket{_format_labels(self.labelnames, labelvalues, ("le", bound))} {n}'
+            for bound, n in zip(self.buckets, counts)
+        ]
+        lines.append(f'{self.name}_bucket{_format_labels(self.labelnames, labelvalues, ("le", "+Inf"))} {count}')
+        lines.append(f'{self.name}_sum{_format_labels(self.labelnames, labelvalues)} {total}')
+        lines.append(f'{self.name}_count{_format_labels(self.labelnames, labelvalues)} {count}')
+        return lines
+
+
+class GaugeCallback:
+    """조회 시점에 콜백으로 값을 읽는 게이지 (예: 캐시 크기, 서킷 브레이커 상태)"""
+
+    def __init__(self, name, documentation, callback):
+        self.name = name
+        self.documentation = documentation
+        self.callback = callback
+        REGISTRY.register(self)
+
+    def render(self):
+        lines = [f'# HELP {self.name} {self.documentation}', f'# TYPE {self.name} gauge']
+        for labels, value in self.callback():
+            names = tuple(labels)
+            lines.append(f'{self.name}{_format_labels(names, tuple(labels[n] for n in names))} {value}')
+        return lines
+
+
+class Registry:
+    def __init__(self):
+        self._metrics = []
+
+    def register(self, metric):
+        self._metrics.append(metric)
+
+    def render(self):
+        """Prometheus text exposition format (0.0.4)으로 출력합니다."""
+        lines = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        return '\n'.join(lines) + '\n'
+
+
+REGISTRY = Registry()
+
+# HTTP 요청
+REQUEST_DURATION = Histogram(
+    'http_request_duration_seconds', '요청 처리 시간 (스트리밍 응답은 첫 바이트까지)',
+    ('blueprint', 'endpoint', 'method', 'status'))
+REQUEST_SQL_QUERIES = Histogram(
+    'http_request_sql_queries', '요청당 SQL 쿼리 수', ('blueprint', 'endpoint'), buckets=COUNT_BUCKETS)
+REQUEST_SQL_DURATION = Histogram(
+    'http_request_sql_duration_seconds', '요청당 SQL 실행 시간 합계', ('blueprint', 'endpoint'))
+
+# 데이터베이스
+SQL_QUERIES = Counter('db_queries_total', '실행한 SQL 쿼리 수')
+SQL_DURATION = Histogram('db_query_duration_seconds', 'SQL 쿼리 실행 시간')
+
+# LLM
+LLM_DURATION = Histogram(
+    'llm_request_duration_seconds', 'LLM API 호출 시간 (재시도 포함)', ('operation', 'outcome'))
+LLM_TIME_TO_FIRST_TOKEN = Histogram(
+    'llm_time_to_first_token_seconds', '스트리밍 응답의 첫 토큰까지 걸린 시간')
+LLM_TOKENS = Counter('llm_tokens_total', 'LLM 토큰 사용량', ('operation', 'type'))
+LLM_RETRIES = Counter('llm_retries_total', 'LLM API 재시도 횟수', ('reason',))
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    # 실행 컨텍스트는 문장마다 새로 만들어지므로 실패한 쿼리의 시작 시각이 커넥션에 남지 않습니다
+    if context is not None:
+        context._metrics_query_start = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    start = getattr(context, '_metrics_query_start', None)
+    if start is None:
+        return
+    elapsed = time.perf_counter() - start
+    SQL_QUERIES.inc()
+    SQL_DURATION.observe(elapsed)
+    timer = _request_timer.get()
+    if timer is not None:
+        timer.sql_queries += 1
+        timer.sql_duration += elapsed
+    elif has_request_context() and 'sql_queries' in g:
+        g.sql_queries += 1
+        g.sql_duration += elapsed
+
+
+# Flask를 거치지 않는 요청(app.asgi)에서 현재 요청의 RequestTimer
+_request_timer = contextvars.ContextVar('request_timer', default=None)
+
+
+class RequestTimer:
+    """Flask 훅을 거치지 않는 요청의 처리 시간과 요청별 SQL 쿼리 수/시간을 Flask 요청과 같은 지표로 남깁니다.
+
+    asyncio.to_thread는 contextvars를 복사하므로 스레드 풀에서 실행한 쿼리도 이 요청에 집계됩니다.
+    """
+
+    def __init__(self, blueprint, endpoint, method):
+        self.blueprint = blueprint
+        self.endpoint = endpoint
+        self.method = method
+        self.sql_queries = 0
+        self.sql_duration = 0.0
+        self.start = time.perf_counter()
+        _request_timer.set(self)
+
+    def observe(self, status):
+        labels = {'blueprint': self.blueprint, 'endpoint': self.endpoint}
+        REQUEST_DURATION.observe(time.perf_counter() - self.start, method=self.method, status=status, **labels)
+        REQUEST_SQL_QUERIES.observe(self.sql_queries, **labels)
+        REQUEST_SQL_DURATION.observe(self.sql_duration, **labels)
+
+
+def _before_request():
+    g.request_start = time.perf_counter()
+    g.sql_queries = 0
+    g.sql_duration = 0.0
+
+
+def _observe_request(status):
+    start = g.pop('request_start', None)
+    if start is None:
+        return
+    blueprint = request.blueprint or ''
+    endpoint = request.endpoint or 'unknown'
+    REQUEST_DURATION.observe(time.perf_counter() - start, blueprint=blueprint, endpoint=endpoint,
+                             method=request.method, status=status)
+    REQUEST_SQL_QUERIES.observe(g.sql_queries, blueprint=blueprint, endpoint=endpoint)
+    REQUEST_SQL_DURATION.observe(g.sql_duration, blueprint=blueprint, endpoint=endpoint)
+
+
+def _after_request(response):
+    _observe_request(response.status_code)
+    return response
+
+
+def _teardown_request(error):
+    # 처리되지 않은 예외로 after_request가 호출되지 않은 요청
+    _observe_request(500)
+
+
+def init_app(app):
+    """요청 시간과 요청별 SQL 쿼리 수/시간을 수집하도록 앱과 SQLAlchemy에 훅을 등록합니다."""
+    app.before_request(_before_request)
+    app.after_request(_after_request)
+    app.teardown_request(_teardown_request)
+    if not event.contains(Engine, 'before_cursor_execute', _before_cursor_execute):
+        event.listen(Engine, 'before_cursor_execute', _before_cursor_execute)
+        event.listen(Engine, 'after_cursor_execute', _after_cursor_execute)
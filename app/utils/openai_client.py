@@ -1,52 +1,590 @@
+import asyncio
+import logging
 import os
-from openai import AzureOpenAI
+import random
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from datetime import datetime, timezone
+import httpx
+import openai
+from openai import AsyncAzureOpenAI, AzureOpenAI
 from dotenv import load_dotenv
+from app.config import Config
+from app.utils.completion_cache import CompletionCache
+from app.utils.metrics import (
+    GaugeCallback, LLM_DURATION, LLM_RETRIES, LLM_TIME_TO_FIRST_TOKEN, LLM_TOKENS
+)
+from app.utils.resilience import CircuitBreaker, backoff_delay
+from app.utils.scheduler import INTERACTIVE, LLMScheduler, SchedulerRejected
 
 load_dotenv()
 
-def get_openai_client():
-    """Azure OpenAI 클라이언트를 초기화하고 반환합니다."""
+logger = logging.getLogger(__name__)
+
+# 재시도할 HTTP 상태 코드 (429 및 일시적인 서버 오류)
+RETRYABLE_STATUS_CODES = {408, 429, 500, 502, 503, 504}
+
+_client = None
+_async_client = None
+_scheduler = None
+_client_lock = threading.Lock()
+_circuit_breaker = CircuitBreaker(
+    failure_threshold=Config.OPENAI_CIRCUIT_FAILURE_THRESHOLD,
+    reset_timeout=Config.OPENAI_CIRCUIT_RESET_TIMEOUT
+)
+
+
+def _embed_for_cache(texts):
+    return get_embeddings(get_openai_client(), texts)
+
+
+completion_cache = CompletionCache(
+    max_entries=Config.COMPLETION_CACHE_MAX_ENTRIES,
+    ttl=Config.COMPLETION_CACHE_TTL,
+    semantic_threshold=(Config.COMPLETION_CACHE_SEMANTIC_THRESHOLD
+                        if Config.COMPLETION_CACHE_SEMANTIC_ENABLED else None),
+    embed_fn=_embed_for_cache
+)
+
+
+GaugeCallback(
+    'completion_cache_stats', 'LLM 응답 캐시 통계 (hits/misses 등 누적값과 현재 크기)',
+    lambda: [({'stat': name}, value) for name, value in completion_cache.stats().items()]
+)
+GaugeCallback(
+    'llm_circuit_breaker_state', 'OpenAI 서킷 브레이커 상태 (현재 상태만 1)',
+    lambda: [({'state': state}, int(_circuit_breaker.state == state))
+             for state in ('closed', 'open', 'half_open')]
+)
+
+GaugeCallback(
+    'llm_scheduler_queue_depth', 'LLM 스케줄러 큐에서 기다리는 요청 수',
+    lambda: [({}, get_llm_scheduler().queue_depth())]
+)
+
+
+def _debug_sampled():
+    """프롬프트/응답 디버그 로그를 LLM_DEBUG_SAMPLE_RATE 비율로만 남깁니다."""
+    rate = Config.LLM_DEBUG_SAMPLE_RATE
+    return rate > 0 and logger.isEnabledFor(logging.DEBUG) and random.random() < rate
+
+
+def _record_usage(operation, usage):
+    if usage is None:
+        return
+    LLM_TOKENS.inc(usage.prompt_tokens or 0, operation=operation, type='prompt')
+    LLM_TOKENS.inc(getattr(usage, 'completion_tokens', 0) or 0, operation=operation, type='completion')
+
+
+class UsageRecord:
+    """완성 요청 한 번의 토큰 사용량, 모델, 응답한 배포, 지연 시간입니다.
+
+    get_completion*의 `usage` 인자로 넘기면 호출이 끝날 때(스트리밍은 스트림이 닫힐 때) 채워집니다.
+    `deployment`는 스케줄러가 배정한 배포(AZURE_OPENAI_DEPLOYMENT_NAMES 중 하나)이고, `model`은 그 배포의
+    모델 이름입니다. API가 사용량을 주지 않으면(OPENAI_STREAM_USAGE가 꺼진 스트리밍, 중간에 끊긴 스트림)
+    토크나이저로 추정하고, 캐시 히트는 0토큰에 model='cache'(배포 없음)로 기록합니다.
+    """
+    __slots__ = ('prompt_tokens', 'completion_tokens', 'model', 'deployment', 'latency_ms')
+
+    def __init__(self):
+        self.prompt_tokens = None
+        self.completion_tokens = None
+        self.model = None
+        self.deployment = None
+        self.latency_ms = None
+
+    def fill(self, usage, model, start, messages=None, content=None):
+        self.latency_ms = int((time.perf_counter() - start) * 1000)
+        self.model = model
+        if usage is not None:
+            self.prompt_tokens = usage.prompt_tokens or 0
+            self.completion_tokens = usage.completion_tokens or 0
+        else:
+            from app.utils.context import count_message_tokens, count_tokens
+            self.prompt_tokens = sum(count_message_tokens(m) for m in messages)
+            self.completion_tokens = count_tokens(content) if content else 0
+
+    def columns(self):
+        """Message 컬럼 값으로 변환합니다."""
+        return {name: getattr(self, name) for name in self.__slots__}
+
+
+def _cache_hit(lookup, usage, start):
+    if usage is not None:
+        usage.prompt_tokens = usage.completion_tokens = 0
+        usage.model = 'cache'
+        usage.latency_ms = int((time.perf_counter() - start) * 1000)
+    return lookup.value
+
+
+def _cache_lookup(messages, max_completion_tokens, use_cache):
+    if not (use_cache and Config.COMPLETION_CACHE_ENABLED):
+        return None
+    params = {
+        'model': os.getenv("AZURE_OPENAI_DEPLOYMENT_NAME"),
+        'max_completion_tokens': max_completion_tokens
+    }
+    return completion_cache.lookup(messages, params)
+
+
+def _reset_client_after_fork():
+    # fork된 워커가 부모 프로세스의 커넥션 풀을 공유하지 않도록 합니다
+    global _client, _async_client, _scheduler, _client_lock
+    _client = None
+    _async_client = None
+    _scheduler = None
+    _client_lock = threading.Lock()
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_reset_client_after_fork)
+
+
+def _client_options():
+    """Azure OpenAI 클라이언트 생성 인자 (연결 정보와 타임아웃)를 만듭니다."""
     api_key = os.getenv("AZURE_OPENAI_API_KEY")
     api_version = os.getenv("AZURE_OPENAI_API_VERSION", "2024-02-15-preview")
     azure_endpoint = os.getenv("AZURE_OPENAI_ENDPOINT")
     deployment_name = os.getenv("AZURE_OPENAI_DEPLOYMENT_NAME")
-    
-    print(f"Azure OpenAI Config:")
-    print(f"- API Version: {api_version}")
-    print(f"- Endpoint: {azure_endpoint}")
-    print(f"- Deployment: {deployment_name}")
-    print(f"- API Key: {'*' * 8 if api_key else 'Not set'}")
-    
+
     if not all([api_key, azure_endpoint, deployment_name]):
         raise ValueError("Azure OpenAI 설정이 완료되지 않았습니다. 환경 변수를 확인해주세요.")
-    
-    client = AzureOpenAI(
-        api_key=api_key,
-        api_version=api_version,
-        azure_endpoint=azure_endpoint
+
+    logger.info("Azure OpenAI client: api_version=%s endpoint=%s deployment=%s",
+                api_version, azure_endpoint, deployment_name)
+    return {
+        'api_key': api_key,
+        'api_version': api_version,
+        'azure_endpoint': azure_endpoint,
+        'timeout': httpx.Timeout(Config.OPENAI_TIMEOUT, connect=Config.OPENAI_CONNECT_TIMEOUT),
+        'max_retries': 0
+    }
+
+
+def _http_limits():
+    return httpx.Limits(
+        max_connections=Config.OPENAI_MAX_CONNECTIONS,
+        max_keepalive_connections=Config.OPENAI_MAX_KEEPALIVE_CONNECTIONS
     )
-    return client
-
-def get_completion(client, messages, max_completion_tokens=2000):
-    """Azure OpenAI를 사용하여 채팅 완성을 생성합니다."""
-    try:
-        print(f"\nSending request to Azure OpenAI:")
-        print(f"Messages: {messages}")
-        print(f"Max completion tokens: {max_completion_tokens}")
-        
-        response = client.chat.completions.create(
-            model=os.getenv("AZURE_OPENAI_DEPLOYMENT_NAME"),
-            messages=messages,
-            max_completion_tokens=max_completion_tokens  # max_tokens를 max_completion_tokens로 수정
+
+
+def get_openai_client():
+    """프로세스 전역에서 공유하는 Azure OpenAI 클라이언트를 반환합니다.
+
+    최초 호출 시 한 번만 생성하며, keep-alive 커넥션 풀을 재사용합니다.
+    재시도는 SDK 대신 `_call_with_retry`에서 처리합니다.
+    """
+    global _client
+    if _client is not None:
+        return _client
+
+    with _client_lock:
+        if _client is not None:
+            return _client
+        options = _client_options()
+        http_client = httpx.Client(timeout=options['timeout'], limits=_http_limits())
+        _client = AzureOpenAI(http_client=http_client, **options)
+        return _client
+
+
+def get_async_openai_client():
+    """ASGI 경로(app.asgi)에서 사용하는 비동기 Azure OpenAI 클라이언트를 반환합니다.
+
+    워커 프로세스의 이벤트 루프 하나에서만 사용하므로 프로세스당 한 번 생성합니다.
+    """
+    global _async_client
+    if _async_client is not None:
+        return _async_client
+
+    with _client_lock:
+        if _async_client is not None:
+            return _async_client
+        options = _client_options()
+        http_client = httpx.AsyncClient(timeout=options['timeout'], limits=_http_limits())
+        _async_client = AsyncAzureOpenAI(http_client=http_client, **options)
+        return _async_client
+
+
+def get_llm_scheduler():
+    """채팅 완성 요청의 RPM/TPM 한도와 우선순위를 관리하는 프로세스 전역 스케줄러를 반환합니다.
+
+    AZURE_OPENAI_DEPLOYMENT_NAMES(쉼표 구분)를 지정하면 같은 리소스의 여러 배포에 요청을 나눕니다.
+    한도(LLM_RPM_LIMIT, LLM_TPM_LIMIT)는 배포별 값입니다.
+    """
+    global _scheduler
+    if _scheduler is not None:
+        return _scheduler
+
+    with _client_lock:
+        if _scheduler is None:
+            names = os.getenv("AZURE_OPENAI_DEPLOYMENT_NAMES") or os.getenv("AZURE_OPENAI_DEPLOYMENT_NAME") or ''
+            _scheduler = LLMScheduler(
+                [name.strip() for name in names.split(',') if name.strip()] or [None],
+                rpm=Config.LLM_RPM_LIMIT,
+                tpm=Config.LLM_TPM_LIMIT,
+                burst_seconds=Config.LLM_BURST_SECONDS,
+                max_queue_depth=Config.LLM_QUEUE_MAX_DEPTH,
+                max_wait=Config.LLM_QUEUE_MAX_WAIT,
+                background_max_wait=Config.LLM_QUEUE_BACKGROUND_MAX_WAIT
+            )
+        return _scheduler
+
+
+def _estimate_tokens(messages, max_completion_tokens):
+    # Azure의 TPM 한도 계산과 같이 프롬프트 토큰 + 최대 완성 토큰으로 추정합니다
+    from app.utils.context import count_message_tokens
+    return sum(count_message_tokens(m) for m in messages) + max_completion_tokens
+
+
+def _retry_after_seconds(error):
+    """오류 응답의 Retry-After(-ms) 헤더를 초 단위로 반환합니다."""
+    response = getattr(error, 'response', None)
+    if response is None:
+        return None
+    headers = response.headers
+
+    retry_after_ms = headers.get('retry-after-ms')
+    if retry_after_ms:
+        try:
+            return float(retry_after_ms) / 1000
+        except ValueError:
+            pass
+
+    retry_after = headers.get('retry-after')
+    if not retry_after:
+        return None
+    try:
+        return float(retry_after)
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(retry_after)
+        return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+    except (TypeError, ValueError):
+        return None
+
+
+def _is_endpoint_failure(error):
+    """엔드포인트 장애(연결 실패, 타임아웃, 5xx)인지 확인합니다."""
+    if isinstance(error, openai.APIConnectionError):
+        return True
+    return isinstance(error, openai.APIStatusError) and error.status_code >= 500
+
+
+def _is_retryable(error):
+    if isinstance(error, openai.APIConnectionError):
+        return True
+    return isinstance(error, openai.APIStatusError) and error.status_code in RETRYABLE_STATUS_CODES
+
+
+def _retry_delay(error, attempt, deployment=None):
+    """실패한 요청을 서킷 브레이커에 기록하고, 다시 시도할 때까지 기다릴 시간(초)을 반환합니다.
+
+    재시도하지 않을 오류이거나 Retry-After가 최대 백오프(OPENAI_BACKOFF_MAX)보다 길면
+    워커를 붙잡지 않도록 None을 반환합니다.
+    """
+    if isinstance(error, openai.RateLimitError) and deployment is not None:
+        get_llm_scheduler().penalize(deployment, _retry_after_seconds(error))
+    if _is_endpoint_failure(error):
+        _circuit_breaker.record_failure()
+    else:
+        # 4xx/429는 엔드포인트가 응답한 것이므로 장애로 보지 않습니다
+        _circuit_breaker.record_success()
+
+    if not _is_retryable(error) or attempt >= Config.OPENAI_MAX_RETRIES:
+        return None
+    retry_after = _retry_after_seconds(error)
+    if retry_after is not None and retry_after > Config.OPENAI_BACKOFF_MAX:
+        return None
+    LLM_RETRIES.inc(reason=getattr(error, 'status_code', None) or 'connection')
+    return backoff_delay(
+        attempt,
+        base=Config.OPENAI_BACKOFF_BASE,
+        cap=Config.OPENAI_BACKOFF_MAX,
+        retry_after=retry_after
+    )
+
+
+def _call_with_retry(request_fn, schedule=None):
+    """서킷 브레이커와 지터 백오프 재시도를 적용해 OpenAI 요청을 실행합니다.
+
+    `schedule`(예상 토큰 수, 우선순위)을 주면 시도마다 스케줄러에서 배포를 배정받아
+    `request_fn(deployment)`로 호출합니다. 큐 대기/거부(SchedulerRejected)는 서킷 브레이커와 무관합니다.
+    """
+    attempt = 0
+    while True:
+        deployment = get_llm_scheduler().acquire(*schedule) if schedule else None
+        _circuit_breaker.before_call()
+        try:
+            result = request_fn(deployment) if schedule else request_fn()
+        except Exception as e:
+            delay = _retry_delay(e, attempt, deployment)
+            if delay is None:
+                raise
+            time.sleep(delay)
+            attempt += 1
+            continue
+
+        _circuit_breaker.record_success()
+        return result
+
+
+async def _acall_with_retry(request_fn, schedule=None):
+    """`_call_with_retry`의 비동기 버전입니다. 큐 대기와 백오프 동안 이벤트 루프를 막지 않습니다."""
+    attempt = 0
+    while True:
+        deployment = await get_llm_scheduler().acquire_async(*schedule) if schedule else None
+        _circuit_breaker.before_call()
+        try:
+            result = await (request_fn(deployment) if schedule else request_fn())
+        except Exception as e:
+            delay = _retry_delay(e, attempt, deployment)
+            if delay is None:
+                raise
+            await asyncio.sleep(delay)
+            attempt += 1
+            continue
+
+        _circuit_breaker.record_success()
+        return result
+
+
+def _chat_params(messages, max_completion_tokens, deployment=None, stream=False):
+    params = {
+        'model': deployment or os.getenv("AZURE_OPENAI_DEPLOYMENT_NAME"),
+        'messages': messages,
+        'max_completion_tokens': max_completion_tokens
+    }
+    if stream:
+        params['stream'] = True
+        if Config.OPENAI_STREAM_USAGE:
+            params['stream_options'] = {'include_usage': True}
+    return params
+
+
+def _chat_request(create, messages, max_completion_tokens, usage=None, stream=False):
+    """스케줄러가 배정한 배포로 채팅 완성을 요청하는 `request_fn(deployment)`를 만듭니다.
+
+    시도할 때마다 요청한 배포를 `usage`에 기록하므로 재시도 후에는 실제로 응답한 배포가 남습니다.
+    """
+    def request(deployment):
+        params = _chat_params(messages, max_completion_tokens, deployment, stream)
+        if usage is not None:
+            usage.deployment = params['model']
+        return create(**params)
+    return request
+
+
+def _request_started(messages, max_completion_tokens, stream=False):
+    """샘플링된 요청이면 프롬프트를 디버그 로그로 남기고, (디버그 여부, 시작 시각)을 반환합니다."""
+    debug = _debug_sampled()
+    if debug:
+        logger.debug("Azure OpenAI %srequest: max_completion_tokens=%s messages=%s",
+                     'stream ' if stream else '', max_completion_tokens, messages)
+    return debug, time.perf_counter()
+
+
+def _completion_failed(error, start, operation):
+    LLM_DURATION.observe(time.perf_counter() - start, operation=operation, outcome='error')
+    logger.warning("OpenAI API call failed (%s): %s: %s", operation, type(error).__name__, error)
+    return Exception(f"OpenAI API 호출 중 오류 발생: {str(error)}")
+
+
+def _completion_done(response, lookup, debug, start, usage=None):
+    LLM_DURATION.observe(time.perf_counter() - start, operation='chat', outcome='success')
+    _record_usage('chat', response.usage)
+    content = response.choices[0].message.content
+    if usage is not None:
+        usage.fill(response.usage, response.model, start)
+    if debug:
+        logger.debug("Azure OpenAI response: %s", content)
+    if lookup is not None:
+        completion_cache.store(lookup, content)
+    return content
+
+
+class _StreamRecorder:
+    """스트리밍 청크에서 델타를 꺼내면서 첫 토큰 시간, 토큰 사용량, 응답 캐시 저장을 처리합니다."""
+
+    def __init__(self, lookup, debug, start, messages=None, usage=None):
+        self.lookup = lookup
+        self.debug = debug
+        self.start = start
+        self.messages = messages
+        self.usage = usage
+        self.api_usage = None
+        self.model = None
+        self.chunks = []
+        self.outcome = 'cancelled'
+
+    def delta(self, chunk):
+        if getattr(chunk, 'model', None):
+            self.model = chunk.model
+        # include_usage를 켜면 마지막 청크에 choices 없이 토큰 사용량이 옵니다
+        if getattr(chunk, 'usage', None) is not None:
+            self.api_usage = chunk.usage
+            _record_usage('chat_stream', chunk.usage)
+        # Azure는 첫 청크에 choices 없이 콘텐츠 필터 결과만 보내기도 합니다
+        if not chunk.choices:
+            return None
+        delta = chunk.choices[0].delta.content
+        if delta:
+            if not self.chunks:
+                LLM_TIME_TO_FIRST_TOKEN.observe(time.perf_counter() - self.start)
+            self.chunks.append(delta)
+        return delta
+
+    def finish(self):
+        self.outcome = 'success'
+        content = ''.join(self.chunks)
+        if self.debug:
+            logger.debug("Azure OpenAI stream response: %s", content)
+        if self.lookup is not None:
+            completion_cache.store(self.lookup, content)
+
+    def fail(self, error):
+        self.outcome = 'error'
+        if _is_endpoint_failure(error):
+            _circuit_breaker.record_failure()
+        return Exception(f"OpenAI API 호출 중 오류 발생: {str(error)}")
+
+    def close(self):
+        LLM_DURATION.observe(time.perf_counter() - self.start, operation='chat_stream', outcome=self.outcome)
+        if self.usage is not None:
+            self.usage.fill(self.api_usage, self.model, self.start, self.messages, ''.join(self.chunks))
+
+
+def get_completion(client, messages, max_completion_tokens=2000, use_cache=False, priority=INTERACTIVE,
+                   usage=None):
+    """Azure OpenAI를 사용하여 채팅 완성을 생성합니다.
+
+    `use_cache`가 True면 응답 캐시(completion_cache)를 먼저 조회하고, 미스일 때 결과를 저장합니다.
+    캐시된 응답은 사용자/세션 구분 없이 공유되므로 제목/요약처럼 입력만으로 결과가 정해지는 호출에만 켭니다.
+    """
+    debug, start = _request_started(messages, max_completion_tokens)
+    lookup = _cache_lookup(messages, max_completion_tokens, use_cache)
+    if lookup is not None and lookup.hit:
+        return _cache_hit(lookup, usage, start)
+    try:
+        response = _call_with_retry(
+            _chat_request(client.chat.completions.create, messages, max_completion_tokens, usage),
+            schedule=(_estimate_tokens(messages, max_completion_tokens), priority)
+        )
+    except SchedulerRejected:
+        raise
+    except Exception as e:
+        raise _completion_failed(e, start, 'chat')
+    return _completion_done(response, lookup, debug, start, usage)
+
+
+def get_completion_stream(client, messages, max_completion_tokens=2000, use_cache=False, priority=INTERACTIVE,
+                          usage=None):
+    """Azure OpenAI 스트리밍 응답을 받아 토큰 델타를 순서대로 반환합니다.
+
+    재시도는 스트림을 여는 요청에만 적용됩니다. 캐시 히트면 전체 응답을 한 번에 반환하고,
+    스트림을 끝까지 받은 경우에만 응답을 캐시에 저장합니다.
+    제너레이터를 닫으면(close) 업스트림 스트림도 함께 닫혀 생성이 중단됩니다.
+    """
+    debug, start = _request_started(messages, max_completion_tokens, stream=True)
+    lookup = _cache_lookup(messages, max_completion_tokens, use_cache)
+    if lookup is not None and lookup.hit:
+        yield _cache_hit(lookup, usage, start)
+        return
+    try:
+        stream = _call_with_retry(
+            _chat_request(client.chat.completions.create, messages, max_completion_tokens, usage, stream=True),
+            schedule=(_estimate_tokens(messages, max_completion_tokens), priority)
+        )
+    except SchedulerRejected:
+        raise
+    except Exception as e:
+        raise _completion_failed(e, start, 'chat_stream')
+
+    recorder = _StreamRecorder(lookup, debug, start, messages, usage)
+    try:
+        for chunk in stream:
+            delta = recorder.delta(chunk)
+            if delta:
+                yield delta
+        recorder.finish()
+    except Exception as e:
+        raise recorder.fail(e)
+    finally:
+        recorder.close()
+        stream.close()
+
+
+async def _acache_lookup(messages, max_completion_tokens, use_cache):
+    # semantic 캐시는 동기 임베딩 호출을 하므로 이벤트 루프를 막지 않도록 스레드에서 조회합니다
+    if completion_cache.semantic_threshold is not None:
+        return await asyncio.to_thread(_cache_lookup, messages, max_completion_tokens, use_cache)
+    return _cache_lookup(messages, max_completion_tokens, use_cache)
+
+
+async def get_completion_async(client, messages, max_completion_tokens=2000, use_cache=False,
+                               priority=INTERACTIVE, usage=None):
+    """`get_completion`의 비동기 버전입니다 (AsyncAzureOpenAI 클라이언트 사용)."""
+    debug, start = _request_started(messages, max_completion_tokens)
+    lookup = await _acache_lookup(messages, max_completion_tokens, use_cache)
+    if lookup is not None and lookup.hit:
+        return _cache_hit(lookup, usage, start)
+    try:
+        response = await _acall_with_retry(
+            _chat_request(client.chat.completions.create, messages, max_completion_tokens, usage),
+            schedule=(_estimate_tokens(messages, max_completion_tokens), priority)
+        )
+    except SchedulerRejected:
+        raise
+    except Exception as e:
+        raise _completion_failed(e, start, 'chat')
+    return _completion_done(response, lookup, debug, start, usage)
+
+
+async def get_completion_stream_async(client, messages, max_completion_tokens=2000, use_cache=False,
+                                      priority=INTERACTIVE, usage=None):
+    """`get_completion_stream`의 비동기 버전입니다. `aclose()`하면 업스트림 스트림도 닫힙니다."""
+    debug, start = _request_started(messages, max_completion_tokens, stream=True)
+    lookup = await _acache_lookup(messages, max_completion_tokens, use_cache)
+    if lookup is not None and lookup.hit:
+        yield _cache_hit(lookup, usage, start)
+        return
+    try:
+        stream = await _acall_with_retry(
+            _chat_request(client.chat.completions.create, messages, max_completion_tokens, usage, stream=True),
+            schedule=(_estimate_tokens(messages, max_completion_tokens), priority)
         )
-        
-        print(f"\nReceived response from Azure OpenAI:")
-        print(f"Response object: {response}")
-        print(f"First choice content: {response.choices[0].message.content if response.choices else 'No content'}")
-        
-        return response.choices[0].message.content
+    except SchedulerRejected:
+        raise
+    except Exception as e:
+        raise _completion_failed(e, start, 'chat_stream')
+
+    recorder = _StreamRecorder(lookup, debug, start, messages, usage)
+    try:
+        async for chunk in stream:
+            delta = recorder.delta(chunk)
+            if delta:
+                yield delta
+        recorder.finish()
+    except Exception as e:
+        raise recorder.fail(e)
+    finally:
+        recorder.close()
+        await stream.close()
+
+
+def get_embeddings(client, texts):
+    """Azure OpenAI 임베딩 API로 여러 텍스트를 한 번의 요청으로 임베딩합니다."""
+    start = time.perf_counter()
+    try:
+        response = _call_with_retry(lambda: client.embeddings.create(
+            model=os.getenv("AZURE_OPENAI_EMBEDDING_DEPLOYMENT"),
+            input=texts
+        ))
     except Exception as e:
-        print(f"\nError in OpenAI API call:")
-        print(f"Error type: {type(e).__name__}")
-        print(f"Error message: {str(e)}")
-        raise Exception(f"OpenAI API 호출 중 오류 발생: {str(e)}") 
\ No newline at end of file
+        LLM_DURATION.observe(time.perf_counter() - start, operation='embeddings', outcome='error')
+        raise Exception(f"OpenAI 임베딩 API 호출 중 오류 발생: {str(e)}") from e
+    LLM_DURATION.observe(time.perf_counter() - start, operation='embeddings', outcome='success')
+    _record_usage('embeddings', response.usage)
+    # 응답 순서가 입력 순서와 다를 수 있으므로 index 기준으로 정렬합니다
+    return [item.embedding for item in sorted(response.data, key=lambda item: item.index)]
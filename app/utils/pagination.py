@@ -0,0 +1,127 @@
+import base64
+import json
+import uuid
+from datetime import date, datetime, timezone
+from flask import current_app, request
+from sqlalchemy import literal, tuple_
+
+
+def parse_limit():
+    """요청의 `limit` 파라미터를 읽어 PAGE_MAX_LIMIT 이내로 제한합니다."""
+    default = current_app.config['PAGE_DEFAULT_LIMIT']
+    maximum = current_app.config['PAGE_MAX_LIMIT']
+    value = request.args.get('limit', default)
+    try:
+        limit = int(value)
+    except (TypeError, ValueError):
+        raise ValueError('limit은 정수여야 합니다')
+    if limit < 1:
+        raise ValueError('limit은 1 이상이어야 합니다')
+    return min(limit, maximum)
+
+
+def parse_datetime(value, name):
+    """ISO 8601 문자열을 timezone-aware datetime으로 변환합니다 (timezone이 없으면 UTC)."""
+    if value is None:
+        return None
+    try:
+        # JSON 본문에서는 문자열이 아닌 값(예: epoch 숫자)도 올 수 있습니다
+        if not isinstance(value, str):
+            raise ValueError
+        parsed = datetime.fromisoformat(value.replace('Z', '+00:00'))
+    except ValueError:
+        raise ValueError(f'{name}은(는) ISO 8601 형식이어야 합니다')
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed
+
+
+def parse_date(value, name):
+    """YYYY-MM-DD 문자열을 date로 변환합니다."""
+    if value is None:
+        return None
+    try:
+        if not isinstance(value, str):
+            raise ValueError
+        return date.fromisoformat(value)
+    except ValueError:
+        raise ValueError(f'{name}은(는) YYYY-MM-DD 형식이어야 합니다')
+
+
+def parse_uuid(value, name):
+    if value is None:
+        return None
+    try:
+        if not isinstance(value, str):
+            raise ValueError
+        return uuid.UUID(value)
+    except ValueError:
+        raise ValueError(f'{name}이(가) 올바른 UUID가 아닙니다')
+
+
+def _encode_value(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, uuid.UUID):
+        return str(value)
+    return value
+
+
+def _decode_value(column, value):
+    try:
+        python_type = column.type.python_type
+    except NotImplementedError:
+        return value
+    if python_type in (datetime, uuid.UUID):
+        # 커서는 클라이언트가 보낸 값이므로 문자열이 아닌 값(예: 숫자)도 올 수 있습니다
+        if not isinstance(value, str):
+            raise ValueError
+        return datetime.fromisoformat(value) if python_type is datetime else uuid.UUID(value)
+    return python_type(value)
+
+
+def encode_cursor(values):
+    """정렬 키 값을 URL-safe 커서 문자열로 인코딩합니다."""
+    raw = json.dumps([_encode_value(v) for v in values], separators=(',', ':'))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor, columns):
+    """커서 문자열을 정렬 컬럼 타입에 맞는 값 목록으로 디코딩합니다."""
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded))
+        if not isinstance(values, list) or len(values) != len(columns):
+            raise ValueError
+        return [_decode_value(c, v) for c, v in zip(columns, values)]
+    except (ValueError, TypeError):
+        raise ValueError('올바르지 않은 cursor입니다')
+
+
+def keyset_paginate(query, columns, limit, cursor=None, descending=True, key=None):
+    """`columns` 순서의 keyset(seek) 방식으로 한 페이지를 조회합니다.
+
+    OFFSET 대신 `(c1, c2, ...) < (마지막 행의 값)` 조건을 사용하므로
+    (c1, c2, ...) 복합 인덱스가 있으면 페이지 위치와 관계없이 일정한 비용으로 조회됩니다.
+    `key`는 행에서 정렬 키 값을 꺼내는 함수이며, 기본값은 컬럼 이름으로 속성을 읽습니다.
+    반환값: (rows, next_cursor) — 다음 페이지가 없으면 next_cursor는 None입니다.
+    """
+    if key is None:
+        key = lambda row: [getattr(row, c.key) for c in columns]
+
+    if cursor:
+        values = decode_cursor(cursor, columns)
+        bound = tuple_(*[literal(v, type_=c.type) for c, v in zip(columns, values)])
+        if descending:
+            query = query.filter(tuple_(*columns) < bound)
+        else:
+            query = query.filter(tuple_(*columns) > bound)
+
+    order_by = [c.desc() if descending else c.asc() for c in columns]
+    rows = query.order_by(*order_by).limit(limit + 1).all()
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(key(rows[-1]))
+    return rows, next_cursor
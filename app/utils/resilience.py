@@ -0,0 +1,74 @@
+import random
+import threading
+import time
+
+
+class CircuitOpenError(Exception):
+    """서킷 브레이커가 열려 있어 호출을 즉시 거부할 때 발생합니다."""
+
+
+class CircuitBreaker:
+    """연속 실패 횟수 기반의 스레드 안전한 서킷 브레이커입니다.
+
+    - closed: 정상 상태. 연속 실패가 `failure_threshold`에 도달하면 open으로 전환합니다.
+    - open: `reset_timeout`초 동안 모든 호출을 즉시 거부합니다.
+    - half_open: 시험 호출 하나만 허용하고, 결과에 따라 closed 또는 open으로 전환합니다.
+    """
+
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+
+    def __init__(self, failure_threshold=5, reset_timeout=30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._state = self.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probing = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self):
+        with self._lock:
+            return self._state
+
+    def before_call(self):
+        """호출 가능 여부를 확인하고, 불가능하면 CircuitOpenError를 발생시킵니다."""
+        with self._lock:
+            if self._state == self.OPEN:
+                remaining = self._opened_at + self.reset_timeout - time.monotonic()
+                if remaining > 0:
+                    raise CircuitOpenError(
+                        f"Azure OpenAI 엔드포인트 장애로 요청을 차단했습니다. {remaining:.1f}초 후 다시 시도해주세요.")
+                self._state = self.HALF_OPEN
+                self._probing = False
+            if self._state == self.HALF_OPEN:
+                if self._probing:
+                    raise CircuitOpenError("Azure OpenAI 엔드포인트 복구 여부를 확인하는 중입니다.")
+                self._probing = True
+
+    def record_success(self):
+        with self._lock:
+            self._state = self.CLOSED
+            self._failures = 0
+            self._probing = False
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            if self._state == self.HALF_OPEN or self._failures >= self.failure_threshold:
+                self._state = self.OPEN
+                self._opened_at = time.monotonic()
+            self._probing = False
+
+
+def backoff_delay(attempt, base=0.5, cap=8.0, retry_after=None):
+    """재시도 대기 시간(초)을 계산합니다.
+
+    서버가 Retry-After를 주면 그 값에 약간의 지터를 더하고,
+    없으면 full jitter 지수 백오프(0 ~ min(cap, base * 2^attempt))를 사용합니다.
+    """
+    if retry_after is not None:
+        return retry_after + random.uniform(0, base)
+    return random.uniform(0, min(cap, base * (2 ** attempt)))
@@ -0,0 +1,243 @@
+import asyncio
+import heapq
+import itertools
+import threading
+import time
+from app.utils.metrics import Counter, Histogram
+
+INTERACTIVE = 0
+BACKGROUND = 1
+PRIORITY_NAMES = {INTERACTIVE: 'interactive', BACKGROUND: 'background'}
+
+SCHEDULER_WAIT = Histogram(
+    'llm_scheduler_wait_seconds', 'LLM 요청이 스케줄러 큐에서 기다린 시간', ('priority',))
+SCHEDULER_REJECTED = Counter(
+    'llm_scheduler_rejected_total', '스케줄러가 거부한 LLM 요청 수', ('priority', 'reason'))
+
+
+class SchedulerRejected(Exception):
+    """큐가 가득 찼거나 대기 시간이 초과되어 LLM 요청을 보내지 않고 거부할 때 발생합니다."""
+
+    def __init__(self, message, retry_after=None):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class TokenBucket:
+    """분당 한도를 초 단위로 채우는 토큰 버킷입니다. 버스트는 `burst_seconds`만큼 허용합니다.
+
+    버킷 용량보다 큰 요청은 버킷이 가득 찼을 때 통과시킵니다 (영원히 대기하지 않도록).
+    """
+
+    def __init__(self, per_minute, burst_seconds=10):
+        self.rate = per_minute / 60.0
+        self.capacity = max(1.0, self.rate * burst_seconds)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+
+    def _refill(self, now):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, amount, now):
+        self._refill(now)
+        needed = min(amount, self.capacity)
+        return 0.0 if self.tokens >= needed else (needed - self.tokens) / self.rate
+
+    def take(self, amount, now):
+        self._refill(now)
+        self.tokens -= min(amount, self.capacity)
+
+    def fill_ratio(self, now):
+        self._refill(now)
+        return self.tokens / self.capacity
+
+
+class _Deployment:
+    def __init__(self, name, rpm, tpm, burst_seconds):
+        self.name = name
+        self.requests = TokenBucket(rpm, burst_seconds) if rpm else None
+        self.tokens = TokenBucket(tpm, burst_seconds) if tpm else None
+        self.blocked_until = 0.0
+        self.granted = 0
+
+    def wait_time(self, tokens, now):
+        wait = max(0.0, self.blocked_until - now)
+        if self.requests is not None:
+            wait = max(wait, self.requests.wait_time(1, now))
+        if self.tokens is not None:
+            wait = max(wait, self.tokens.wait_time(tokens, now))
+        return wait
+
+    def take(self, tokens, now):
+        if self.requests is not None:
+            self.requests.take(1, now)
+        if self.tokens is not None:
+            self.tokens.take(tokens, now)
+        self.granted += 1
+
+    def headroom(self, now):
+        # 남은 TPM(없으면 RPM) 비율이 큰 배포로 보내고, 한도가 없으면 요청 수가 적은 쪽으로 보냅니다
+        bucket = self.tokens or self.requests
+        return (bucket.fill_ratio(now) if bucket is not None else 1.0, -self.granted)
+
+
+class _Waiter:
+    __slots__ = ('priority', 'seq', 'tokens', 'notify', 'granted', 'deployment', 'rejected')
+
+    def __init__(self, priority, seq, tokens, notify):
+        self.priority = priority
+        self.seq = seq
+        self.tokens = tokens
+        self.notify = notify
+        self.granted = False
+        self.deployment = None
+        self.rejected = None
+
+    def __lt__(self, other):
+        return (self.priority, self.seq) < (other.priority, other.seq)
+
+
+class LLMScheduler:
+    """Azure OpenAI 배포의 RPM/TPM 한도 안에서 LLM 요청을 우선순위대로 내보내는 스케줄러입니다.
+
+    - 배포마다 요청 수(RPM)와 예상 토큰 수(TPM) 토큰 버킷을 두고, 여유가 있는 배포에 요청을 배정합니다.
+      Azure처럼 예상 토큰은 프롬프트 토큰 + max_completion_tokens로 계산합니다.
+    - 대기 중인 요청은 우선순위(interactive > background), 도착 순서대로 처리합니다.
+    - 큐가 가득 차면 더 낮은 우선순위의 최근 요청을 밀어내거나 새 요청을 바로 거부하고,
+      최대 대기 시간을 넘긴 요청도 거부합니다 (SchedulerRejected).
+    - 429를 받은 배포는 Retry-After 동안 배정하지 않습니다.
+    """
+
+    def __init__(self, deployments, rpm=0, tpm=0, burst_seconds=10, max_queue_depth=100,
+                 max_wait=30.0, background_max_wait=120.0):
+        self._deployments = [_Deployment(name, rpm, tpm, burst_seconds) for name in deployments]
+        self.max_queue_depth = max_queue_depth
+        self.max_wait = {INTERACTIVE: max_wait, BACKGROUND: background_max_wait}
+        self._queue = []
+        self._waiting = 0
+        self._seq = itertools.count()
+        self._lock = threading.Lock()
+        self._timer = None
+        self._timer_at = None
+
+    @property
+    def deployments(self):
+        return [d.name for d in self._deployments]
+
+    def queue_depth(self):
+        with self._lock:
+            return self._waiting
+
+    def acquire(self, tokens, priority=INTERACTIVE):
+        """요청을 보낼 배포 이름을 배정받을 때까지 기다립니다."""
+        start = time.monotonic()
+        event = threading.Event()
+        waiter = self._enqueue(tokens, priority, event.set)
+        event.wait(self.max_wait[priority])
+        return self._finish(waiter, start)
+
+    async def acquire_async(self, tokens, priority=INTERACTIVE):
+        """`acquire`의 비동기 버전입니다. 기다리는 동안 이벤트 루프를 막지 않습니다."""
+        start = time.monotonic()
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+
+        def notify():
+            loop.call_soon_threadsafe(lambda: future.done() or future.set_result(None))
+
+        waiter = self._enqueue(tokens, priority, notify)
+        try:
+            await asyncio.wait_for(asyncio.shield(future), self.max_wait[priority])
+        except asyncio.TimeoutError:
+            pass
+        except asyncio.CancelledError:
+            self._cancel(waiter)
+            raise
+        return self._finish(waiter, start)
+
+    def penalize(self, deployment, retry_after=None):
+        """429를 받은 배포를 Retry-After(없으면 1초) 동안 배정 대상에서 제외합니다."""
+        with self._lock:
+            for d in self._deployments:
+                if d.name == deployment:
+                    d.blocked_until = max(d.blocked_until, time.monotonic() + (retry_after or 1.0))
+            self._dispatch_locked()
+
+    def _enqueue(self, tokens, priority, notify):
+        with self._lock:
+            waiter = _Waiter(priority, next(self._seq), tokens, notify)
+            if self._waiting >= self.max_queue_depth:
+                # 더 급한 요청이면 가장 늦게 들어온 낮은 우선순위 요청을 밀어내고, 아니면 바로 거부합니다
+                victim = max((w for w in self._queue if w.rejected is None),
+                             key=lambda w: (w.priority, w.seq), default=None)
+                if victim is None or victim.priority <= priority:
+                    raise self._rejection(waiter, 'queue_full')
+                victim.rejected = 'evicted'
+                self._waiting -= 1
+                victim.notify()
+            heapq.heappush(self._queue, waiter)
+            self._waiting += 1
+            self._dispatch_locked()
+            return waiter
+
+    def _cancel(self, waiter):
+        with self._lock:
+            if not waiter.granted and waiter.rejected is None:
+                waiter.rejected = 'cancelled'
+                self._waiting -= 1
+
+    def _finish(self, waiter, start):
+        with self._lock:
+            if not waiter.granted:
+                if waiter.rejected is None:
+                    waiter.rejected = 'timeout'
+                    self._waiting -= 1
+                    self._dispatch_locked()
+                raise self._rejection(waiter, waiter.rejected)
+        SCHEDULER_WAIT.observe(time.monotonic() - start, priority=PRIORITY_NAMES[waiter.priority])
+        return waiter.deployment
+
+    def _rejection(self, waiter, reason):
+        SCHEDULER_REJECTED.inc(priority=PRIORITY_NAMES[waiter.priority], reason=reason)
+        now = time.monotonic()
+        retry_after = min(d.wait_time(1, now) for d in self._deployments) or 1.0
+        return SchedulerRejected(
+            f"LLM 요청이 많아 처리하지 못했습니다 ({reason}). 잠시 후 다시 시도해주세요.",
+            retry_after=retry_after)
+
+    def _dispatch_locked(self):
+        """큐 맨 앞 요청부터 여유 있는 배포에 배정합니다. 여유가 없으면 다시 확인할 타이머를 겁니다."""
+        now = time.monotonic()
+        while self._queue:
+            waiter = self._queue[0]
+            if waiter.rejected is not None:
+                heapq.heappop(self._queue)
+                continue
+            ready = [d for d in self._deployments if d.wait_time(waiter.tokens, now) <= 0]
+            if not ready:
+                self._schedule_timer(min(d.wait_time(waiter.tokens, now) for d in self._deployments), now)
+                return
+            deployment = max(ready, key=lambda d: d.headroom(now))
+            deployment.take(waiter.tokens, now)
+            heapq.heappop(self._queue)
+            waiter.granted = True
+            waiter.deployment = deployment.name
+            self._waiting -= 1
+            waiter.notify()
+
+    def _schedule_timer(self, delay, now):
+        at = now + delay
+        if self._timer is not None and self._timer_at <= at:
+            return
+        if self._timer is not None:
+            self._timer.cancel()
+        self._timer = threading.Timer(delay, self._on_timer)
+        self._timer.daemon = True
+        self._timer_at = at
+        self._timer.start()
+
+    def _on_timer(self):
+        with self._lock:
+            self._timer = None
+            self._dispatch_locked()
@@ -0,0 +1,111 @@
+import base64
+import numpy as np
+from flask import request
+
+
+def _isoformat(value):
+    return value.isoformat() if value is not None else None
+
+
+def _str(value):
+    return str(value) if value is not None else None
+
+
+def encode_vector(vector, vector_format='list'):
+    """벡터를 JSON 값으로 변환합니다.
+
+    - list: float 배열
+    - base64: little-endian float32 바이트를 base64로 인코딩한 문자열 (배열 대비 약 1/3 크기)
+    """
+    if vector is None:
+        return None
+    if vector_format == 'base64':
+        return base64.b64encode(np.asarray(vector, dtype='<f4').tobytes()).decode('ascii')
+    return np.asarray(vector, dtype=np.float32).tolist()
+
+
+MESSAGE_FIELDS = {
+    'id': lambda m, _: str(m.id),
+    'session_id': lambda m, _: _str(m.session_id),
+    'user_id': lambda m, _: _str(m.user_id),
+    'content': lambda m, _: m.content,
+    'role': lambda m, _: m.role,
+    'timestamp': lambda m, _: _isoformat(m.timestamp),
+    'vector': lambda m, vector_format: encode_vector(m.vector, vector_format),
+    'prompt_tokens': lambda m, _: m.prompt_tokens,
+    'completion_tokens': lambda m, _: m.completion_tokens,
+    'model': lambda m, _: m.model,
+    'deployment': lambda m, _: m.deployment,
+    'latency_ms': lambda m, _: m.latency_ms,
+}
+# 벡터는 1536개 float라 응답 크기와 인코딩 비용을 좌우하므로 명시적으로 요청할 때만 포함합니다
+DEFAULT_MESSAGE_FIELDS = ('id', 'session_id', 'user_id', 'content', 'role', 'timestamp')
+CHAT_MESSAGE_FIELDS = ('id', 'content', 'role', 'timestamp')
+
+SESSION_FIELDS = {
+    'id': lambda s, _: str(s.id),
+    'user_id': lambda s, _: _str(s.user_id),
+    'title': lambda s, _: s.title,
+    'description': lambda s, _: s.description,
+    'title_status': lambda s, _: s.title_status,
+    'start_at': lambda s, _: _isoformat(s.start_at),
+    'finish_at': lambda s, _: _isoformat(s.finish_at),
+}
+DEFAULT_SESSION_FIELDS = tuple(SESSION_FIELDS)
+
+USER_FIELDS = {
+    'id': lambda u, _: str(u.id),
+    'username': lambda u, _: u.username,
+    'email': lambda u, _: u.email,
+}
+DEFAULT_USER_FIELDS = tuple(USER_FIELDS)
+
+
+def _parse_fields(allowed, default):
+    """`fields` 쿼리 파라미터(쉼표 구분)로 응답 필드를 고릅니다. id는 항상 포함합니다."""
+    value = request.args.get('fields')
+    if not value:
+        return default
+    fields = [f.strip() for f in value.split(',') if f.strip()]
+    unknown = [f for f in fields if f not in allowed]
+    if unknown:
+        raise ValueError(f"알 수 없는 필드입니다: {', '.join(unknown)}")
+    if 'id' not in fields:
+        fields.insert(0, 'id')
+    return tuple(fields)
+
+
+def _parse_vector_format():
+    vector_format = request.args.get('vector_format', 'list')
+    if vector_format not in ('list', 'base64'):
+        raise ValueError('vector_format은 list 또는 base64여야 합니다')
+    return vector_format
+
+
+def message_options(default=DEFAULT_MESSAGE_FIELDS):
+    """요청 파라미터(fields, vector_format)로 serialize_message 옵션을 만듭니다."""
+    return {'fields': _parse_fields(MESSAGE_FIELDS, default), 'vector_format': _parse_vector_format()}
+
+
+def session_options(default=DEFAULT_SESSION_FIELDS):
+    return {'fields': _parse_fields(SESSION_FIELDS, default)}
+
+
+def user_options(default=DEFAULT_USER_FIELDS):
+    return {'fields': _parse_fields(USER_FIELDS, default)}
+
+
+def _serialize(getters, obj, fields, vector_format=None):
+    return {field: getters[field](obj, vector_format) for field in fields}
+
+
+def serialize_message(message, fields=DEFAULT_MESSAGE_FIELDS, vector_format='list'):
+    return _serialize(MESSAGE_FIELDS, message, fields, vector_format)
+
+
+def serialize_session(session, fields=DEFAULT_SESSION_FIELDS):
+    return _serialize(SESSION_FIELDS, session, fields)
+
+
+def serialize_user(user, fields=DEFAULT_USER_FIELDS):
+    return _serialize(USER_FIELDS, user, fields)
@@ -0,0 +1,51 @@
+import re
+import unicodedata
+
+# pg_trgm은 3글자 단위로 색인하므로 이보다 짧은 검색어만으로는 GIN 인덱스를 쓸 수 없습니다
+TRIGRAM_MIN_CHARS = 3
+MAX_TERMS = 8
+
+
+def parse_terms(q):
+    """검색어를 공백 기준으로 나눕니다 (NFC 정규화, 중복 제거, 최대 MAX_TERMS개).
+
+    한국어는 조사/어미가 붙어 형태가 바뀌므로 단어 단위가 아니라 부분 문자열로 일치시킵니다.
+    ("서울" 검색 시 "서울에서", "서울은"도 일치)
+    """
+    terms = []
+    for term in unicodedata.normalize('NFC', q).split():
+        if term.lower() not in (t.lower() for t in terms):
+            terms.append(term)
+    if len(terms) > MAX_TERMS:
+        raise ValueError(f'검색어는 최대 {MAX_TERMS}개 단어까지 사용할 수 있습니다')
+    return terms
+
+
+def like_pattern(term):
+    """부분 일치용 LIKE 패턴을 만듭니다 (와일드카드 문자는 이스케이프, escape 문자는 '\\')."""
+    escaped = term.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+    return f'%{escaped}%'
+
+
+def make_snippet(content, terms, width=120):
+    """첫 번째 일치 위치 주변 `width`자를 잘라내고, 잘라낸 문자열 안의 일치 구간을 반환합니다.
+
+    반환값: (snippet, highlights) — highlights는 snippet 기준 [start, end) 목록입니다.
+    """
+    if not content:
+        return '', []
+    pattern = re.compile('|'.join(re.escape(t) for t in sorted(terms, key=len, reverse=True)), re.IGNORECASE)
+    first = pattern.search(content)
+    start = 0
+    if first and len(content) > width:
+        # 일치 구간이 가운데 오도록 앞쪽 문맥을 남깁니다
+        start = max(0, min(first.start() - width // 3, len(content) - width))
+    end = min(len(content), start + width)
+    snippet = content[start:end]
+    highlights = [[m.start(), m.end()] for m in pattern.finditer(snippet)]
+    if start > 0:
+        snippet = '…' + snippet
+        highlights = [[s + 1, e + 1] for s, e in highlights]
+    if end < len(content):
+        snippet += '…'
+    return snippet, highlights
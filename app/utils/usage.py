@@ -0,0 +1,36 @@
+from datetime import datetime, timezone
+from sqlalchemy.dialects.postgresql import insert
+from app.models import UsageDaily, UsageSession, db
+
+_COUNTERS = ('requests', 'prompt_tokens', 'completion_tokens', 'total_tokens')
+
+
+def _increment(statement, model):
+    return {name: getattr(model, name) + getattr(statement.excluded, name) for name in _COUNTERS}
+
+
+def record_usage(session_id, user_id, usage, at=None):
+    """AI 응답 한 건의 토큰 사용량을 사용자 일별/세션별 집계에 더합니다.
+
+    INSERT ... ON CONFLICT DO UPDATE로 한 행씩만 갱신하므로 message 테이블을 다시 집계하지 않습니다.
+    호출한 쪽의 트랜잭션에서 실행되어 메시지 저장과 함께 커밋/롤백됩니다.
+    """
+    if usage is None or usage.prompt_tokens is None:
+        return
+    at = at or datetime.now(timezone.utc)
+    values = {
+        'requests': 1,
+        'prompt_tokens': usage.prompt_tokens,
+        'completion_tokens': usage.completion_tokens,
+        'total_tokens': usage.prompt_tokens + usage.completion_tokens
+    }
+
+    daily = insert(UsageDaily).values(user_id=user_id, day=at.date(), **values)
+    db.session.execute(daily.on_conflict_do_update(
+        index_elements=[UsageDaily.user_id, UsageDaily.day],
+        set_=_increment(daily, UsageDaily)))
+
+    per_session = insert(UsageSession).values(session_id=session_id, user_id=user_id, last_used_at=at, **values)
+    db.session.execute(per_session.on_conflict_do_update(
+        index_elements=[UsageSession.session_id],
+        set_={**_increment(per_session, UsageSession), 'last_used_at': per_session.excluded.last_used_at}))
@@ -0,0 +1,121 @@
+import logging
+from datetime import datetime, timedelta, timezone
+import click
+from flask import current_app
+from sqlalchemy import func, text
+from app.models import Message, Session, db
+
+logger = logging.getLogger(__name__)
+
+HOT_PARTITION = 'message_hot'
+HOT_DEFAULT_PARTITION = 'message_hot_default'
+
+
+def _month_start(value):
+    return datetime(value.year, value.month, 1, tzinfo=timezone.utc)
+
+
+def _next_month(month):
+    return _month_start(month + timedelta(days=32))
+
+
+def partition_name(month):
+    return f'{HOT_PARTITION}_p{month:%Y_%m}'
+
+
+def _create_partition(name, start, end):
+    """월별 파티션을 만들고, 기본 파티션에 들어가 있던 해당 월의 메시지를 옮긴 뒤 연결합니다.
+
+    기본 파티션에 범위가 겹치는 행이 있으면 `PARTITION OF`로 바로 만들 수 없으므로
+    빈 테이블을 만들어 채운 다음 ATTACH합니다.
+    """
+    columns = ', '.join(f'"{c.name}"' for c in Message.__table__.columns)
+    db.session.execute(text(f'CREATE TABLE {name} (LIKE {HOT_PARTITION} INCLUDING DEFAULTS)'))
+    moved = db.session.execute(text(
+        f'WITH moved AS (DELETE FROM {HOT_DEFAULT_PARTITION} '
+        f'WHERE "timestamp" >= :start AND "timestamp" < :end RETURNING {columns}) '
+        f'INSERT INTO {name} ({columns}) SELECT {columns} FROM moved'), {'start': start, 'end': end}).rowcount
+    db.session.execute(text(
+        f"ALTER TABLE {HOT_PARTITION} ATTACH PARTITION {name} "
+        f"FOR VALUES FROM ('{start.isoformat()}') TO ('{end.isoformat()}')"))
+    if moved:
+        logger.info("Moved %d messages from %s to %s", moved, HOT_DEFAULT_PARTITION, name)
+
+
+def ensure_message_partitions(months_ahead, now=None):
+    """이번 달부터 `months_ahead`개월 뒤까지의 월별 hot 파티션을 만듭니다. 새로 만든 파티션 이름을 반환합니다."""
+    month = _month_start(now or datetime.now(timezone.utc))
+    created = []
+    for _ in range(months_ahead + 1):
+        name = partition_name(month)
+        # 여러 프로세스가 동시에 실행해도 한 번만 만들도록 잠근 뒤 다시 확인합니다
+        db.session.execute(text("SELECT pg_advisory_xact_lock(hashtext('message_partitions'))"))
+        if db.session.execute(text('SELECT to_regclass(:name)'), {'name': name}).scalar() is None:
+            _create_partition(name, month, _next_month(month))
+            created.append(name)
+        db.session.commit()
+        month = _next_month(month)
+    return created
+
+
+def archive_finished_sessions(after_days, batch_size, limit=None):
+    """종료된 지 `after_days`일이 지난 세션의 메시지를 archive 파티션으로 옮깁니다.
+
+    세션 `batch_size`개씩 한 트랜잭션으로 처리하며, 세션 행을 `FOR UPDATE SKIP LOCKED`로 선점하므로
+    여러 프로세스가 동시에 실행되거나 세션을 다시 여는 요청과 겹쳐도 안전합니다.
+    반환값: (처리한 세션 수, 옮긴 메시지 수)
+    """
+    cutoff = datetime.now(timezone.utc) - timedelta(days=after_days)
+    sessions = messages = 0
+    while limit is None or sessions < limit:
+        size = batch_size if limit is None else min(batch_size, limit - sessions)
+        session_ids = [row.id for row in (db.session.query(Session.id)
+                                          .filter(Session.finish_at < cutoff, Session.archived_at.is_(None))
+                                          .order_by(Session.finish_at)
+                                          .limit(size)
+                                          .with_for_update(skip_locked=True))]
+        if not session_ids:
+            db.session.rollback()
+            break
+        # 파티션 키를 바꾸면 PostgreSQL이 행을 archive 파티션으로 옮깁니다
+        messages += (Message.query
+                     .filter(Message.session_id.in_(session_ids), Message.archived.is_(False))
+                     .update({Message.archived: True}, synchronize_session=False))
+        (Session.query
+         .filter(Session.id.in_(session_ids))
+         .update({Session.archived_at: func.now()}, synchronize_session=False))
+        db.session.commit()
+        sessions += len(session_ids)
+    return sessions, messages
+
+
+def restore_session_messages(session):
+    """다시 열린 세션의 메시지를 hot 파티션으로 되돌립니다 (호출한 쪽의 트랜잭션에서 실행)."""
+    (Message.query
+     .filter(Message.session_id == session.id, Message.archived.is_(True))
+     .update({Message.archived: False}, synchronize_session=False))
+    session.archived_at = None
+
+
+@click.command('create-message-partitions')
+@click.option('--months-ahead', type=int, default=None)
+def create_message_partitions_command(months_ahead):
+    """앞으로 쓸 월별 메시지 파티션을 미리 만듭니다 (매월 실행)."""
+    if months_ahead is None:
+        months_ahead = current_app.config['MESSAGE_PARTITION_MONTHS_AHEAD']
+    created = ensure_message_partitions(months_ahead)
+    click.echo(f"{len(created)}개 파티션을 만들었습니다." + (f" ({', '.join(created)})" if created else ''))
+
+
+@click.command('archive-sessions')
+@click.option('--after-days', type=int, default=None, help='세션 종료 후 경과 일수 (기본 MESSAGE_ARCHIVE_AFTER_DAYS)')
+@click.option('--batch-size', type=int, default=None)
+@click.option('--limit', type=int, default=None, help='이번 실행에서 처리할 최대 세션 수')
+def archive_sessions_command(after_days, batch_size, limit):
+    """오래전에 종료된 세션의 메시지를 압축된 archive 파티션으로 옮깁니다."""
+    config = current_app.config
+    sessions, messages = archive_finished_sessions(
+        config['MESSAGE_ARCHIVE_AFTER_DAYS'] if after_days is None else after_days,
+        batch_size or config['MESSAGE_ARCHIVE_BATCH_SIZE'],
+        limit=limit)
+    click.echo(f"{sessions}개 세션의 메시지 {messages}건을 아카이브했습니다.")
@@ -0,0 +1,141 @@
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+import click
+import openai
+from flask import current_app
+from sqlalchemy import bindparam, update
+from app.models import Message, db
+from app.utils.openai_client import get_openai_client, get_embeddings
+
+logger = logging.getLogger(__name__)
+
+# 반복 실패한 메시지를 다시 고르지 않도록 기억하는 최대 개수
+MAX_FAILED_IDS = 10000
+
+
+class EmbeddingWorker:
+    """`Message.vector`가 비어 있는 메시지를 배치로 임베딩해 채우는 백그라운드 작업입니다.
+
+    메시지를 잠그지 않고 고른 뒤 API를 호출하고, 저장할 때 `vector IS NULL`이고 내용이 그대로인
+    행만 갱신합니다. 임베딩 요청(재시도 포함) 동안 메시지 수정/삭제를 막지 않으며, 여러 프로세스가
+    같은 메시지를 고르더라도 먼저 저장한 결과만 남습니다.
+    """
+
+    def __init__(self, app, batch_size=None, concurrency=None, poll_interval=None):
+        self.app = app
+        self.batch_size = batch_size or app.config['EMBEDDING_BATCH_SIZE']
+        self.concurrency = concurrency or app.config['EMBEDDING_CONCURRENCY']
+        self.poll_interval = poll_interval or app.config['EMBEDDING_POLL_INTERVAL']
+        self.max_chars = app.config['EMBEDDING_MAX_CHARS']
+        self._failed_ids = set()
+        self._stop = threading.Event()
+        self._thread = None
+        self._executor = ThreadPoolExecutor(max_workers=self.concurrency,
+                                            thread_name_prefix='embedding')
+
+    def _select(self, limit):
+        """임베딩할 메시지 (id, content)를 최대 `limit`개 고릅니다."""
+        with self.app.app_context():
+            query = (db.session.query(Message.id, Message.content)
+                     .filter(Message.vector.is_(None),
+                             Message.content.isnot(None),
+                             Message.content != ''))
+            if self._failed_ids:
+                query = query.filter(Message.id.notin_(list(self._failed_ids)))
+            rows = query.order_by(Message.timestamp).limit(limit).all()
+            db.session.rollback()
+            return rows
+
+    def _save(self, rows, vectors):
+        """임베딩을 저장합니다. 그 사이 다른 워커가 채웠거나 내용이 바뀐 메시지는 건너뜁니다."""
+        table = Message.__table__
+        statement = (update(table)
+                     .where(table.c.id == bindparam('message_id'),
+                            table.c.vector.is_(None),
+                            table.c.content == bindparam('message_content'))
+                     .values(vector=bindparam('embedding')))
+        with self.app.app_context():
+            try:
+                db.session.execute(statement, [
+                    {'message_id': message_id, 'message_content': content, 'embedding': vector}
+                    for (message_id, content), vector in zip(rows, vectors)
+                ])
+                db.session.commit()
+            except Exception:
+                db.session.rollback()
+                raise
+
+    def _process_batch(self, rows):
+        """메시지 한 배치를 임베딩해 저장합니다. 처리한 개수를 반환합니다.
+
+        입력이 거부되면(400) 배치를 반으로 나눠 다시 요청해 거부된 메시지만 제외합니다.
+        """
+        try:
+            vectors = get_embeddings(get_openai_client(),
+                                     [content[:self.max_chars] for _, content in rows])
+        except Exception as e:
+            # 429/장애는 다음 주기에 다시 시도합니다
+            if not isinstance(e.__cause__, openai.BadRequestError):
+                logger.warning("Error embedding messages: %s", e)
+                return 0
+            if len(rows) > 1:
+                middle = len(rows) // 2
+                return self._process_batch(rows[:middle]) + self._process_batch(rows[middle:])
+            logger.warning("Embedding input rejected for message %s: %s", rows[0][0], e)
+            if len(self._failed_ids) < MAX_FAILED_IDS:
+                self._failed_ids.add(rows[0][0])
+            return 0
+
+        try:
+            self._save(rows, vectors)
+        except Exception as e:
+            logger.warning("Error saving embeddings: %s", e)
+            return 0
+        return len(rows)
+
+    def run_once(self):
+        """메시지를 한 번에 고른 뒤 `concurrency`개의 배치로 나눠 동시에 처리합니다. 처리한 메시지 수를 반환합니다."""
+        rows = self._select(self.batch_size * self.concurrency)
+        batches = [rows[i:i + self.batch_size] for i in range(0, len(rows), self.batch_size)]
+        futures = [self._executor.submit(self._process_batch, batch) for batch in batches]
+        return sum(future.result() for future in futures)
+
+    def run_forever(self):
+        while not self._stop.is_set():
+            processed = self.run_once()
+            if processed == 0:
+                self._stop.wait(self.poll_interval)
+
+    def start(self):
+        """데몬 스레드에서 작업을 시작합니다."""
+        if self._thread is None:
+            self._thread = threading.Thread(target=self.run_forever, name='embedding-worker',
+                                            daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        self._executor.shutdown(wait=True)
+
+
+@click.command('embed-messages')
+@click.option('--once', is_flag=True, help='비어 있는 메시지를 모두 처리한 뒤 종료합니다.')
+@click.option('--batch-size', type=int, default=None)
+@click.option('--concurrency', type=int, default=None)
+def embed_messages_command(once, batch_size, concurrency):
+    """임베딩이 없는 메시지를 배치로 임베딩합니다."""
+    worker = EmbeddingWorker(current_app._get_current_object(),
+                             batch_size=batch_size, concurrency=concurrency)
+    if not once:
+        worker.run_forever()
+        return
+    total = 0
+    while True:
+        processed = worker.run_once()
+        if processed == 0:
+            break
+        total += processed
+    click.echo(f"{total}개 메시지를 임베딩했습니다.")
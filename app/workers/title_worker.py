@@ -0,0 +1,123 @@
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+import click
+from flask import current_app
+from app.models import Message, Session, db
+from app.utils.openai_client import get_openai_client, get_completion
+from app.utils.resilience import backoff_delay
+from app.utils.scheduler import BACKGROUND
+
+logger = logging.getLogger(__name__)
+
+TITLE_SYSTEM_PROMPT = "당신은 대화의 맥락을 이해하고 적절한 제목과 설명을 생성하는 AI 어시스턴트입니다."
+
+
+def provisional_title(content):
+    """제목 생성이 끝나기 전까지 사용할 임시 제목과 설명을 만듭니다."""
+    return content[:20], content[:100]
+
+
+def generate_title_and_description(content):
+    """첫 메시지를 기반으로 세션 제목과 설명을 생성합니다."""
+    messages = [
+        {"role": "system", "content": TITLE_SYSTEM_PROMPT},
+        {"role": "user", "content": f"다음 대화의 제목과 설명을 생성해주세요. 제목은 20자 이내로, 설명은 100자 이내로 작성해주세요. 대화 내용: {content}"}
+    ]
+    # 제목 생성은 사용자 응답보다 뒤로 미뤄도 되므로 낮은 우선순위로 요청합니다
+    response = get_completion(get_openai_client(), messages, use_cache=True, priority=BACKGROUND)
+
+    # 응답에서 제목과 설명 추출
+    lines = response.strip().split('\n')
+    title = lines[0].replace('제목:', '').strip()
+    description = lines[1].replace('설명:', '').strip() if len(lines) > 1 else content[:100]
+    return title, description
+
+
+class TitleWorker:
+    """세션 제목/설명을 요청 경로 밖에서 생성하는 백그라운드 스레드 풀입니다.
+
+    `title_status`가 pending인 세션만 갱신하므로 같은 세션이 여러 번 제출되어도
+    (재시도, 여러 프로세스) 결과는 한 번만 반영됩니다.
+    실패하면 지터 백오프 후 TITLE_MAX_ATTEMPTS까지 재시도하고, 끝내 실패하면
+    임시 제목을 유지한 채 failed로 표시합니다.
+    """
+
+    def __init__(self, app, max_workers=None, max_attempts=None):
+        self.app = app
+        self.max_attempts = max_attempts or app.config['TITLE_MAX_ATTEMPTS']
+        self.retry_backoff = app.config['TITLE_RETRY_BACKOFF']
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers or app.config['TITLE_WORKER_THREADS'],
+            thread_name_prefix='title')
+
+    def submit(self, session_id, content, attempt=1):
+        self._executor.submit(self._run, session_id, content, attempt)
+
+    def process(self, session_id, content):
+        """제목을 한 번 생성해 반영합니다. 이미 처리된 세션이면 건너뜁니다. 실패 시 예외를 그대로 올립니다."""
+        status = db.session.query(Session.title_status).filter(Session.id == session_id).scalar()
+        if status != 'pending':
+            return False
+        title, description = generate_title_and_description(content)
+        fallback_title, fallback_description = provisional_title(content)
+        self._update(session_id, {
+            'title': title or fallback_title,
+            'description': description or fallback_description,
+            'title_status': 'done'
+        })
+        return True
+
+    def _run(self, session_id, content, attempt):
+        with self.app.app_context():
+            try:
+                self.process(session_id, content)
+            except Exception as e:
+                db.session.rollback()
+                logger.warning("Error generating session title (attempt %s): %s", attempt, e)
+                if attempt < self.max_attempts:
+                    delay = backoff_delay(attempt, base=self.retry_backoff, cap=60)
+                    timer = threading.Timer(delay, self.submit, args=(session_id, content, attempt + 1))
+                    timer.daemon = True
+                    timer.start()
+                else:
+                    self._update(session_id, {'title_status': 'failed'})
+
+    def _update(self, session_id, values):
+        try:
+            (Session.query
+             .filter(Session.id == session_id, Session.title_status == 'pending')
+             .update(values, synchronize_session=False))
+            db.session.commit()
+        except Exception as e:
+            db.session.rollback()
+            logger.warning("Error updating session title: %s", e)
+
+    def shutdown(self):
+        self._executor.shutdown(wait=True)
+
+
+@click.command('generate-titles')
+@click.option('--limit', type=int, default=1000)
+def generate_titles_command(limit):
+    """제목 생성이 끝나지 않은(pending) 세션을 다시 처리합니다. (예: 프로세스 재시작 후)"""
+    worker = current_app.extensions['title_worker']
+    session_ids = [row.id for row in (db.session.query(Session.id)
+                                      .filter(Session.title_status == 'pending')
+                                      .order_by(Session.start_at)
+                                      .limit(limit))]
+    done = 0
+    for session_id in session_ids:
+        first = (db.session.query(Message.content)
+                 .filter(Message.session_id == session_id)
+                 .order_by(Message.timestamp)
+                 .limit(1)
+                 .scalar())
+        if not first:
+            continue
+        try:
+            done += worker.process(session_id, first)
+        except Exception as e:
+            db.session.rollback()
+            click.echo(f"{session_id}: {str(e)}")
+    click.echo(f"{done}/{len(session_ids)}개 세션의 제목을 생성했습니다.")
@@ -0,0 +1,6 @@
+from app import create_app
+from app.asgi import AsyncCompletionApp
+
+# 운영 진입점: gunicorn -c gunicorn.conf.py (uvicorn 워커)
+# 채팅 완성 API는 비동기로, 나머지 API는 Flask(WSGI)로 처리합니다
+application = AsyncCompletionApp(create_app())
@@ -0,0 +1,203 @@
+"""벤치마크용 Azure OpenAI 호환 가짜 서버
+
+채팅 완성(스트리밍 포함)과 임베딩 API를 흉내 내며, 지연 시간과 429 응답 비율을 조절할 수 있습니다.
+
+    python -m bench.fake_openai --port 8099 --latency 0.3 --token-latency 0.02 --error-rate 0.05
+
+앱에는 AZURE_OPENAI_ENDPOINT=http://127.0.0.1:8099 을 지정합니다. `GET /stats`로 처리 건수를 확인합니다.
+"""
+import argparse
+import hashlib
+import json
+import random
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+EMBEDDING_DIMENSIONS = 1536
+TITLE_PROMPT_MARKER = '제목과 설명'
+
+
+def estimate_tokens(text):
+    # 실제 토크나이저 대신 바이트 길이로 근사합니다 (한국어 기준 대략 1토큰 = 3바이트)
+    return len(text.encode('utf-8')) // 3 + 1
+
+
+def fake_embedding(text):
+    """같은 텍스트에 항상 같은 단위 벡터를 돌려줍니다."""
+    seed = int.from_bytes(hashlib.sha256(text.encode('utf-8')).digest()[:8], 'big')
+    rng = random.Random(seed)
+    vector = [rng.gauss(0, 1) for _ in range(EMBEDDING_DIMENSIONS)]
+    norm = sum(v * v for v in vector) ** 0.5
+    return [v / norm for v in vector]
+
+
+def reply_tokens(messages, count):
+    """응답 토큰 목록을 만듭니다. 세션 제목 생성 요청에는 `제목:/설명:` 형식으로 답합니다."""
+    last = messages[-1].get('content', '') if messages else ''
+    if TITLE_PROMPT_MARKER in last:
+        return ['제목: 벤치마크 세션', '\n', '설명: 벤치마크용 가짜 응답입니다.']
+    return [f'토큰{i} ' for i in range(count)]
+
+
+class FakeOpenAIHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        if self.path == '/stats':
+            with self.server.stats_lock:
+                stats = dict(self.server.stats)
+            return self._send_json(200, stats)
+        self._send_json(404, {'error': {'code': '404', 'message': 'Not found'}})
+
+    def do_POST(self):
+        length = int(self.headers.get('Content-Length') or 0)
+        body = json.loads(self.rfile.read(length) or b'{}')
+        options = self.server.options
+        path = self.path.split('?', 1)[0]
+
+        if random.random() < options.error_rate:
+            self._count('rate_limited')
+            return self._send_json(
+                429,
+                {'error': {'code': '429', 'message': 'Rate limit is exceeded.'}},
+                {'retry-after-ms': str(int(options.retry_after * 1000))}
+            )
+
+        if path.endswith('/embeddings'):
+            self._count('embeddings')
+            return self._embeddings(body)
+        if path.endswith('/chat/completions'):
+            self._count('chat_stream' if body.get('stream') else 'chat')
+            return self._chat(body)
+        self._send_json(404, {'error': {'code': '404', 'message': 'Not found'}})
+
+    def _count(self, key):
+        with self.server.stats_lock:
+            self.server.stats[key] = self.server.stats.get(key, 0) + 1
+
+    def _send_json(self, status, payload, headers=None):
+        data = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _write_chunk(self, data):
+        self.wfile.write(f'{len(data):x}\r\n'.encode('ascii') + data + b'\r\n')
+        self.wfile.flush()
+
+    def _embeddings(self, body):
+        texts = body.get('input') or []
+        if isinstance(texts, str):
+            texts = [texts]
+        time.sleep(self.server.options.embedding_latency)
+        tokens = sum(estimate_tokens(t) for t in texts)
+        self._send_json(200, {
+            'object': 'list',
+            'model': body.get('model'),
+            'data': [{'object': 'embedding', 'index': i, 'embedding': fake_embedding(t)}
+                     for i, t in enumerate(texts)],
+            'usage': {'prompt_tokens': tokens, 'total_tokens': tokens}
+        })
+
+    def _chat(self, body):
+        options = self.server.options
+        messages = body.get('messages') or []
+        max_tokens = body.get('max_completion_tokens') or options.tokens
+        tokens = reply_tokens(messages, min(options.tokens, max_tokens))
+        usage = {
+            'prompt_tokens': sum(estimate_tokens(m.get('content') or '') for m in messages),
+            'completion_tokens': len(tokens)
+        }
+        usage['total_tokens'] = usage['prompt_tokens'] + usage['completion_tokens']
+        completion_id = f'chatcmpl-{uuid.uuid4().hex}'
+        created = int(time.time())
+
+        time.sleep(options.latency)
+        if not body.get('stream'):
+            time.sleep(options.token_latency * len(tokens))
+            return self._send_json(200, {
+                'id': completion_id,
+                'object': 'chat.completion',
+                'created': created,
+                'model': body.get('model'),
+                'choices': [{
+                    'index': 0,
+                    'message': {'role': 'assistant', 'content': ''.join(tokens)},
+                    'finish_reason': 'stop'
+                }],
+                'usage': usage
+            })
+
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/event-stream')
+        self.send_header('Transfer-Encoding', 'chunked')
+        self.end_headers()
+
+        def event(choices, **extra):
+            payload = {'id': completion_id, 'object': 'chat.completion.chunk', 'created': created,
+                       'model': body.get('model'), 'choices': choices, **extra}
+            self._write_chunk(f'data: {json.dumps(payload, ensure_ascii=False)}\n\n'.encode('utf-8'))
+
+        try:
+            # Azure처럼 첫 청크는 choices 없이 보냅니다 (프롬프트 콘텐츠 필터 결과)
+            event([])
+            for token in tokens:
+                time.sleep(options.token_latency)
+                event([{'index': 0, 'delta': {'content': token}, 'finish_reason': None}])
+            event([{'index': 0, 'delta': {}, 'finish_reason': 'stop'}])
+            if (body.get('stream_options') or {}).get('include_usage'):
+                event([], usage=usage)
+            self._write_chunk(b'data: [DONE]\n\n')
+            self._write_chunk(b'')
+        except (BrokenPipeError, ConnectionResetError):
+            # 클라이언트가 스트림을 중간에 끊은 경우
+            self._count('stream_cancelled')
+            self.close_connection = True
+
+
+def make_server(host='127.0.0.1', port=8099, latency=0.0, token_latency=0.0, tokens=50,
+                embedding_latency=0.0, error_rate=0.0, retry_after=0.5):
+    server = ThreadingHTTPServer((host, port), FakeOpenAIHandler)
+    server.daemon_threads = True
+    server.options = argparse.Namespace(
+        latency=latency, token_latency=token_latency, tokens=tokens,
+        embedding_latency=embedding_latency, error_rate=error_rate, retry_after=retry_after)
+    server.stats = {}
+    server.stats_lock = threading.Lock()
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8099)
+    parser.add_argument('--latency', type=float, default=0.2, help='첫 토큰까지 지연 (초)')
+    parser.add_argument('--token-latency', type=float, default=0.01, help='토큰 사이 지연 (초)')
+    parser.add_argument('--tokens', type=int, default=50, help='응답 토큰 수')
+    parser.add_argument('--embedding-latency', type=float, default=0.05, help='임베딩 요청 지연 (초)')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='429로 응답할 비율 (0~1)')
+    parser.add_argument('--retry-after', type=float, default=0.5, help='429 응답의 Retry-After (초)')
+    args = parser.parse_args()
+
+    server = make_server(args.host, args.port, args.latency, args.token_latency, args.tokens,
+                         args.embedding_latency, args.error_rate, args.retry_after)
+    print(f'Fake Azure OpenAI listening on http://{args.host}:{args.port}', flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,399 @@
+"""벤치마크 실행기
+
+가짜 Azure OpenAI 서버(bench.fake_openai)와 앱을 띄우고, 마이그레이션과 데이터 생성 후
+시나리오별로 부하를 걸어 처리량과 p50/p95/p99 지연 시간을 JSON으로 출력합니다.
+
+    python -m bench.run --database-url postgresql://... --output results.json
+    python -m bench.run --database-url postgresql://... --baseline results.json   # 이전 결과와 비교
+
+DATABASE_URL은 벤치마크 전용 데이터베이스를 가리켜야 합니다 (bench_ 사용자 데이터를 추가/삭제합니다).
+"""
+import argparse
+import itertools
+import json
+import math
+import os
+import platform
+import random
+import subprocess
+import sys
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+import requests
+from bench import seed as bench_seed
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SCENARIOS = {}
+
+
+def scenario(name):
+    def decorator(fn):
+        SCENARIOS[name] = fn
+        return fn
+    return decorator
+
+
+class Context:
+    """시나리오가 공유하는 실행 정보 (기본 URL, 벤치마크 ID, 워커별 상태)"""
+
+    def __init__(self, base_url, ids, options):
+        self.base_url = base_url.rstrip('/')
+        self.ids = ids
+        self.options = options
+        self.local = threading.local()
+
+    def http(self):
+        if not hasattr(self.local, 'http'):
+            self.local.http = requests.Session()
+        return self.local.http
+
+    def url(self, path):
+        return self.base_url + path
+
+
+@scenario('session_create')
+def session_create(ctx, i):
+    response = ctx.http().post(ctx.url('/api/sessions'), json={
+        'user_id': random.choice(ctx.ids['users']),
+        'content': f'벤치마크 세션 생성 {i}'
+    })
+    return response.status_code == 201, {}
+
+
+def _chat_target(ctx, i):
+    sessions = ctx.ids['long_sessions'] or ctx.ids['sessions']
+    return sessions[i % len(sessions)]
+
+
+@scenario('chat')
+def chat(ctx, i):
+    """긴 세션에 대화를 이어 붙입니다 (컨텍스트 구성 + LLM 호출 + 저장)"""
+    target = _chat_target(ctx, i)
+    response = ctx.http().post(ctx.url(f"/api/messages/session/{target['id']}"), json={
+        'user_id': target['user_id'],
+        'content': f'벤치마크 질문 {uuid.uuid4().hex[:8]}'
+    })
+    return response.status_code == 200, {}
+
+
+@scenario('chat_stream')
+def chat_stream(ctx, i):
+    target = _chat_target(ctx, i)
+    started = time.perf_counter()
+    ttfb = None
+    ok = False
+    with ctx.http().post(ctx.url(f"/api/messages/session/{target['id']}?stream=true"), json={
+        'user_id': target['user_id'],
+        'content': f'벤치마크 스트리밍 질문 {uuid.uuid4().hex[:8]}'
+    }, stream=True) as response:
+        if response.status_code != 200:
+            return False, {}
+        for line in response.iter_lines():
+            if line.startswith(b'event: delta') and ttfb is None:
+                ttfb = time.perf_counter() - started
+            elif line.startswith(b'event: done'):
+                ok = True
+    return ok, {'ttfb': ttfb} if ttfb is not None else {}
+
+
+def _paged_get(ctx, path, params):
+    # 워커마다 커서를 이어가며 깊은 페이지까지 읽고, max_pages마다 첫 페이지로 돌아갑니다
+    state = ctx.local.__dict__.setdefault(path + json.dumps(params, sort_keys=True), {'cursor': None, 'pages': 0})
+    query = dict(params, limit=ctx.options.page_size)
+    if state['cursor']:
+        query['cursor'] = state['cursor']
+    response = ctx.http().get(ctx.url(path), params=query)
+    if response.status_code != 200:
+        return False, {}
+    state['pages'] += 1
+    state['cursor'] = response.json().get('next_cursor')
+    if state['pages'] >= ctx.options.max_pages:
+        state['cursor'], state['pages'] = None, 0
+    return True, {}
+
+
+@scenario('list_messages')
+def list_messages(ctx, i):
+    return _paged_get(ctx, '/api/messages', {})
+
+
+@scenario('list_session_messages')
+def list_session_messages(ctx, i):
+    return _paged_get(ctx, '/api/messages', {'session_id': ctx.ids['sessions'][i % len(ctx.ids['sessions'])]['id']})
+
+
+@scenario('list_sessions')
+def list_sessions(ctx, i):
+    return _paged_get(ctx, '/api/sessions', {'include': 'message_count,last_message'})
+
+
+@scenario('bulk_ingest')
+def bulk_ingest(ctx, i):
+    sessions = ctx.ids['sessions']
+    lines = []
+    for n in range(ctx.options.bulk_rows):
+        target = sessions[(i * ctx.options.bulk_rows + n) % len(sessions)]
+        lines.append(json.dumps({
+            'session_id': target['id'],
+            'user_id': target['user_id'],
+            'role': 'user' if n % 2 else 'assistant',
+            'content': f'벤치마크 대량 저장 {i}-{n}'
+        }, ensure_ascii=False))
+    response = ctx.http().post(
+        ctx.url('/api/messages/bulk'),
+        params={'method': ctx.options.bulk_method},
+        data=('\n'.join(lines) + '\n').encode('utf-8'),
+        headers={'Content-Type': 'application/x-ndjson'}
+    )
+    inserted = response.json().get('inserted', 0) if response.status_code == 201 else 0
+    return response.status_code == 201, {'rows': inserted}
+
+
+def percentile(sorted_values, q):
+    """nearest-rank 백분위수"""
+    if not sorted_values:
+        return None
+    rank = math.ceil(q / 100 * len(sorted_values))
+    return sorted_values[max(0, min(len(sorted_values), rank) - 1)]
+
+
+def latency_summary(values):
+    values = sorted(values)
+    if not values:
+        return None
+    ms = lambda v: round(v * 1000, 2)
+    return {
+        'mean': ms(sum(values) / len(values)),
+        'p50': ms(percentile(values, 50)),
+        'p95': ms(percentile(values, 95)),
+        'p99': ms(percentile(values, 99)),
+        'max': ms(values[-1])
+    }
+
+
+def run_scenario(ctx, name, total, concurrency, warmup):
+    fn = SCENARIOS[name]
+    for i in range(warmup):
+        try:
+            fn(ctx, i)
+        except requests.RequestException:
+            pass
+
+    counter = itertools.count()
+    results = []
+    lock = threading.Lock()
+
+    def worker():
+        local = []
+        while True:
+            i = next(counter)
+            if i >= total:
+                break
+            started = time.perf_counter()
+            try:
+                ok, extra = fn(ctx, i)
+            except (requests.RequestException, ValueError):
+                ok, extra = False, {}
+            local.append((time.perf_counter() - started, ok, extra))
+        with lock:
+            results.extend(local)
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        for _ in range(concurrency):
+            executor.submit(worker)
+    elapsed = time.perf_counter() - started
+
+    errors = sum(1 for _, ok, _ in results if not ok)
+    summary = {
+        'requests': len(results),
+        'errors': errors,
+        'error_rate': round(errors / len(results), 4) if results else 0.0,
+        'concurrency': concurrency,
+        'duration_s': round(elapsed, 3),
+        'throughput_rps': round(len(results) / elapsed, 2) if elapsed else None,
+        'latency_ms': latency_summary([latency for latency, ok, _ in results if ok])
+    }
+    ttfb = [extra['ttfb'] for _, ok, extra in results if ok and 'ttfb' in extra]
+    if ttfb:
+        summary['ttfb_ms'] = latency_summary(ttfb)
+    rows = sum(extra.get('rows', 0) for _, _, extra in results)
+    if rows:
+        summary['rows'] = rows
+        summary['rows_per_s'] = round(rows / elapsed, 1)
+    return summary
+
+
+def compare(current, baseline):
+    """이전 결과 대비 처리량과 지연 시간 변화율(%)을 출력합니다."""
+    print(f"{'scenario':<24}{'metric':<16}{'baseline':>12}{'current':>12}{'change':>10}", file=sys.stderr)
+    for name, result in current['scenarios'].items():
+        base = baseline.get('scenarios', {}).get(name)
+        if not base:
+            continue
+        metrics = [('throughput_rps', base.get('throughput_rps'), result.get('throughput_rps'))]
+        for q in ('p50', 'p95', 'p99'):
+            metrics.append((f'{q}_ms', (base.get('latency_ms') or {}).get(q), (result.get('latency_ms') or {}).get(q)))
+        for metric, before, after in metrics:
+            if before is None or after is None:
+                continue
+            change = f'{(after - before) / before * 100:+.1f}%' if before else '-'
+            print(f'{name:<24}{metric:<16}{before:>12}{after:>12}{change:>10}', file=sys.stderr)
+
+
+def wait_for(url, timeout, process=None):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process is not None and process.poll() is not None:
+            raise RuntimeError(f'{url} 프로세스가 종료되었습니다 (exit {process.returncode})')
+        try:
+            if requests.get(url, timeout=1).status_code < 500:
+                return
+        except requests.RequestException:
+            pass
+        time.sleep(0.2)
+    raise RuntimeError(f'{url}이(가) {timeout}초 안에 응답하지 않았습니다')
+
+
+def start_fake_openai(args):
+    command = [
+        sys.executable, '-m', 'bench.fake_openai', '--port', str(args.fake_port),
+        '--latency', str(args.fake_latency), '--token-latency', str(args.fake_token_latency),
+        '--tokens', str(args.fake_tokens), '--error-rate', str(args.fake_error_rate),
+        '--retry-after', str(args.fake_retry_after)
+    ]
+    process = subprocess.Popen(command, cwd=ROOT)
+    wait_for(f'http://127.0.0.1:{args.fake_port}/stats', 10, process)
+    return process
+
+
+def start_app(args):
+    env = dict(os.environ)
+    env.update({
+        'DATABASE_URL': args.database_url,
+        'AZURE_OPENAI_ENDPOINT': f'http://127.0.0.1:{args.fake_port}',
+        'AZURE_OPENAI_API_KEY': 'bench',
+        'AZURE_OPENAI_DEPLOYMENT_NAME': 'bench-chat',
+        'AZURE_OPENAI_EMBEDDING_DEPLOYMENT': 'bench-embedding',
+        'FLASK_DEBUG': '0',
+    })
+    # 같은 프롬프트가 거의 없으므로 응답 캐시는 기본으로 끄고 실제 LLM 경로를 측정합니다
+    env.setdefault('COMPLETION_CACHE_ENABLED', 'false')
+    command = args.app_command.format(python=sys.executable, port=args.app_port).split()
+    process = subprocess.Popen(command, cwd=ROOT, env=env)
+    wait_for(f'http://127.0.0.1:{args.app_port}/', 60, process)
+    return process
+
+
+def git_commit():
+    try:
+        return subprocess.check_output(['git', 'rev-parse', 'HEAD'], cwd=ROOT, text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--database-url', default=os.getenv('DATABASE_URL'))
+    parser.add_argument('--scenarios', default=','.join(SCENARIOS), help='쉼표로 구분한 시나리오 목록')
+    parser.add_argument('--requests', type=int, default=200, help='시나리오별 요청 수')
+    parser.add_argument('--concurrency', type=int, default=8)
+    parser.add_argument('--warmup', type=int, default=5)
+    parser.add_argument('--page-size', type=int, default=50)
+    parser.add_argument('--max-pages', type=int, default=20, help='목록 시나리오에서 커서로 따라갈 최대 페이지 수')
+    parser.add_argument('--bulk-rows', type=int, default=1000, help='대량 저장 요청 한 번의 행 수')
+    parser.add_argument('--bulk-method', default='insert', choices=('insert', 'copy'))
+    parser.add_argument('--seed-messages', type=int, default=1000000)
+    parser.add_argument('--seed-sessions', type=int, default=10000)
+    parser.add_argument('--seed-users', type=int, default=100)
+    parser.add_argument('--reseed', action='store_true', help='벤치마크 데이터를 지우고 다시 만듭니다')
+    parser.add_argument('--skip-migrate', action='store_true')
+    parser.add_argument('--app-url', help='이미 실행 중인 앱을 사용합니다 (앱/가짜 서버를 띄우지 않음)')
+    parser.add_argument('--app-port', type=int, default=5055)
+    parser.add_argument('--app-command', default='{python} -m gunicorn -c gunicorn.conf.py --bind 127.0.0.1:{port}',
+                        help='앱 실행 명령 ({python}, {port} 치환). 개발 서버 비교: '
+                             "'{python} -m flask --app run.py run --port {port} --with-threads'")
+    parser.add_argument('--fake-port', type=int, default=8099)
+    parser.add_argument('--fake-latency', type=float, default=0.2)
+    parser.add_argument('--fake-token-latency', type=float, default=0.01)
+    parser.add_argument('--fake-tokens', type=int, default=50)
+    parser.add_argument('--fake-error-rate', type=float, default=0.0)
+    parser.add_argument('--fake-retry-after', type=float, default=0.5)
+    parser.add_argument('--output', help='결과 JSON 파일 (기본: 표준 출력)')
+    parser.add_argument('--baseline', help='비교할 이전 결과 JSON 파일')
+    args = parser.parse_args()
+    if not args.database_url:
+        parser.error('--database-url 또는 DATABASE_URL이 필요합니다')
+    names = [name.strip() for name in args.scenarios.split(',') if name.strip()]
+    unknown = set(names) - set(SCENARIOS)
+    if unknown:
+        parser.error(f"알 수 없는 시나리오입니다: {', '.join(sorted(unknown))}")
+
+    if not args.skip_migrate:
+        subprocess.run([sys.executable, '-m', 'alembic', 'upgrade', 'head'], cwd=ROOT, check=True,
+                       env=dict(os.environ, DATABASE_URL=args.database_url))
+
+    conn = bench_seed.connect(args.database_url)
+    try:
+        if args.reseed:
+            bench_seed.reset(conn)
+        if not bench_seed.has_seed(conn):
+            started = time.perf_counter()
+            bench_seed.seed(conn, args.seed_users, args.seed_sessions, args.seed_messages)
+            print(f'Seeded {args.seed_messages} messages in {time.perf_counter() - started:.1f}s', file=sys.stderr)
+        ids = bench_seed.load_ids(conn)
+    finally:
+        conn.close()
+
+    processes = []
+    try:
+        if args.app_url:
+            base_url = args.app_url
+        else:
+            processes.append(start_fake_openai(args))
+            processes.append(start_app(args))
+            base_url = f'http://127.0.0.1:{args.app_port}'
+
+        ctx = Context(base_url, ids, args)
+        results = {}
+        for name in names:
+            print(f'Running {name} ...', file=sys.stderr)
+            results[name] = run_scenario(ctx, name, args.requests, args.concurrency, args.warmup)
+
+        report = {
+            'meta': {
+                'timestamp': datetime.now(timezone.utc).isoformat(),
+                'git_commit': git_commit(),
+                'python': platform.python_version(),
+                'platform': platform.platform(),
+                'options': {k: v for k, v in vars(args).items() if k not in ('database_url', 'output', 'baseline')}
+            },
+            'scenarios': results
+        }
+        if not args.app_url:
+            report['fake_openai'] = requests.get(f'http://127.0.0.1:{args.fake_port}/stats', timeout=5).json()
+    finally:
+        for process in reversed(processes):
+            process.terminate()
+            try:
+                process.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                process.kill()
+
+    output = json.dumps(report, ensure_ascii=False, indent=2)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(output + '\n')
+    else:
+        print(output)
+
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as f:
+            compare(report, json.load(f))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,151 @@
+"""벤치마크용 데이터 생성
+
+PostgreSQL의 generate_series로 사용자/세션/메시지를 서버 안에서 바로 만듭니다 (10^6건 기준 수십 초).
+벤치마크 데이터는 `bench_` 접두사가 붙은 사용자에 속하므로 `--reset`으로 따로 지울 수 있습니다.
+
+    python -m bench.seed --database-url postgresql://... --messages 1000000
+"""
+import argparse
+import os
+import time
+import psycopg2
+
+USER_PREFIX = 'bench_'
+LONG_SESSION_TITLE = 'bench long session'
+CHUNK_SIZE = 200000
+
+
+def has_seed(conn):
+    with conn.cursor() as cur:
+        cur.execute('SELECT EXISTS (SELECT 1 FROM "user" WHERE username LIKE %s)', (USER_PREFIX + '%',))
+        return cur.fetchone()[0]
+
+
+def reset(conn):
+    with conn.cursor() as cur:
+        cur.execute("""
+            DELETE FROM message WHERE user_id IN (SELECT id FROM "user" WHERE username LIKE %s);
+            DELETE FROM session WHERE user_id IN (SELECT id FROM "user" WHERE username LIKE %s);
+            DELETE FROM "user" WHERE username LIKE %s;
+        """, (USER_PREFIX + '%',) * 3)
+    conn.commit()
+
+
+def seed(conn, users=100, sessions=10000, messages=1000000, long_sessions=8, long_session_messages=2000):
+    """사용자, 세션, 메시지를 만들고 (일반 메시지는 세션에 고르게 분배) 통계를 갱신합니다."""
+    with conn.cursor() as cur:
+        cur.execute("""
+            INSERT INTO "user" (id, username, email)
+            SELECT gen_random_uuid(), %(prefix)s || i, %(prefix)s || i || '@example.com'
+            FROM generate_series(1, %(users)s) AS i
+        """, {'prefix': USER_PREFIX, 'users': users})
+        cur.execute("""
+            CREATE TEMP TABLE bench_users ON COMMIT DROP AS
+            SELECT id, row_number() OVER (ORDER BY id) - 1 AS n
+            FROM "user" WHERE username LIKE %s
+        """, (USER_PREFIX + '%',))
+        cur.execute("SELECT count(*) FROM bench_users")
+        user_count = cur.fetchone()[0]
+
+        cur.execute("""
+            INSERT INTO session (id, user_id, title, description, start_at, title_status)
+            SELECT gen_random_uuid(), u.id,
+                   CASE WHEN i <= %(long)s THEN %(long_title)s ELSE 'bench session ' || i END,
+                   '', now() - make_interval(mins => i), 'done'
+            FROM generate_series(1, %(sessions)s) AS i
+            JOIN bench_users u ON u.n = i %% %(user_count)s
+        """, {'long': long_sessions, 'long_title': LONG_SESSION_TITLE,
+              'sessions': sessions + long_sessions, 'user_count': user_count})
+        cur.execute("""
+            CREATE TEMP TABLE bench_sessions ON COMMIT DROP AS
+            SELECT id, user_id, title = %s AS long, row_number() OVER (ORDER BY id) - 1 AS n
+            FROM session WHERE user_id IN (SELECT id FROM bench_users)
+        """, (LONG_SESSION_TITLE,))
+        cur.execute("CREATE TEMP TABLE bench_regular ON COMMIT DROP AS "
+                    "SELECT id, user_id, row_number() OVER (ORDER BY id) - 1 AS n "
+                    "FROM bench_sessions WHERE NOT long")
+        cur.execute("SELECT count(*) FROM bench_regular")
+        session_count = cur.fetchone()[0]
+
+        # 긴 대화: 컨텍스트 요약/토큰 예산 경로를 타는 세션
+        cur.execute("""
+            INSERT INTO message (id, session_id, user_id, content, role, timestamp)
+            SELECT gen_random_uuid(), s.id, s.user_id,
+                   '긴 대화 벤치마크 메시지 ' || i || ' ' || repeat('내용 ', 20),
+                   (CASE WHEN i %% 2 = 0 THEN 'user' ELSE 'assistant' END)::role_enum,
+                   now() - make_interval(secs => %(count)s - i)
+            FROM bench_sessions s, generate_series(1, %(count)s) AS i
+            WHERE s.long
+        """, {'count': long_session_messages})
+
+        # 일반 메시지는 청크 단위로 나눠 넣습니다 (WAL/메모리 사용량 제한)
+        for start in range(0, messages, CHUNK_SIZE):
+            stop = min(start + CHUNK_SIZE, messages)
+            cur.execute("""
+                INSERT INTO message (id, session_id, user_id, content, role, timestamp)
+                SELECT gen_random_uuid(), s.id, s.user_id,
+                       '벤치마크 메시지 ' || i,
+                       (CASE WHEN i %% 2 = 0 THEN 'user' ELSE 'assistant' END)::role_enum,
+                       now() - make_interval(secs => %(total)s - i)
+                FROM generate_series(%(start)s, %(stop)s) AS i
+                JOIN bench_regular s ON s.n = i %% %(session_count)s
+            """, {'start': start + 1, 'stop': stop, 'total': messages, 'session_count': session_count})
+        # 플래너 통계를 바로 갱신해 autovacuum 전에도 실제 규모 기준의 실행 계획을 쓰게 합니다
+        cur.execute('ANALYZE "user"; ANALYZE session; ANALYZE message;')
+        conn.commit()
+
+
+def load_ids(conn, limit=1000):
+    """시나리오에서 사용할 벤치마크 사용자/세션 ID를 읽습니다."""
+    with conn.cursor() as cur:
+        cur.execute('SELECT id::text FROM "user" WHERE username LIKE %s ORDER BY id LIMIT %s',
+                    (USER_PREFIX + '%', limit))
+        users = [row[0] for row in cur.fetchall()]
+        cur.execute("""
+            SELECT s.id::text, s.user_id::text, s.title = %s
+            FROM session s JOIN "user" u ON u.id = s.user_id
+            WHERE u.username LIKE %s AND s.finish_at IS NULL
+            ORDER BY s.title = %s DESC, s.start_at DESC LIMIT %s
+        """, (LONG_SESSION_TITLE, USER_PREFIX + '%', LONG_SESSION_TITLE, limit))
+        rows = cur.fetchall()
+    return {
+        'users': users,
+        'sessions': [{'id': sid, 'user_id': uid} for sid, uid, long in rows if not long],
+        'long_sessions': [{'id': sid, 'user_id': uid} for sid, uid, long in rows if long],
+    }
+
+
+def connect(database_url):
+    # SQLAlchemy 드라이버 표기(postgresql+psycopg2://)도 그대로 받습니다
+    return psycopg2.connect(database_url.replace('postgresql+psycopg2://', 'postgresql://', 1))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--database-url', default=os.getenv('DATABASE_URL'))
+    parser.add_argument('--users', type=int, default=100)
+    parser.add_argument('--sessions', type=int, default=10000)
+    parser.add_argument('--messages', type=int, default=1000000)
+    parser.add_argument('--long-sessions', type=int, default=8)
+    parser.add_argument('--long-session-messages', type=int, default=2000)
+    parser.add_argument('--reset', action='store_true', help='기존 벤치마크 데이터를 지우고 다시 만듭니다')
+    args = parser.parse_args()
+    if not args.database_url:
+        parser.error('--database-url 또는 DATABASE_URL이 필요합니다')
+
+    conn = connect(args.database_url)
+    try:
+        if args.reset:
+            reset(conn)
+        elif has_seed(conn):
+            print('벤치마크 데이터가 이미 있습니다 (다시 만들려면 --reset)')
+            return
+        started = time.perf_counter()
+        seed(conn, args.users, args.sessions, args.messages, args.long_sessions, args.long_session_messages)
+        print(f'Seeded {args.messages} messages in {time.perf_counter() - started:.1f}s')
+    finally:
+        conn.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,18 @@
+import multiprocessing
+import os
+
+# 운영 서버 설정 (gunicorn + uvicorn 워커, ASGI 진입점 asgi.py)
+# 채팅 완성 요청은 이벤트 루프에서 동시에 처리되므로 워커 수는 CPU 코어 수 정도면 충분합니다.
+# 워커마다 DB 커넥션 풀(DB_POOL_SIZE + DB_MAX_OVERFLOW)을 가지므로 max_connections와 함께 조정하세요.
+wsgi_app = 'asgi:application'
+bind = os.getenv('BIND', '0.0.0.0:5000')
+workers = int(os.getenv('WEB_CONCURRENCY', multiprocessing.cpu_count()))
+worker_class = 'uvicorn_worker.UvicornWorker'
+timeout = int(os.getenv('GUNICORN_TIMEOUT', '120'))
+graceful_timeout = int(os.getenv('GUNICORN_GRACEFUL_TIMEOUT', '30'))
+keepalive = int(os.getenv('GUNICORN_KEEPALIVE', '5'))
+# 장시간 실행으로 인한 메모리 증가를 막기 위해 워커를 주기적으로 재시작합니다
+max_requests = int(os.getenv('GUNICORN_MAX_REQUESTS', '10000'))
+max_requests_jitter = int(os.getenv('GUNICORN_MAX_REQUESTS_JITTER', '1000'))
+accesslog = os.getenv('GUNICORN_ACCESS_LOG', '-')
+loglevel = os.getenv('LOG_LEVEL', 'info').lower()
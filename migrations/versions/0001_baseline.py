@@ -0,0 +1,88 @@
+"""baseline schema and query indexes
+
+기존에 db.create_all()로 만든 데이터베이스와 빈 데이터베이스 모두에 적용할 수 있도록
+모든 DDL을 IF NOT EXISTS로 작성합니다. 인덱스는 운영 중인 테이블을 잠그지 않도록
+CREATE INDEX CONCURRENTLY로 만듭니다.
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-18
+"""
+from alembic import op
+
+revision = '0001'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+INDEXES = [
+    # 목록 API keyset 페이지네이션, 세션 히스토리 조회
+    ('ix_message_timestamp_id', 'message', 'btree', '("timestamp", id)', None),
+    ('ix_message_session_id_timestamp_id', 'message', 'btree', '(session_id, "timestamp", id)', None),
+    ('ix_message_user_id_timestamp_id', 'message', 'btree', '(user_id, "timestamp", id)', None),
+    ('ix_session_start_at_id', 'session', 'btree', '(start_at, id)', None),
+    ('ix_session_user_id_start_at_id', 'session', 'btree', '(user_id, start_at, id)', None),
+    ('ix_session_open_start_at_id', 'session', 'btree', '(start_at, id)', 'finish_at IS NULL'),
+    # 의미 검색
+    ('ix_message_vector_hnsw', 'message', 'hnsw', '(vector vector_cosine_ops) WITH (m = 16, ef_construction = 64)', None),
+]
+
+
+def upgrade():
+    op.execute('CREATE EXTENSION IF NOT EXISTS vector')
+    op.execute("""
+        DO $$ BEGIN
+            CREATE TYPE role_enum AS ENUM ('user', 'assistant');
+        EXCEPTION WHEN duplicate_object THEN NULL;
+        END $$
+    """)
+
+    op.execute("""
+        CREATE TABLE IF NOT EXISTS "user" (
+            id UUID PRIMARY KEY,
+            username VARCHAR(30) NOT NULL UNIQUE,
+            email VARCHAR(255) NOT NULL UNIQUE
+        )
+    """)
+    op.execute("""
+        CREATE TABLE IF NOT EXISTS session (
+            id UUID PRIMARY KEY,
+            user_id UUID NOT NULL REFERENCES "user" (id),
+            start_at TIMESTAMP WITH TIME ZONE NOT NULL,
+            finish_at TIMESTAMP WITH TIME ZONE,
+            title TEXT,
+            description TEXT
+        )
+    """)
+    # db.create_all()은 기존 테이블에 컬럼을 추가하지 않으므로 여기서 보충합니다
+    op.execute("ALTER TABLE session ADD COLUMN IF NOT EXISTS title_status VARCHAR(16) NOT NULL DEFAULT 'done'")
+    op.execute('ALTER TABLE session ADD COLUMN IF NOT EXISTS summary TEXT')
+    op.execute('ALTER TABLE session ADD COLUMN IF NOT EXISTS summary_until TIMESTAMP WITH TIME ZONE')
+    op.execute("""
+        CREATE TABLE IF NOT EXISTS message (
+            id UUID PRIMARY KEY,
+            session_id UUID NOT NULL REFERENCES session (id),
+            user_id UUID NOT NULL REFERENCES "user" (id),
+            content TEXT,
+            role role_enum NOT NULL,
+            "timestamp" TIMESTAMP WITH TIME ZONE NOT NULL,
+            vector VECTOR(1536)
+        )
+    """)
+
+    with op.get_context().autocommit_block():
+        for name, table, method, columns, where in INDEXES:
+            sql = f'CREATE INDEX CONCURRENTLY IF NOT EXISTS {name} ON {table} USING {method} {columns}'
+            if where:
+                sql += f' WHERE {where}'
+            op.execute(sql)
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        for name, _, _, _, _ in reversed(INDEXES):
+            op.execute(f'DROP INDEX CONCURRENTLY IF EXISTS {name}')
+    op.execute('DROP TABLE IF EXISTS message')
+    op.execute('DROP TABLE IF EXISTS session')
+    op.execute('DROP TABLE IF EXISTS "user"')
+    op.execute('DROP TYPE IF EXISTS role_enum')
@@ -0,0 +1,28 @@
+"""trigram index for lexical message search
+
+`GET /api/messages/search?mode=lexical`의 부분 일치(ILIKE) 검색에 쓰는 pg_trgm GIN 인덱스입니다.
+한국어 글자를 트라이그램으로 색인하려면 데이터베이스의 LC_CTYPE이 UTF-8 로캘(예: en_US.UTF-8,
+C.UTF-8)이어야 합니다 ("C" 로캘에서는 한글이 단어 문자로 인식되지 않습니다).
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-18
+"""
+from alembic import op
+
+revision = '0002'
+down_revision = '0001'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    with op.get_context().autocommit_block():
+        op.execute('CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_message_content_trgm '
+                   'ON message USING gin (content gin_trgm_ops)')
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        op.execute('DROP INDEX CONCURRENTLY IF EXISTS ix_message_content_trgm')
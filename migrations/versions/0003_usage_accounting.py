@@ -0,0 +1,65 @@
+"""token usage columns on message and usage rollup tables
+
+assistant 메시지의 토큰 사용량/모델/지연 시간 컬럼과, 응답 저장 시 ON CONFLICT로 갱신하는
+사용자 일별(usage_daily)/세션별(usage_session) 집계 테이블을 추가합니다.
+컬럼은 NULL 허용이므로 ADD COLUMN은 테이블을 다시 쓰지 않습니다.
+기존 메시지의 사용량은 기록되지 않았으므로 집계는 이 마이그레이션 이후의 응답부터 쌓입니다.
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-18
+"""
+from alembic import op
+
+revision = '0003'
+down_revision = '0002'
+branch_labels = None
+depends_on = None
+
+INDEXES = [
+    ('ix_usage_daily_day_total_tokens_user_id', 'usage_daily', '(day, total_tokens, user_id)'),
+    ('ix_usage_session_total_tokens_session_id', 'usage_session', '(total_tokens, session_id)'),
+    ('ix_usage_session_user_id_total_tokens_session_id', 'usage_session', '(user_id, total_tokens, session_id)'),
+]
+
+
+def upgrade():
+    op.execute('ALTER TABLE message ADD COLUMN IF NOT EXISTS prompt_tokens INTEGER')
+    op.execute('ALTER TABLE message ADD COLUMN IF NOT EXISTS completion_tokens INTEGER')
+    op.execute('ALTER TABLE message ADD COLUMN IF NOT EXISTS model VARCHAR(100)')
+    op.execute('ALTER TABLE message ADD COLUMN IF NOT EXISTS latency_ms INTEGER')
+
+    op.execute("""
+        CREATE TABLE IF NOT EXISTS usage_daily (
+            user_id UUID NOT NULL REFERENCES "user" (id) ON DELETE CASCADE,
+            day DATE NOT NULL,
+            requests INTEGER NOT NULL DEFAULT 0,
+            prompt_tokens BIGINT NOT NULL DEFAULT 0,
+            completion_tokens BIGINT NOT NULL DEFAULT 0,
+            total_tokens BIGINT NOT NULL DEFAULT 0,
+            PRIMARY KEY (user_id, day)
+        )
+    """)
+    op.execute("""
+        CREATE TABLE IF NOT EXISTS usage_session (
+            session_id UUID PRIMARY KEY REFERENCES session (id) ON DELETE CASCADE,
+            user_id UUID NOT NULL REFERENCES "user" (id) ON DELETE CASCADE,
+            requests INTEGER NOT NULL DEFAULT 0,
+            prompt_tokens BIGINT NOT NULL DEFAULT 0,
+            completion_tokens BIGINT NOT NULL DEFAULT 0,
+            total_tokens BIGINT NOT NULL DEFAULT 0,
+            last_used_at TIMESTAMP WITH TIME ZONE NOT NULL
+        )
+    """)
+    # 새 테이블이므로 CONCURRENTLY 없이 만듭니다
+    for name, table, columns in INDEXES:
+        op.execute(f'CREATE INDEX IF NOT EXISTS {name} ON {table} {columns}')
+
+
+def downgrade():
+    op.execute('DROP TABLE IF EXISTS usage_session')
+    op.execute('DROP TABLE IF EXISTS usage_daily')
+    op.execute('ALTER TABLE message DROP COLUMN IF EXISTS latency_ms')
+    op.execute('ALTER TABLE message DROP COLUMN IF EXISTS model')
+    op.execute('ALTER TABLE message DROP COLUMN IF EXISTS completion_tokens')
+    op.execute('ALTER TABLE message DROP COLUMN IF EXISTS prompt_tokens')
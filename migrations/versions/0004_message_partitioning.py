@@ -0,0 +1,145 @@
+"""partition message by archived/timestamp and cascade deletes in the database
+
+message를 `archived` 기준 LIST 파티션으로 바꿉니다.
+- message_hot: 진행 중/최근 세션의 메시지. timestamp 월별 RANGE 하위 파티션(message_hot_pYYYY_MM)과
+  범위 밖의 행을 받는 message_hot_default로 나뉩니다. 이후 월의 파티션은 `flask create-message-partitions`로 만듭니다.
+- message_archive: `flask archive-sessions`가 옮긴, 오래전에 종료된 세션의 메시지. content를 lz4로 압축하고
+  (PostgreSQL 14+, lz4 지원 빌드) 짧은 행도 TOAST 압축되도록 toast_tuple_target을 낮춥니다.
+
+기존 테이블은 파티션 테이블로 바꿀 수 없으므로 새 테이블에 복사한 뒤 교체합니다.
+복사와 인덱스 생성 동안 message 테이블이 잠기므로 점검 시간에 실행해야 합니다.
+message/session의 외래 키는 ON DELETE CASCADE로 바꿔 세션/사용자 삭제를 DB에서 한 번에 처리합니다.
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-18
+"""
+from alembic import op
+
+revision = '0004'
+down_revision = '0003'
+branch_labels = None
+depends_on = None
+
+COLUMNS = ('id, session_id, user_id, content, role, "timestamp", vector, '
+           'prompt_tokens, completion_tokens, model, latency_ms')
+
+# 파티션 테이블에는 CONCURRENTLY를 쓸 수 없습니다 (각 파티션에 같은 인덱스가 만들어집니다)
+INDEXES = [
+    ('ix_message_timestamp_id', 'btree', '("timestamp", id)'),
+    ('ix_message_session_id_timestamp_id', 'btree', '(session_id, "timestamp", id)'),
+    ('ix_message_user_id_timestamp_id', 'btree', '(user_id, "timestamp", id)'),
+    ('ix_message_vector_hnsw', 'hnsw', '(vector vector_cosine_ops) WITH (m = 16, ef_construction = 64)'),
+    ('ix_message_content_trgm', 'gin', '(content gin_trgm_ops)'),
+]
+
+# 기존 데이터가 있는 달부터 이번 달 + 3개월까지 월별 파티션을 만듭니다
+CREATE_MONTHLY_PARTITIONS = """
+    DO $$
+    DECLARE
+        month timestamptz;
+    BEGIN
+        FOR month IN
+            SELECT generate_series(
+                date_trunc('month', coalesce((SELECT min("timestamp") FROM message), now()), 'UTC'),
+                date_trunc('month', now(), 'UTC') + interval '3 months',
+                interval '1 month')
+        LOOP
+            EXECUTE format('CREATE TABLE IF NOT EXISTS %I PARTITION OF message_hot FOR VALUES FROM (%L) TO (%L)',
+                           'message_hot_p' || to_char(month AT TIME ZONE 'UTC', 'YYYY_MM'),
+                           month, month + interval '1 month');
+        END LOOP;
+    END $$
+"""
+
+
+def _replace_foreign_key(table, name, column, target):
+    op.execute(f'ALTER TABLE {table} DROP CONSTRAINT IF EXISTS {name}')
+    op.execute(f'ALTER TABLE {table} ADD CONSTRAINT {name} '
+               f'FOREIGN KEY ({column}) REFERENCES {target} (id) ON DELETE CASCADE')
+
+
+def upgrade():
+    op.execute('ALTER TABLE session ADD COLUMN IF NOT EXISTS archived_at TIMESTAMP WITH TIME ZONE')
+    op.execute('CREATE INDEX IF NOT EXISTS ix_session_archive_pending_finish_at ON session (finish_at) '
+               'WHERE finish_at IS NOT NULL AND archived_at IS NULL')
+    _replace_foreign_key('session', 'session_user_id_fkey', 'user_id', '"user"')
+
+    op.execute("""
+        CREATE TABLE message_partitioned (
+            id UUID NOT NULL,
+            session_id UUID NOT NULL,
+            user_id UUID NOT NULL,
+            content TEXT,
+            role role_enum NOT NULL,
+            "timestamp" TIMESTAMP WITH TIME ZONE NOT NULL,
+            vector VECTOR(1536),
+            prompt_tokens INTEGER,
+            completion_tokens INTEGER,
+            model VARCHAR(100),
+            latency_ms INTEGER,
+            archived BOOLEAN NOT NULL DEFAULT false
+        ) PARTITION BY LIST (archived)
+    """)
+    op.execute('CREATE TABLE message_hot PARTITION OF message_partitioned '
+               'FOR VALUES IN (false) PARTITION BY RANGE ("timestamp")')
+    op.execute('CREATE TABLE message_hot_default PARTITION OF message_hot DEFAULT')
+    # 아카이브 행은 다시 바뀌지 않으므로 빈 공간을 남기지 않고, 2KB보다 짧은 행도 압축합니다
+    op.execute('CREATE TABLE message_archive PARTITION OF message_partitioned FOR VALUES IN (true) '
+               'WITH (fillfactor = 100, toast_tuple_target = 128)')
+    op.execute("""
+        DO $$ BEGIN
+            ALTER TABLE message_archive ALTER COLUMN content SET COMPRESSION lz4;
+        EXCEPTION WHEN OTHERS THEN
+            RAISE NOTICE 'lz4 compression is not available, using pglz: %', SQLERRM;
+        END $$
+    """)
+    op.execute(CREATE_MONTHLY_PARTITIONS)
+
+    op.execute(f'INSERT INTO message_partitioned ({COLUMNS}) SELECT {COLUMNS} FROM message')
+    op.execute('DROP TABLE message')
+    op.execute('ALTER TABLE message_partitioned RENAME TO message')
+
+    # 파티션 키가 기본 키에 포함되어야 합니다
+    op.execute('ALTER TABLE message ADD CONSTRAINT message_pkey PRIMARY KEY (id, "timestamp", archived)')
+    op.execute('ALTER TABLE message ADD CONSTRAINT message_session_id_fkey '
+               'FOREIGN KEY (session_id) REFERENCES session (id) ON DELETE CASCADE')
+    op.execute('ALTER TABLE message ADD CONSTRAINT message_user_id_fkey '
+               'FOREIGN KEY (user_id) REFERENCES "user" (id) ON DELETE CASCADE')
+    for name, method, columns in INDEXES:
+        op.execute(f'CREATE INDEX IF NOT EXISTS {name} ON message USING {method} {columns}')
+    op.execute('ANALYZE message')
+
+
+def downgrade():
+    op.execute("""
+        CREATE TABLE message_plain (
+            id UUID PRIMARY KEY,
+            session_id UUID NOT NULL,
+            user_id UUID NOT NULL,
+            content TEXT,
+            role role_enum NOT NULL,
+            "timestamp" TIMESTAMP WITH TIME ZONE NOT NULL,
+            vector VECTOR(1536),
+            prompt_tokens INTEGER,
+            completion_tokens INTEGER,
+            model VARCHAR(100),
+            latency_ms INTEGER
+        )
+    """)
+    op.execute(f'INSERT INTO message_plain ({COLUMNS}) SELECT {COLUMNS} FROM message')
+    op.execute('DROP TABLE message')
+    op.execute('ALTER TABLE message_plain RENAME TO message')
+    op.execute('ALTER INDEX message_plain_pkey RENAME TO message_pkey')
+    op.execute('ALTER TABLE message ADD CONSTRAINT message_session_id_fkey '
+               'FOREIGN KEY (session_id) REFERENCES session (id)')
+    op.execute('ALTER TABLE message ADD CONSTRAINT message_user_id_fkey '
+               'FOREIGN KEY (user_id) REFERENCES "user" (id)')
+    for name, method, columns in INDEXES:
+        op.execute(f'CREATE INDEX IF NOT EXISTS {name} ON message USING {method} {columns}')
+
+    op.execute('ALTER TABLE session DROP CONSTRAINT IF EXISTS session_user_id_fkey')
+    op.execute('ALTER TABLE session ADD CONSTRAINT session_user_id_fkey '
+               'FOREIGN KEY (user_id) REFERENCES "user" (id)')
+    op.execute('DROP INDEX IF EXISTS ix_session_archive_pending_finish_at')
+    op.execute('ALTER TABLE session DROP COLUMN IF EXISTS archived_at')
@@ -0,0 +1,24 @@
+"""session summary boundary as (timestamp, id)
+
+요약에 포함된 마지막 메시지를 시각만이 아니라 (timestamp, id)로 기록하도록 `summary_until_id`를 추가합니다.
+같은 시각에 저장된 메시지(대량 저장 등) 중 일부만 요약된 경우에도 나머지를 다음 턴에 빠뜨리지 않습니다.
+기존 요약은 NULL로 남으며, 그 시각의 메시지를 모두 포함한 것으로 취급합니다 (이전과 같은 동작).
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-18
+"""
+from alembic import op
+
+revision = '0005'
+down_revision = '0004'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.execute('ALTER TABLE session ADD COLUMN IF NOT EXISTS summary_until_id UUID')
+
+
+def downgrade():
+    op.execute('ALTER TABLE session DROP COLUMN IF EXISTS summary_until_id')
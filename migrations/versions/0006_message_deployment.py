@@ -0,0 +1,24 @@
+"""deployment column on message
+
+AI 응답을 처리한 Azure OpenAI 배포(AZURE_OPENAI_DEPLOYMENT_NAMES 중 스케줄러가 배정한 것)를 기록합니다.
+`model`에는 응답의 모델 이름만 남아 여러 배포가 같은 모델을 쓰면 구분할 수 없기 때문입니다.
+컬럼은 NULL 허용이므로 ADD COLUMN은 파티션을 다시 쓰지 않으며, 기존 메시지는 NULL로 남습니다.
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-18
+"""
+from alembic import op
+
+revision = '0006'
+down_revision = '0005'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.execute('ALTER TABLE message ADD COLUMN IF NOT EXISTS deployment VARCHAR(100)')
+
+
+def downgrade():
+    op.execute('ALTER TABLE message DROP COLUMN IF EXISTS deployment')
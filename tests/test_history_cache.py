@@ -0,0 +1,132 @@
+import uuid
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+from app.utils.entity_cache import LocalBackend
+from app.utils.history_cache import HistoryCache
+
+START = datetime(2026, 1, 1, tzinfo=timezone.utc)
+
+
+class FakeHistoryCache(HistoryCache):
+    """DB 대신 메모리의 메시지 목록을 조회하는 HistoryCache"""
+
+    def __init__(self, messages, **kwargs):
+        super().__init__(LocalBackend(), **kwargs)
+        self.messages = messages
+        self.queries = []
+        self.on_query = None
+
+    def _query(self, session_id, since=None, tail=None, until=None, hot_only=False):
+        self.queries.append({'since': since, 'tail': tail, 'until': until})
+        if self.on_query:
+            self.on_query()
+        return [dict(m) for m in self.messages
+                if (since is None or key(m) > since)
+                and (tail is None or m['timestamp'] >= tail)
+                and (until is None or key(m) <= until)]
+
+
+def key(message):
+    return message['timestamp'], message['id']
+
+
+def make_messages(count, start=0):
+    return [{'id': uuid.uuid4(), 'role': 'user', 'content': f'message {i}',
+             'timestamp': START + timedelta(seconds=i)} for i in range(start, start + count)]
+
+
+def make_session(summary_until=None, summary_until_id=None):
+    return SimpleNamespace(id=uuid.uuid4(), summary_until=summary_until, summary_until_id=summary_until_id,
+                           finish_at=None)
+
+
+def test_load_returns_full_history_beyond_max_messages():
+    messages = make_messages(150)
+    cache = FakeHistoryCache(messages, max_messages=100)
+    session = make_session()
+
+    assert cache.load(session) == messages
+    # 캐시에는 최근 100개만 남고, 두 번째 조회는 전체를 다시 읽지 않고 밀려난 50개만 DB에서 읽습니다
+    assert cache.load(session) == messages
+    floor = key(messages[49])
+    assert cache.queries == [
+        {'since': None, 'tail': None, 'until': None},
+        {'since': floor, 'tail': messages[-1]['timestamp'], 'until': None},
+        {'since': None, 'tail': None, 'until': floor},
+    ]
+
+    session.summary_until, session.summary_until_id = messages[29]['timestamp'], messages[29]['id']
+    assert cache.load(session) == messages[30:]
+    assert cache.queries[-1] == {'since': key(messages[29]), 'tail': None, 'until': floor}
+
+    # 요약이 ring을 따라잡으면 캐시만으로 채웁니다
+    session.summary_until, session.summary_until_id = messages[79]['timestamp'], messages[79]['id']
+    assert cache.load(session) == messages[80:]
+    assert cache.queries[-1]['until'] is None
+    assert cache.load(session) == messages[80:]
+    assert cache.queries[-1] == {'since': key(messages[79]), 'tail': messages[-1]['timestamp'], 'until': None}
+
+
+def test_history_growing_past_max_messages_keeps_recent_tail():
+    messages = make_messages(80)
+    cache = FakeHistoryCache(messages, max_messages=100)
+    session = make_session()
+    assert cache.load(session) == messages
+
+    messages.extend(make_messages(40, start=80))
+    cache.append(session.id, messages[80:])
+    entry = cache.backend.get(cache._key(session.id))
+    assert entry['messages'] == messages[20:]
+    assert entry['floor'] == key(messages[19])
+
+    assert cache.load(session) == messages
+    assert cache.queries[-1] == {'since': None, 'tail': None, 'until': key(messages[19])}
+
+
+def test_store_after_concurrent_evict_is_discarded():
+    messages = make_messages(3)
+    cache = FakeHistoryCache(messages, max_messages=100)
+    session = make_session()
+
+    def edit_and_evict():
+        # load가 DB를 읽은 뒤 다른 요청이 메시지를 고치고 커밋해 캐시를 지운 상황
+        cache.on_query = None
+        stale = [dict(m) for m in messages]
+        messages[0]['content'] = 'edited'
+        cache.evict(session.id)
+        cache.messages = stale
+
+    cache.on_query = edit_and_evict
+    assert cache.load(session)[0]['content'] == 'message 0'
+    cache.messages = messages
+
+    assert cache.load(session)[0]['content'] == 'edited'
+    assert [q['since'] for q in cache.queries] == [None, None]
+
+
+def test_append_after_evict_does_not_restore_entry():
+    messages = make_messages(3)
+    cache = FakeHistoryCache(messages, max_messages=100)
+    session = make_session()
+    cache.load(session)
+
+    cache.evict(session.id)
+    cache.append(session.id, make_messages(1, start=3))
+    assert cache.backend.get(cache._key(session.id)) is None
+
+
+def test_summary_boundary_keeps_messages_sharing_its_timestamp():
+    # 대량 저장으로 같은 시각에 들어온 메시지 중 일부만 요약된 경우
+    messages = sorted(make_messages(2) + [dict(m, id=uuid.uuid4()) for m in make_messages(3, start=1)],
+                      key=lambda m: (m['timestamp'], m['id']))
+    cache = FakeHistoryCache(messages, max_messages=100)
+    session = make_session()
+    assert cache.load(session) == messages
+
+    session.summary_until, session.summary_until_id = messages[1]['timestamp'], messages[1]['id']
+    assert cache.load(session) == messages[2:]
+    assert cache.load(session) == messages[2:]
+
+    # summary_until_id가 없는 이전 요약은 그 시각의 메시지를 모두 포함합니다
+    legacy = make_session(messages[1]['timestamp'])
+    assert cache.load(legacy) == [m for m in messages if m['timestamp'] > messages[1]['timestamp']]